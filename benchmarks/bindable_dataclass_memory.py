@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Compare the memory footprint of bindable dataclass instances with and without slots.
+
+Usage: python benchmarks/bindable_dataclass_memory.py [COUNTS ...]
+"""
+import argparse
+import gc
+import tracemalloc
+from typing import Any, Callable, List
+
+from nicegui import binding
+
+
+@binding.bindable_dataclass
+class Row:
+    id: int = 0
+    name: str = ''
+    price: float = 0.0
+    in_stock: bool = False
+
+
+@binding.bindable_dataclass(slots=True)
+class SlottedRow:
+    id: int = 0
+    name: str = ''
+    price: float = 0.0
+    in_stock: bool = False
+
+
+def measure(factory: Callable[[int], Any], count: int) -> int:
+    """Create the given number of instances and return the number of allocated bytes."""
+    gc.collect()
+    tracemalloc.start()
+    rows: List[Any] = [factory(i) for i in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+    return size
+
+
+def main(counts: List[int]) -> None:
+    print(f'{"rows":>10} {"__dict__ [MB]":>14} {"__slots__ [MB]":>15} {"saving [%]":>11}')
+    for count in counts:
+        dict_size = measure(lambda i: Row(i, f'row {i}', i / 10, i % 2 == 0), count)
+        slots_size = measure(lambda i: SlottedRow(i, f'row {i}', i / 10, i % 2 == 0), count)
+        print(f'{count:>10} {dict_size / 1e6:>14.1f} {slots_size / 1e6:>15.1f} '
+              f'{100 * (1 - slots_size / dict_size):>11.1f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('counts', type=int, nargs='*', default=[10_000, 100_000])
+    main(parser.parse_args().counts)
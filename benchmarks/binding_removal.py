@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Measure the time it takes to remove the bindings of a single client while many other clients are bound.
+
+With reverse indexes, removing a client should only cost time proportional to its own bindings,
+independent of the total number of bindings in the process.
+
+Usage: python benchmarks/binding_removal.py [--clients COUNT] [--bindings-per-client COUNT]
+"""
+import argparse
+import time
+from typing import List
+
+from nicegui import Client, binding, ui
+from nicegui.page import page
+
+
+class Model:
+    value = binding.BindableProperty()
+
+    def __init__(self) -> None:
+        self.value = 'bindable'
+        self.plain = 'polled'
+
+
+def create_client(bindings_per_client: int) -> Client:
+    """Create a client with labels that are bound to bindable properties and plain attributes."""
+    client = Client(page('/'), request=None)
+    model = Model()
+    with client:
+        for i in range(bindings_per_client):
+            ui.label().bind_text_from(model, 'value' if i % 2 else 'plain')
+    return client
+
+
+def main(client_count: int, bindings_per_client: int) -> None:
+    t = time.perf_counter()
+    clients: List[Client] = [create_client(bindings_per_client) for _ in range(client_count)]
+    binding_count = sum(len(binding_list) for binding_list in binding.bindings.values())
+    print(f'created {binding_count} bindings and {len(binding.active_links)} active links '
+          f'for {client_count} clients in {time.perf_counter() - t:.2f} s')
+
+    durations: List[float] = []
+    for client in clients[:100]:
+        t = time.perf_counter()
+        client.delete()
+        durations.append(time.perf_counter() - t)
+    print(f'deleting a client: {1000 * sum(durations) / len(durations):.2f} ms on average, '
+          f'{1000 * max(durations):.2f} ms at most')
+
+    t = time.perf_counter()
+    for client in clients[100:]:
+        client.delete()
+    print(f'deleted the remaining {len(clients) - 100} clients in {time.perf_counter() - t:.2f} s')
+    assert not binding.bindings and not binding.active_links
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=1_000)
+    parser.add_argument('--bindings-per-client', type=int, default=100)
+    args = parser.parse_args()
+    main(args.clients, args.bindings_per_client)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Measure the CPU time spent by the outbox for a growing number of idle, connected clients.
+
+With a single outbox loop that only wakes up for scheduled outboxes, the CPU time should stay flat.
+
+Usage: python benchmarks/outbox_idle_clients.py [--duration SECONDS] [COUNTS ...]
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+from nicegui import Client, core, ui
+from nicegui.page import page
+
+
+async def measure(count: int, duration: float) -> float:
+    """Create the given number of connected clients and return the CPU time used while idling."""
+    clients: List[Client] = []
+    for _ in range(count):
+        client = Client(page('/'), request=None)
+        client.tab_id = 'benchmark'  # NOTE: pretend the client is connected
+        with client:
+            ui.label('idle')
+        clients.append(client)
+    await asyncio.sleep(0.5)  # NOTE: let the outbox loop flush the initial updates
+
+    t = time.process_time()
+    await asyncio.sleep(duration)
+    cpu_time = time.process_time() - t
+
+    for client in clients:
+        client.delete()
+    return cpu_time
+
+
+async def main(counts: List[int], duration: float) -> None:
+    core.app.config.add_run_config(
+        reload=False,
+        title='Benchmark',
+        viewport='',
+        favicon=None,
+        dark=False,
+        language='en-US',
+        binding_refresh_interval=0.1,
+        reconnect_timeout=3.0,
+        message_history_length=1000,
+        tailwind=True,
+        prod_js=True,
+        show_welcome_message=False,
+    )
+    async with core.app.router.lifespan_context(core.app):
+        print(f'{"idle clients":>12} {"CPU time [ms]":>14} {"CPU load [%]":>13}')
+        for count in counts:
+            cpu_time = await measure(count, duration)
+            print(f'{count:>12} {1000 * cpu_time:>14.1f} {100 * cpu_time / duration:>13.2f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('counts', type=int, nargs='*', default=[100, 1_000, 10_000])
+    parser.add_argument('--duration', type=float, default=5.0, help='idle time per measurement in seconds')
+    args = parser.parse_args()
+    asyncio.run(main(args.counts, args.duration))
@@ -141,14 +141,14 @@ class Air:
             print('Error:', data['message'], flush=True)
 
         @self.relay.on('handshake')
-        def _handle_handshake(data: Dict[str, Any]) -> bool:
+        async def _handle_handshake(data: Dict[str, Any]) -> bool:
             client_id = data['client_id']
             if client_id not in Client.instances:
                 return False
             client = Client.instances[client_id]
             client.environ = data['environ']
             if data.get('old_tab_id'):
-                core.app.storage.copy_tab(data['old_tab_id'], data['tab_id'])
+                await core.app.storage.copy_tab(data['old_tab_id'], data['tab_id'])
             client.tab_id = data['tab_id']
             client.on_air = True
             client.handle_handshake(data['sid'], data['document_id'], data.get('next_message_id'))
@@ -208,7 +208,7 @@ class Air:
             if client_id not in Client.instances:
                 return
             client = Client.instances[client_id]
-            client.outbox.prune_history(data['msg']['next_message_id'])
+            client.outbox.handle_ack(data['msg']['next_message_id'])
 
         @self.relay.on('out_of_time')
         async def _handle_out_of_time() -> None:
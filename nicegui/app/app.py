@@ -44,6 +44,7 @@ class App(FastAPI):
         self._shutdown_handlers: List[Union[Callable[..., Any], Awaitable]] = []
         self._connect_handlers: List[Union[Callable[..., Any], Awaitable]] = []
         self._disconnect_handlers: List[Union[Callable[..., Any], Awaitable]] = []
+        self._slow_client_handlers: List[Union[Callable[..., Any], Awaitable]] = []
         self._exception_handlers: List[Callable[..., Any]] = [log.exception]
         self._page_exception_handler: Optional[Callable[..., Any]] = None
 
@@ -103,6 +104,14 @@ class App(FastAPI):
         """
         self._disconnect_handlers.append(handler)
 
+    def on_slow_client(self, handler: Union[Callable, Awaitable]) -> None:
+        """当客户端持续超过 `ui.run` 中配置的 outbox 水位线时调用。
+
+        默认情况下未配置水位线，因此只有启用背压后才会调用此回调。
+        回调有一个可选的 `nicegui.Client` 参数。
+        """
+        self._slow_client_handlers.append(handler)
+
     def on_startup(self, handler: Union[Callable, Awaitable]) -> None:
         """当 NiceGUI 启动或重新启动时调用。
 
@@ -296,6 +305,7 @@ class App(FastAPI):
         self._shutdown_handlers.clear()
         self._connect_handlers.clear()
         self._disconnect_handlers.clear()
+        self._slow_client_handlers.clear()
         self._exception_handlers[:] = [log.exception]
         self.config = AppConfig()
 
@@ -37,7 +37,13 @@ class AppConfig:
     language: Language = field(init=False)
     binding_refresh_interval: float = field(init=False)
     reconnect_timeout: float = field(init=False)
+    unconnected_client_timeout: float = field(init=False)
     message_history_length: int = field(init=False)
+    message_history_bytes: int = field(init=False)
+    outbox_max_messages: Optional[int] = field(init=False)
+    outbox_max_bytes: Optional[int] = field(init=False)
+    message_format: Literal['json', 'msgpack'] = field(init=False)
+    compression_threshold: Optional[int] = field(init=False)
     cache_control_directives: str = field(init=False)
     tailwind: bool = field(init=False)
     prod_js: bool = field(init=False)
@@ -54,13 +60,21 @@ class AppConfig:
                        language: Language,
                        binding_refresh_interval: float,
                        reconnect_timeout: float,
+                       unconnected_client_timeout: float = 60.0,
                        message_history_length: int,
+                       message_history_bytes: int = 1_000_000,
+                       outbox_max_messages: Optional[int] = None,
+                       outbox_max_bytes: Optional[int] = None,
+                       message_format: Literal['json', 'msgpack'] = 'json',
+                       compression_threshold: Optional[int] = None,
                        cache_control_directives: str = 'public, max-age=31536000, immutable, stale-while-revalidate=31536000',
                        tailwind: bool,
                        prod_js: bool,
                        show_welcome_message: bool,
                        ) -> None:
         """Add the run config to the app config."""
+        if unconnected_client_timeout <= 0:
+            raise ValueError('unconnected_client_timeout must be positive')
         self.reload = reload
         self.title = title
         self.viewport = viewport
@@ -69,7 +83,13 @@ class AppConfig:
         self.language = language
         self.binding_refresh_interval = binding_refresh_interval
         self.reconnect_timeout = reconnect_timeout
+        self.unconnected_client_timeout = unconnected_client_timeout
         self.message_history_length = message_history_length
+        self.message_history_bytes = message_history_bytes
+        self.outbox_max_messages = outbox_max_messages
+        self.outbox_max_bytes = outbox_max_bytes
+        self.message_format = message_format
+        self.compression_threshold = compression_threshold
         self.cache_control_directives = cache_control_directives
         self.tailwind = tailwind
         self.prod_js = prod_js
@@ -50,6 +50,12 @@ def create_lazy(coroutine: Awaitable, *, name: str) -> None:
     task.add_done_callback(lambda _: finalize(name))
 
 
+async def wait_for_lazy(name: str) -> None:
+    """Wait until the lazy task with the given name and the coroutine which is waiting for it are done."""
+    while name in lazy_tasks_running:
+        await asyncio.wait([lazy_tasks_running[name]])
+
+
 F = TypeVar('F', bound=Callable)
 
 
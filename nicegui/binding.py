@@ -3,16 +3,21 @@ from __future__ import annotations
 import asyncio
 import copyreg
 import dataclasses
+import heapq
+import itertools
 import time
 import weakref
 from collections import defaultdict
+from contextlib import contextmanager
 from contextvars import ContextVar
 from typing import (
     TYPE_CHECKING,
     Any,
     Callable,
     DefaultDict,
+    Dict,
     Iterable,
+    Iterator,
     List,
     Mapping,
     Optional,
@@ -27,17 +32,80 @@ from typing_extensions import dataclass_transform
 
 from . import core
 from .logging import log
+from .observables import ObservableCollection
 
 if TYPE_CHECKING:
     from _typeshed import DataclassInstance, IdentityFunction
 
 MAX_PROPAGATION_TIME = 0.01
+'''Time budget for polling links per refresh step. Remaining links are refreshed in the next step.'''
 
 propagation_visited: ContextVar[Optional[Set[Tuple[int, str]]]] = ContextVar('propagation_visited', default=None)
 
-bindings: DefaultDict[Tuple[int, str], List[Tuple[Any, Any, str, Optional[Callable[[Any], Any]]]]] = defaultdict(list)
+
+@dataclasses.dataclass
+class _Transaction:
+    changes: Dict[Tuple[int, str], Tuple[Any, str]] = dataclasses.field(default_factory=dict)
+    change_handlers: Dict[Tuple[int, str], Tuple[Callable[..., Any], Any, str, Any]] = \
+        dataclasses.field(default_factory=dict)
+
+
+current_transaction: ContextVar[Optional[_Transaction]] = ContextVar('current_transaction', default=None)
+
+Binding = Tuple[Any, Any, str, Optional[Callable[[Any], Any]]]
+Link = Tuple[Any, str, Any, str, Optional[Callable[[Any], Any]]]
+
+bindings: DefaultDict[Tuple[int, str], List[Binding]] = defaultdict(list)
 bindable_properties: weakref.WeakValueDictionary[Tuple[int, str], Any] = weakref.WeakValueDictionary()
-active_links: List[Tuple[Any, str, Any, str, Optional[Callable[[Any], Any]]]] = []
+active_links: List[Link] = []
+observed_collections: weakref.WeakValueDictionary[int, ObservableCollection] = weakref.WeakValueDictionary()
+observed_names: DefaultDict[int, Set[str]] = defaultdict(set)
+
+
+@dataclasses.dataclass
+class LinkStats:
+    """Statistics of a polled link (see ``link_stats()``)."""
+    source_obj: Any
+    source_name: str
+    target_obj: Any
+    target_name: str
+    transform: Optional[Callable[[Any], Any]]
+    refresh_interval: Optional[float]
+    checks: int = 0
+    changes: int = 0
+    total_time: float = 0.0
+    transform_time: float = 0.0
+    max_time: float = 0.0
+
+    @property
+    def change_rate(self) -> float:
+        """Fraction of checks which found a changed value."""
+        return self.changes / self.checks if self.checks else 0.0
+
+    @property
+    def average_time(self) -> float:
+        """Average time of a single check in seconds."""
+        return self.total_time / self.checks if self.checks else 0.0
+
+
+@dataclasses.dataclass(eq=False)
+class _LinkState:
+    link: Link
+    stats: LinkStats
+    index: int
+    active: bool = True
+    warned: bool = False
+
+
+_active_links_event: Optional[asyncio.Event] = None
+_refresh_queue: List[Tuple[float, int, _LinkState]] = []
+_refresh_counter = itertools.count()
+
+# NOTE: reverse indexes, so that removing objects does not have to scan all bindings and links
+_binding_keys_by_object: DefaultDict[int, Set[Tuple[int, str]]] = defaultdict(set)
+_links_by_object: DefaultDict[int, Dict[int, Link]] = defaultdict(dict)
+_link_states: Dict[int, _LinkState] = {}
+_bindable_property_names: weakref.WeakKeyDictionary[type, List[str]] = weakref.WeakKeyDictionary()
 
 TC = TypeVar('TC', bound=type)
 T = TypeVar('T')
@@ -63,31 +131,101 @@ def _set_attribute(obj: Union[object, Mapping], name: str, value: Any) -> None:
 
 
 async def refresh_loop() -> None:
-    """Refresh all bindings in an endless loop."""
+    """Refresh all bindings in an endless loop.
+
+    Only links whose source can not notify about changes are polled, each according to its own refresh interval.
+    While there are no such links, the loop waits instead of waking up every ``binding_refresh_interval``.
+    """
+    global _active_links_event  # pylint: disable=global-statement # noqa: PLW0603
+    _active_links_event = asyncio.Event()
     while True:
-        _refresh_step()
         try:
-            await asyncio.sleep(core.app.config.binding_refresh_interval)
+            if active_links:
+                _refresh_step()
+            _active_links_event.clear()
+            next_refresh = _next_refresh_time()
+            if next_refresh is None:
+                await _active_links_event.wait()
+                continue
+            delay = next_refresh - time.monotonic()
+            if delay <= 0:
+                await asyncio.sleep(0)  # NOTE: the time budget is exhausted, so let other tasks run first
+                continue
+            try:
+                await asyncio.wait_for(_active_links_event.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
         except asyncio.CancelledError:
             break
 
 
+def _next_refresh_time() -> Optional[float]:
+    while _refresh_queue and not _refresh_queue[0][2].active:
+        heapq.heappop(_refresh_queue)
+    return _refresh_queue[0][0] if _refresh_queue else None
+
+
 def _refresh_step() -> None:
-    t = time.time()
-    for link in active_links:
-        (source_obj, source_name, target_obj, target_name, transform) = link
-        if _has_attribute(source_obj, source_name):
-            source_value = _get_attribute(source_obj, source_name)
-            value = transform(source_value) if transform else source_value
-            if not _has_attribute(target_obj, target_name) or _get_attribute(target_obj, target_name) != value:
-                _set_attribute(target_obj, target_name, value)
-                _propagate(target_obj, target_name)
-        del link, source_obj, target_obj  # pylint: disable=modified-iterating-list
-    if time.time() - t > MAX_PROPAGATION_TIME:
-        log.warning(f'binding propagation for {len(active_links)} active links took {time.time() - t:.3f} s')
+    """Refresh all links which are due, as long as the time budget of ``MAX_PROPAGATION_TIME`` allows."""
+    t = time.perf_counter()
+    now = time.monotonic()
+    while _refresh_queue and _refresh_queue[0][0] <= now:
+        _, _, state = heapq.heappop(_refresh_queue)
+        if not state.active:
+            continue
+        _refresh_link(state)
+        interval = state.stats.refresh_interval
+        if interval is None:
+            interval = core.app.config.binding_refresh_interval
+        heapq.heappush(_refresh_queue, (now + interval, next(_refresh_counter), state))
+        if time.perf_counter() - t > MAX_PROPAGATION_TIME:
+            break
+
+
+def _refresh_link(state: _LinkState) -> None:
+    source_obj, source_name, target_obj, target_name, transform = state.link
+    stats = state.stats
+    t = time.perf_counter()
+    if _has_attribute(source_obj, source_name):
+        value = _get_attribute(source_obj, source_name)
+        if transform:
+            transform_start = time.perf_counter()
+            value = transform(value)
+            stats.transform_time += time.perf_counter() - transform_start
+        if not _has_attribute(target_obj, target_name) or _get_attribute(target_obj, target_name) != value:
+            _set_attribute(target_obj, target_name, value)
+            _propagate(target_obj, target_name)
+            stats.changes += 1
+    duration = time.perf_counter() - t
+    stats.checks += 1
+    stats.total_time += duration
+    stats.max_time = max(stats.max_time, duration)
+    if duration > MAX_PROPAGATION_TIME and not state.warned:
+        state.warned = True
+        log.warning(f'refreshing the binding from "{source_name}" to "{target_name}" took {duration:.3f} s '
+                    '(see binding.link_stats() for details)')
+
+
+def link_stats() -> List[LinkStats]:
+    """Get statistics of all polled links, the most expensive first.
+
+    Bindings from bindable properties and observable collections are not polled and therefore not included.
+
+    *Added in version 2.23.0*
+
+    :return: copies of the statistics of each link
+    """
+    return sorted((dataclasses.replace(state.stats) for state in _link_states.values()),
+                  key=lambda stats: stats.total_time, reverse=True)
 
 
 def _propagate(source_obj: Any, source_name: str) -> None:
+    transaction_ = current_transaction.get()
+    if transaction_ is not None:
+        key = (id(source_obj), source_name)
+        transaction_.changes.pop(key, None)  # NOTE: move the latest change to the end
+        transaction_.changes[key] = (source_obj, source_name)
+        return
     token = propagation_visited.set(set())
     try:
         _propagate_recursively(source_obj, source_name)
@@ -118,8 +256,148 @@ def _propagate_recursively(source_obj: Any, source_name: str) -> None:
             _propagate_recursively(target_obj, target_name)
 
 
+def _add_link(source_obj: Any, source_name: str, target_obj: Any, target_name: str,
+              transform: Optional[Callable[[Any], Any]], refresh_interval: Optional[float]) -> None:
+    key = (id(source_obj), source_name)
+    bindings[key].append((source_obj, target_obj, target_name, transform))
+    _binding_keys_by_object[id(source_obj)].add(key)
+    _binding_keys_by_object[id(target_obj)].add(key)
+    if source_name in _get_bindable_property_names(type(source_obj)):
+        bindable_properties[key] = source_obj
+        return
+    if key in bindable_properties or isinstance(source_obj, BindableObject):
+        return
+    if isinstance(source_obj, ObservableCollection):
+        _observe(source_obj, source_name)
+        return
+    link = (source_obj, source_name, target_obj, target_name, transform)
+    stats = LinkStats(source_obj, source_name, target_obj, target_name, transform, refresh_interval)
+    state = _LinkState(link, stats, index=len(active_links))
+    _link_states[id(link)] = state
+    active_links.append(link)
+    heapq.heappush(_refresh_queue, (time.monotonic(), next(_refresh_counter), state))
+    _links_by_object[id(source_obj)][id(link)] = link
+    _links_by_object[id(target_obj)][id(link)] = link
+    if _active_links_event is not None:
+        _active_links_event.set()
+
+
+def _observe(collection: ObservableCollection, name: str) -> None:
+    """Propagate the given key whenever the observable collection changes instead of polling it."""
+    collection_id = id(collection)
+    observed_names[collection_id].add(name)
+    if collection_id in observed_collections:
+        return
+    observed_collections[collection_id] = collection
+    collection.on_change(lambda: _propagate_observed(collection_id))
+
+
+def _propagate_observed(collection_id: int) -> None:
+    collection = observed_collections.get(collection_id)
+    if collection is None:
+        return
+    names = observed_names.get(collection_id, set())
+    for name in list(names):
+        if (collection_id, name) in bindings:
+            _propagate(collection, name)
+        else:
+            names.discard(name)
+
+
+@contextmanager
+def transaction() -> Iterator[None]:
+    """Collect changes of bound properties and propagate them at once when leaving the context.
+
+    Within a transaction, targets and ``on_change`` handlers do not see intermediate values.
+    When the transaction ends, all changed sources are propagated in a single, topologically ordered pass.
+    Like without a transaction, the latest change wins:
+    a property which has been set explicitly is only overwritten by propagating changes that happened after it.
+    Change handlers are called once per property with its final value.
+    Nested transactions are merged into the outermost one.
+
+    *Added in version 2.23.0*
+    """
+    if current_transaction.get() is not None:
+        yield
+        return
+    transaction_ = _Transaction()
+    token = current_transaction.set(transaction_)
+    try:
+        yield
+    finally:
+        try:
+            while transaction_.changes:
+                sources = list(transaction_.changes.values())
+                transaction_.changes.clear()
+                for key in _propagate_in_order(sources):
+                    transaction_.changes.pop(key, None)
+        finally:
+            current_transaction.reset(token)
+        for handler, owner, name, old_value in transaction_.change_handlers.values():
+            value = getattr(owner, name)
+            if value != old_value:
+                handler(owner, value)
+
+
+def _propagate_in_order(sources: List[Tuple[Any, str]]) -> Set[Tuple[int, str]]:
+    """Propagate the values of the given sources, visiting each reachable property once in topological order.
+
+    The sources are expected in the order in which they have been changed.
+    Each value is tagged with the index of the source it originates from,
+    so that it does not overwrite a source which has been changed later.
+
+    :return: the keys of all processed properties
+    """
+    source_indices = {(id(obj), name): index for index, (obj, name) in enumerate(sources)}
+    dirty_indices = dict(source_indices)
+    processed_keys: Set[Tuple[int, str]] = set()
+    for obj, name in _sort_topologically(sources[::-1]):
+        key = (id(obj), name)
+        processed_keys.add(key)
+        if key not in dirty_indices or not _has_attribute(obj, name):
+            continue
+        index = dirty_indices[key]
+        value = _get_attribute(obj, name)
+        for _, target_obj, target_name, transform in bindings.get(key, []):
+            target_key = (id(target_obj), target_name)
+            if target_key in processed_keys or source_indices.get(target_key, -1) > index:
+                continue
+            target_value = transform(value) if transform else value
+            if not _has_attribute(target_obj, target_name) or _get_attribute(target_obj, target_name) != target_value:
+                _set_attribute(target_obj, target_name, target_value)
+                dirty_indices[target_key] = max(index, dirty_indices.get(target_key, -1))
+    return processed_keys
+
+
+def _sort_topologically(sources: List[Tuple[Any, str]]) -> List[Tuple[Any, str]]:
+    """Sort all properties reachable from the given sources so that each comes before the properties bound to it.
+
+    Cycles (e.g. from two-way bindings) are broken at the property which is reached first.
+    """
+    visited: Set[Tuple[int, str]] = set()
+    postorder: List[Tuple[Any, str]] = []
+    for source_obj, source_name in sources:
+        if (id(source_obj), source_name) in visited:
+            continue
+        visited.add((id(source_obj), source_name))
+        stack = [(source_obj, source_name, iter(bindings.get((id(source_obj), source_name), [])))]
+        while stack:
+            obj, name, targets = stack[-1]
+            for _, target_obj, target_name, _ in targets:
+                target_key = (id(target_obj), target_name)
+                if target_key not in visited:
+                    visited.add(target_key)
+                    stack.append((target_obj, target_name, iter(bindings.get(target_key, []))))
+                    break
+            else:
+                stack.pop()
+                postorder.append((obj, name))
+    return postorder[::-1]
+
+
 def bind_to(self_obj: Any, self_name: str, other_obj: Any, other_name: str,
-            forward: Optional[Callable[[Any], Any]] = None) -> None:
+            forward: Optional[Callable[[Any], Any]] = None, *,
+            refresh_interval: Optional[float] = None) -> None:
     """Bind the property of one object to the property of another object.
 
     The binding works one way only, from the first object to the second.
@@ -130,15 +408,15 @@ def bind_to(self_obj: Any, self_name: str, other_obj: Any, other_name: str,
     :param other_obj: The object to bind to.
     :param other_name: The name of the property to bind to.
     :param forward: A function to apply to the value before applying it (default: identity).
+    :param refresh_interval: Time between checks if the source has to be polled (default: ``binding_refresh_interval``).
     """
-    bindings[(id(self_obj), self_name)].append((self_obj, other_obj, other_name, forward))
-    if (id(self_obj), self_name) not in bindable_properties:
-        active_links.append((self_obj, self_name, other_obj, other_name, forward))
+    _add_link(self_obj, self_name, other_obj, other_name, forward, refresh_interval)
     _propagate(self_obj, self_name)
 
 
 def bind_from(self_obj: Any, self_name: str, other_obj: Any, other_name: str,
-              backward: Optional[Callable[[Any], Any]] = None) -> None:
+              backward: Optional[Callable[[Any], Any]] = None, *,
+              refresh_interval: Optional[float] = None) -> None:
     """Bind the property of one object from the property of another object.
 
     The binding works one way only, from the second object to the first.
@@ -149,16 +427,16 @@ def bind_from(self_obj: Any, self_name: str, other_obj: Any, other_name: str,
     :param other_obj: The object to bind from.
     :param other_name: The name of the property to bind from.
     :param backward: A function to apply to the value before applying it (default: identity).
+    :param refresh_interval: Time between checks if the source has to be polled (default: ``binding_refresh_interval``).
     """
-    bindings[(id(other_obj), other_name)].append((other_obj, self_obj, self_name, backward))
-    if (id(other_obj), other_name) not in bindable_properties:
-        active_links.append((other_obj, other_name, self_obj, self_name, backward))
+    _add_link(other_obj, other_name, self_obj, self_name, backward, refresh_interval)
     _propagate(other_obj, other_name)
 
 
 def bind(self_obj: Any, self_name: str, other_obj: Any, other_name: str, *,
          forward: Optional[Callable[[Any], Any]] = None,
-         backward: Optional[Callable[[Any], Any]] = None) -> None:
+         backward: Optional[Callable[[Any], Any]] = None,
+         refresh_interval: Optional[float] = None) -> None:
     """Bind the property of one object to the property of another object.
 
     The binding works both ways, from the first object to the second and from the second to the first.
@@ -171,9 +449,10 @@ def bind(self_obj: Any, self_name: str, other_obj: Any, other_name: str, *,
     :param other_name: The name of the second property to bind.
     :param forward: A function to apply to the value before applying it to the second object (default: identity).
     :param backward: A function to apply to the value before applying it to the first object (default: identity).
+    :param refresh_interval: Time between checks if a side has to be polled (default: ``binding_refresh_interval``).
     """
-    bind_from(self_obj, self_name, other_obj, other_name, backward=backward)
-    bind_to(self_obj, self_name, other_obj, other_name, forward=forward)
+    bind_from(self_obj, self_name, other_obj, other_name, backward=backward, refresh_interval=refresh_interval)
+    bind_to(self_obj, self_name, other_obj, other_name, forward=forward, refresh_interval=refresh_interval)
 
 
 class BindableProperty:
@@ -183,23 +462,43 @@ class BindableProperty:
 
     def __set_name__(self, _, name: str) -> None:
         self.name = name  # pylint: disable=attribute-defined-outside-init
+        self.attribute_name = '___' + name  # pylint: disable=attribute-defined-outside-init
 
     def __get__(self, owner: Any, _=None) -> Any:
-        return getattr(owner, '___' + self.name)
+        return getattr(owner, self.attribute_name)
 
     def __set__(self, owner: Any, value: Any) -> None:
-        has_attr = hasattr(owner, '___' + self.name)
+        has_attr = hasattr(owner, self.attribute_name)
         if not has_attr:
             _make_copyable(type(owner))
-        value_changed = has_attr and getattr(owner, '___' + self.name) != value
+        old_value = getattr(owner, self.attribute_name) if has_attr else None
+        value_changed = has_attr and old_value != value
         if has_attr and not value_changed:
             return
-        setattr(owner, '___' + self.name, value)
-        key = (id(owner), str(self.name))
-        bindable_properties[key] = owner
+        setattr(owner, self.attribute_name, value)
         _propagate(owner, self.name)
         if value_changed and self._change_handler is not None:
-            self._change_handler(owner, value)
+            transaction_ = current_transaction.get()
+            if transaction_ is None:
+                self._change_handler(owner, value)
+            else:
+                key = (id(owner), str(self.name))
+                transaction_.change_handlers.setdefault(key, (self._change_handler, owner, self.name, old_value))
+
+
+class BindableObject:
+    """Mixin for classes whose attributes should notify bindings immediately when they are set.
+
+    Unlike ``BindableProperty``, all attributes are observed without declaring them on the class.
+    Bindings from such objects are not polled by the refresh loop.
+
+    Note that changes to mutable attribute values (e.g. appending to a list) are not detected.
+    """
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if (id(self), name) in bindings:
+            _propagate(self, name)
 
 
 def remove(objects: Iterable[Any]) -> None:
@@ -207,23 +506,62 @@ def remove(objects: Iterable[Any]) -> None:
 
     :param objects: The objects to remove.
     """
+    objects = list(objects)
     object_ids = set(map(id, objects))
-    active_links[:] = [
-        (source_obj, source_name, target_obj, target_name, transform)
-        for source_obj, source_name, target_obj, target_name, transform in active_links
-        if id(source_obj) not in object_ids and id(target_obj) not in object_ids
-    ]
-    for key, binding_list in list(bindings.items()):
-        binding_list[:] = [
-            (source_obj, target_obj, target_name, transform)
-            for source_obj, target_obj, target_name, transform in binding_list
-            if id(source_obj) not in object_ids and id(target_obj) not in object_ids
-        ]
+    for obj_id in object_ids:
+        for link in list(_links_by_object.get(obj_id, {}).values()):
+            _remove_link(link)
+    keys = set().union(*(_binding_keys_by_object.pop(obj_id, set()) for obj_id in object_ids))
+    for key in keys:
+        binding_list = bindings.get(key)
+        if binding_list is None:
+            continue
+        removed: List[Binding] = []
+        kept: List[Binding] = []
+        for binding in binding_list:
+            is_removed = id(binding[0]) in object_ids or id(binding[1]) in object_ids
+            (removed if is_removed else kept).append(binding)
+        binding_list[:] = kept
+        remaining_ids = {id(obj) for source_obj, target_obj, _, _ in binding_list for obj in (source_obj, target_obj)}
+        for source_obj, target_obj, _, _ in removed:
+            for obj_id in (id(source_obj), id(target_obj)):
+                if obj_id not in remaining_ids and obj_id not in object_ids:
+                    _binding_keys_by_object[obj_id].discard(key)
+                    if not _binding_keys_by_object[obj_id]:
+                        del _binding_keys_by_object[obj_id]
         if not binding_list:
             del bindings[key]
-    for obj_id, name in list(bindable_properties):
-        if obj_id in object_ids:
-            del bindable_properties[(obj_id, name)]
+    for obj in objects:
+        for name in _get_bindable_property_names(type(obj)):
+            bindable_properties.pop((id(obj), name), None)
+        observed_names.pop(id(obj), None)
+
+
+def _remove_link(link: Link) -> None:
+    """Remove a link from ``active_links`` by swapping it with the last one."""
+    state = _link_states.pop(id(link))
+    state.active = False
+    last_link = active_links.pop()
+    if last_link is not link:
+        active_links[state.index] = last_link
+        _link_states[id(last_link)].index = state.index
+    for obj in (link[0], link[2]):
+        links = _links_by_object.get(id(obj))
+        if links is not None:
+            links.pop(id(link), None)
+            if not links:
+                del _links_by_object[id(obj)]
+
+
+def _get_bindable_property_names(cls: type) -> List[str]:
+    if cls not in _bindable_property_names:
+        _bindable_property_names[cls] = [
+            name
+            for base in cls.__mro__
+            for name, value in vars(base).items()
+            if isinstance(value, BindableProperty)
+        ]
+    return _bindable_property_names[cls]
 
 
 def reset() -> None:
@@ -234,6 +572,12 @@ def reset() -> None:
     bindings.clear()
     bindable_properties.clear()
     active_links.clear()
+    observed_collections.clear()
+    observed_names.clear()
+    _binding_keys_by_object.clear()
+    _links_by_object.clear()
+    _link_states.clear()
+    _refresh_queue.clear()
 
 
 @dataclass_transform()
@@ -248,10 +592,14 @@ def bindable_dataclass(cls: Optional[TC] = None, /, *,
 
     *Added in version 2.11.0*
 
+    *Updated in version 2.23.0: Added support for ``slots=True``.*
+
     :param cls: class to be transformed into a dataclass
     :param bindable_fields: optional list of field names to make bindable (defaults to all fields)
     :param kwargs: optional keyword arguments to be forwarded to ``dataclasses.dataclass``.
-    Usage of ``slots=True`` and ``frozen=True`` are not supported and will raise a ValueError.
+    Usage of ``frozen=True`` is not supported and will raise a ValueError.
+    With ``slots=True`` the values of bindable fields are stored in generated slots named ``_bindable_<field>``
+    (also on Python 3.8 and 3.9).
 
     :return: resulting dataclass type
     """
@@ -260,30 +608,58 @@ def bindable_dataclass(cls: Optional[TC] = None, /, *,
             return bindable_dataclass(cls_, bindable_fields=bindable_fields, **kwargs)
         return wrap
 
-    for unsupported_option in ('slots', 'frozen'):
-        if kwargs.get(unsupported_option):
-            raise ValueError(f'`{unsupported_option}=True` is not supported with bindable_dataclass')
+    if kwargs.get('frozen'):
+        raise ValueError('`frozen=True` is not supported with bindable_dataclass')
+    slots = kwargs.pop('slots', False)
 
     dataclass: Type[DataclassInstance] = dataclasses.dataclass(**kwargs)(cls)
-    field_names = set(field.name for field in dataclasses.fields(dataclass))
+    field_names = [field.name for field in dataclasses.fields(dataclass)]
     if bindable_fields is None:
         bindable_fields = field_names
+    bindable_fields = list(bindable_fields)
     for field_name in bindable_fields:
         if field_name not in field_names:
             raise ValueError(f'"{field_name}" is not a dataclass field')
+    if slots:
+        dataclass = _add_slots(dataclass, field_names, bindable_fields)
+    for field_name in bindable_fields:
         bindable_property = BindableProperty()
         bindable_property.__set_name__(dataclass, field_name)
+        if slots:
+            bindable_property.attribute_name = f'_bindable_{field_name}'
         setattr(dataclass, field_name, bindable_property)
     return dataclass
 
 
+def _add_slots(cls: Type[T], field_names: List[str], bindable_fields: List[str]) -> Type[T]:
+    """Recreate a dataclass with slots for the plain fields and for the values of the bindable fields.
+
+    Like ``dataclasses.dataclass(slots=True)``, but the bindable fields need a slot with a different name,
+    because their names are taken by the ``BindableProperty`` descriptors.
+    A ``__weakref__`` slot is added, because ``bindable_properties`` holds weak references to the instances.
+    """
+    cls_dict = dict(cls.__dict__)
+    cls_dict['__slots__'] = tuple(
+        [name for name in field_names if name not in bindable_fields] +
+        [f'_bindable_{name}' for name in bindable_fields] +
+        ([] if any(hasattr(base, '__weakref__') for base in cls.__bases__) else ['__weakref__'])
+    )
+    for name in field_names:
+        cls_dict.pop(name, None)  # NOTE: defaults are already part of the generated __init__
+    cls_dict.pop('__dict__', None)
+    cls_dict.pop('__weakref__', None)
+    slotted_cls = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+    slotted_cls.__qualname__ = cls.__qualname__
+    return slotted_cls
+
+
 def _make_copyable(cls: Type[T]) -> None:
     """Tell the copy module to update the ``bindable_properties`` dictionary when an object is copied."""
     if cls in copyreg.dispatch_table:
         return
 
     def _pickle_function(obj: T) -> Tuple[Callable[..., T], Tuple[Any, ...]]:
-        reduced = obj.__reduce__()
+        reduced = obj.__reduce_ex__(4)  # NOTE: unlike __reduce__, this also works for classes with __slots__
         assert isinstance(reduced, tuple)
         creator = reduced[0]
 
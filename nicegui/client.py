@@ -1,13 +1,27 @@
 from __future__ import annotations
 
 import asyncio
+import heapq
 import inspect
 import time
 import uuid
 from collections import defaultdict
 from contextlib import contextmanager
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Awaitable, Callable, ClassVar, Dict, Iterable, Iterator, List, Optional, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    ClassVar,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 from fastapi import Request
 from fastapi.responses import Response
@@ -40,6 +54,9 @@ class Client:
     instances: ClassVar[Dict[str, Client]] = {}
     '''Maps client IDs to clients.'''
 
+    _unconnected: ClassVar[List[Tuple[float, str]]] = []
+    '''Heap of creation times and IDs of non-shared clients which are deleted if they do not connect in time.'''
+
     auto_index_client: Client
     '''The client that is used to render the auto-index page.'''
 
@@ -54,6 +71,8 @@ class Client:
         self.id = str(uuid.uuid4())
         self.created = time.time()
         self.instances[self.id] = self
+        if request is not None:
+            heapq.heappush(self._unconnected, (self.created, self.id))
 
         self.elements: Dict[int, Element] = {}
         self.next_element_id: int = 0
@@ -130,6 +149,7 @@ class Client:
     def build_response(self, request: Request, status_code: int = 200) -> Response:
         """为客户端构建 FastAPI 响应。"""
         self.outbox.updates.clear()
+        self.outbox.element_states.clear()
         prefix = request.headers.get('X-Forwarded-Prefix', request.scope.get('root_path', ''))
         elements = json.dumps({
             id: element._to_dict() for id, element in self.elements.items()  # pylint: disable=protected-access
@@ -172,6 +192,7 @@ class Client:
                 'socket_io_js_query_params': socket_io_js_query_params,
                 'socket_io_js_extra_headers': core.app.config.socket_io_js_extra_headers,
                 'socket_io_js_transports': core.app.config.socket_io_js_transports,
+                'message_format': core.app.config.message_format,
             },
             status_code=status_code,
             headers={'Cache-Control': 'no-store', 'X-NiceGUI-Content': 'page'},
@@ -201,7 +222,8 @@ class Client:
             await asyncio.sleep(check_interval)
         self.is_waiting_for_disconnect = False
 
-    def run_javascript(self, code: str, *, timeout: float = 1.0) -> AwaitableResponse:
+    def run_javascript(self, code: str, *, timeout: float = 1.0,
+                       supersede_key: Optional[str] = None) -> AwaitableResponse:
         """在客户端上执行 JavaScript。
 
         调用此方法之前必须建立客户端连接。
@@ -212,6 +234,7 @@ class Client:
 
         :param code: 要运行的 JavaScript 代码
         :param timeout: 超时时间（秒）（默认：`1.0`）
+        :param supersede_key: 如果不等待结果，具有相同键的尚未发送的调用将被此调用取代并丢弃（默认：`None`）
 
         :return: 可以等待以获取 JavaScript 代码结果的 AwaitableResponse
         """
@@ -219,7 +242,7 @@ class Client:
         target_id = self._temporary_socket_id or self.id
 
         def send_and_forget():
-            self.outbox.enqueue_message('run_javascript', {'code': code}, target_id)
+            self.outbox.enqueue_message('run_javascript', {'code': code}, target_id, key=supersede_key)
 
         async def send_and_wait():
             if self is self.auto_index_client:
@@ -252,8 +275,12 @@ class Client:
         self._socket_to_document_id[socket_id] = document_id
         self._cancel_delete_task(document_id)
         self._num_connections[document_id] += 1
-        if next_message_id is not None:
+        if self.shared:
+            # NOTE: shared clients keep no history and other tabs may have received patches this tab does not know
+            self.outbox.resync()
+        elif next_message_id is not None:
             self.outbox.try_rewind(next_message_id)
+        self.outbox.schedule()
         storage.request_contextvar.set(self.request)
         for t in self.connect_handlers:
             self.safe_invoke(t)
@@ -373,17 +400,21 @@ class Client:
         """在无限循环中清理过期的客户端。"""
         while True:
             try:
-                stale_clients = [
-                    client
-                    for client in cls.instances.values()
-                    if not client.shared and not client.has_socket_connection and client.created < time.time() - 60.0
-                ]
-                for client in stale_clients:
-                    client.delete()
+                cls._prune_unconnected()
             except Exception:
                 # NOTE: make sure the loop doesn't crash
                 log.exception('清理客户端时出错')
             try:
-                await asyncio.sleep(10)
+                await asyncio.sleep(max(1.0, min(10.0, core.app.config.unconnected_client_timeout)))
             except asyncio.CancelledError:
                 break
+
+    @classmethod
+    def _prune_unconnected(cls) -> None:
+        """删除在 `unconnected_client_timeout` 内未建立连接的客户端，例如爬虫和健康检查的页面请求。"""
+        deadline = time.time() - core.app.config.unconnected_client_timeout
+        while cls._unconnected and cls._unconnected[0][0] < deadline:
+            _, client_id = heapq.heappop(cls._unconnected)
+            client = cls.instances.get(client_id)
+            if client is not None and not client.has_socket_connection:
+                client.delete()
@@ -46,6 +46,8 @@ class Element(Visibility):
     _default_props: ClassVar[Dict[str, Any]] = {}
     _default_classes: ClassVar[List[str]] = []
     _default_style: ClassVar[Dict[str, str]] = {}
+    _serialized_component: ClassVar[Optional[Dict[str, str]]] = None
+    _serialized_libraries: ClassVar[List[Dict[str, str]]] = []
 
     def __init__(self, tag: Optional[str] = None, *, _client: Optional[Client] = None) -> None:
         """通用元素
@@ -69,6 +71,7 @@ class Element(Visibility):
         self._props: Props[Self] = Props(self._default_props, element=cast(Self, self))
         self._markers: List[str] = []
         self._event_listeners: Dict[str, EventListener] = {}
+        self._serialized_events: Optional[List[Dict[str, Any]]] = None
         self._text: Optional[str] = None
         self.slots: Dict[str, Slot] = {}
         self.default_slot = self.add_slot('default')
@@ -141,6 +144,13 @@ class Element(Visibility):
             for path in glob_absolute_paths(library):
                 cls.exposed_libraries.append(register_library(path, expose=True, max_time=max_time))
 
+        cls._serialized_component = {
+            'key': cls.component.key,
+            'name': cls.component.name,
+            'tag': cls.component.tag,
+        } if cls.component else None
+        cls._serialized_libraries = [{'key': library.key, 'name': library.name} for library in cls.libraries]
+
         cls._default_props = copy(cls._default_props)
         cls._default_classes = copy(cls._default_classes)
         cls._default_style = copy(cls._default_style)
@@ -216,6 +226,11 @@ class Element(Visibility):
             if slot != self.default_slot
         }
 
+    def _collect_event_list(self) -> List[Dict[str, Any]]:
+        if self._serialized_events is None:
+            self._serialized_events = [listener.to_dict() for listener in self._event_listeners.values()]
+        return self._serialized_events
+
     def _to_dict(self) -> Dict[str, Any]:
         return {
             'tag': self.tag,
@@ -228,19 +243,10 @@ class Element(Visibility):
                     'props': self._props,
                     'slots': self._collect_slot_dict(),
                     'children': [child.id for child in self.default_slot.children],
-                    'events': [listener.to_dict() for listener in self._event_listeners.values()],
+                    'events': self._collect_event_list(),
                     'update_method': self._update_method,
-                    'component': {
-                        'key': self.component.key,
-                        'name': self.component.name,
-                        'tag': self.component.tag
-                    } if self.component else None,
-                    'libraries': [
-                        {
-                            'key': library.key,
-                            'name': library.name,
-                        } for library in self.libraries
-                    ],
+                    'component': self._serialized_component,
+                    'libraries': self._serialized_libraries,
                 }.items()
                 if value
             },
@@ -407,6 +413,7 @@ class Element(Visibility):
                 request=storage.request_contextvar.get(),
             )
             self._event_listeners[listener.id] = listener
+            self._serialized_events = None
             self.update()
         return self
 
@@ -422,7 +429,7 @@ class Element(Visibility):
             return
         self.client.outbox.enqueue_update(self)
 
-    def run_method(self, name: str, *args: Any, timeout: float = 1) -> AwaitableResponse:
+    def run_method(self, name: str, *args: Any, timeout: float = 1, supersede: bool = False) -> AwaitableResponse:
         """在客户端运行方法。
 
         如果函数被等待，将返回方法调用的结果。
@@ -431,10 +438,12 @@ class Element(Visibility):
         :param name: 方法名称
         :param args: 传递给方法的参数
         :param timeout: 等待响应的最大时间（默认：1 秒）
+        :param supersede: 是否丢弃尚未发送的对同一方法的调用，例如当客户端跟不上时（默认：`False`）
         """
         if not core.loop:
             return NullResponse()
-        return self.client.run_javascript(f'return runMethod({self.id}, "{name}", {json.dumps(args)})', timeout=timeout)
+        return self.client.run_javascript(f'return runMethod({self.id}, "{name}", {json.dumps(args)})', timeout=timeout,
+                                          supersede_key=f'{self.id}.{name}' if supersede else None)
 
     def get_computed_prop(self, prop_name: str, *, timeout: float = 1) -> AwaitableResponse:
         """返回计算属性。
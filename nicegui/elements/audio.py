@@ -40,7 +40,7 @@ class Audio(SourceElement, component='audio.js'):
 
         :param seconds: 位置（秒）
         """
-        self.run_method('seek', seconds)
+        self.run_method('seek', seconds, supersede=True)
 
     def play(self) -> None:
         """播放音频。"""
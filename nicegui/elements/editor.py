@@ -30,4 +30,4 @@ class Editor(ValueElement, DisableableElement, component='editor.js', default_cl
     def _handle_value_change(self, value: Any) -> None:
         super()._handle_value_change(value)
         if self._send_update_on_value_change:
-            self.run_method('updateValue')
+            self.run_method('updateValue', supersede=True)
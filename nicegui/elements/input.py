@@ -73,4 +73,4 @@ class Input(LabelElement, ValidationElement, DisableableElement, component='inpu
     def _handle_value_change(self, value: Any) -> None:
         super()._handle_value_change(value)
         if self._send_update_on_value_change:
-            self.run_method('updateValue')
+            self.run_method('updateValue', supersede=True)
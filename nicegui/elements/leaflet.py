@@ -105,10 +105,10 @@ class Leaflet(Element, component='leaflet.js', default_classes='nicegui-leaflet'
         self.zoom = e.args['zoom']
         self._send_update_on_value_change = True
 
-    def run_method(self, name: str, *args: Any, timeout: float = 1) -> AwaitableResponse:
+    def run_method(self, name: str, *args: Any, timeout: float = 1, supersede: bool = False) -> AwaitableResponse:
         if not self.is_initialized:
             return NullResponse()
-        return super().run_method(name, *args, timeout=timeout)
+        return super().run_method(name, *args, timeout=timeout, supersede=supersede)
 
     def set_center(self, center: Tuple[float, float]) -> None:
         """设置地图的中心位置。"""
@@ -33,4 +33,4 @@ class Mermaid(ContentElement,
 
     def _handle_content_change(self, content: str) -> None:
         self._props[self.CONTENT_PROP] = content.strip()
-        self.run_method('update', content.strip())
+        self.run_method('update', content.strip(), supersede=True)
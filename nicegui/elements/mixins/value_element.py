@@ -126,6 +126,8 @@ class ValueElement(Element):
         self._props[self.VALUE_PROP] = self._value_to_model_value(value)
         if self._send_update_on_value_change:
             self.update()
+        else:
+            self.client.outbox.forget_props(self, self.VALUE_PROP)
         args = ValueChangeEventArguments(sender=self, client=self.client, value=self._value_to_event_value(value))
         for handler in self._change_handlers:
             handle_event(handler, args)
@@ -40,7 +40,7 @@ class Video(SourceElement, component='video.js'):
 
         :param seconds: 位置（秒）
         """
-        self.run_method('seek', seconds)
+        self.run_method('seek', seconds, supersede=True)
 
     def play(self) -> None:
         """播放视频。"""
@@ -14,6 +14,7 @@ from typing import (
     List,
     Literal,
     Optional,
+    Set,
     TypeVar,
     Union,
     cast,
@@ -39,6 +40,7 @@ class EventArguments:
 @dataclass(**KWONLY_SLOTS)
 class ObservableChangeEventArguments(EventArguments):
     sender: ObservableCollection
+    keys: Optional[Set[Any]] = None  # NOTE: changed keys or indices of the sender, None if unknown (e.g. after sorting)
 
 
 @dataclass(**KWONLY_SLOTS)
@@ -28,6 +28,11 @@ def dumps(obj: Any,
         cls=NumpyJsonEncoder)
 
 
+def dumps_bytes(obj: Any) -> bytes:
+    """Serializes a Python object to JSON-encoded UTF-8 bytes."""
+    return dumps(obj).encode()
+
+
 def loads(value: str) -> Any:
     """Deserialize a JSON-encoded string to a corresponding Python object/value.
 
@@ -40,6 +40,14 @@ def dumps(obj: Any,
     return orjson.dumps(obj, option=opts, default=_orjson_converter).decode('utf-8')
 
 
+def dumps_bytes(obj: Any) -> bytes:
+    """Serializes a Python object to JSON-encoded UTF-8 bytes without decoding them into a string.
+
+    Uses package `orjson` internally.
+    """
+    return orjson.dumps(obj, option=ORJSON_OPTS, default=_orjson_converter)
+
+
 def loads(value: str) -> Any:
     """Deserialize a JSON-encoded string to a corresponding Python object/value.
 
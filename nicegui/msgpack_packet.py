@@ -0,0 +1,77 @@
+"""
+MessagePack wire format for socket.io traffic.
+
+This is an opt-in alternative to JSON text frames (see `message_format` in `ui.run`).
+Messages are sent as binary frames and decoded by `static/msgpack-parser.js`.
+NumPy arrays with a numeric dtype are sent as raw little-endian buffers and arrive as typed arrays in the browser,
+so that large plots and point clouds do not have to be formatted as decimal text.
+"""
+
+import importlib.util
+from typing import Any, Dict, Type
+
+from socketio import packet
+
+from . import json, optional_features
+
+try:
+    import msgpack
+    optional_features.register('msgpack')
+except ImportError:
+    pass
+
+HAS_NUMPY = importlib.util.find_spec('numpy') is not None
+
+TYPED_ARRAY_CODES: Dict[str, int] = {
+    'int8': 1,
+    'uint8': 2,
+    'int16': 3,
+    'uint16': 4,
+    'int32': 5,
+    'uint32': 6,
+    'float32': 7,
+    'float64': 8,
+}
+'''MessagePack extension type codes of NumPy dtypes, which are decoded into JavaScript typed arrays of the same type.'''
+
+
+def create_packet_class() -> Type[packet.Packet]:
+    """Create a socket.io packet class that encodes packets with MessagePack."""
+    if not optional_features.has('msgpack'):
+        raise ImportError('MessagePack is not installed. Please run "pip install nicegui[msgpack]".')
+    from socketio.msgpack_packet import MsgPackPacket  # pylint: disable=import-outside-toplevel
+
+    class NiceGUIMsgPackPacket(MsgPackPacket):
+        # NOTE: MsgPackPacket.configure() is not available before python-socketio 5.12
+        def encode(self) -> bytes:
+            return dumps(self._to_dict())  # pylint: disable=protected-access
+
+    return NiceGUIMsgPackPacket
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize an object with MessagePack the same way as socket.io packets."""
+    return msgpack.packb(obj, default=_default)
+
+
+def loads(data: bytes) -> Any:
+    """Deserialize MessagePack data, e.g. a message that has been serialized with `dumps`."""
+    return msgpack.unpackb(data, strict_map_key=False)
+
+
+def _default(obj: Any) -> Any:
+    """Convert objects which MessagePack can not serialize, e.g. NumPy arrays."""
+    if HAS_NUMPY:
+        import numpy as np  # pylint: disable=import-outside-toplevel
+        if isinstance(obj, np.ndarray) and obj.ndim > 0:
+            if obj.ndim > 1:
+                return list(obj)  # NOTE: nested arrays are converted row by row
+            code = TYPED_ARRAY_CODES.get(obj.dtype.name)
+            if code is None and obj.dtype.kind in 'iuf':  # e.g. int64, which has no typed array of JavaScript numbers
+                obj, code = obj.astype(np.float64), TYPED_ARRAY_CODES['float64']
+            if code is not None:
+                return msgpack.ExtType(code, obj.astype(obj.dtype.newbyteorder('<'), copy=False).tobytes())
+        if isinstance(obj, np.generic) and obj.dtype.kind in 'biuf':
+            return obj.item()
+    # NOTE: everything else (dates, decimals, object arrays, ...) is converted the same way as for JSON messages
+    return json.loads(json.dumps(obj))
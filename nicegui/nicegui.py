@@ -9,13 +9,14 @@ import socketio
 from fastapi import HTTPException, Request
 from fastapi.responses import FileResponse, Response
 
-from . import air, background_tasks, binding, core, favicon, helpers, json, run, welcome
+from . import air, background_tasks, binding, core, favicon, helpers, json, msgpack_packet, run, welcome
 from .app import App
 from .client import Client
 from .dependencies import dynamic_resources, js_components, libraries, resources
 from .error import error_content
 from .json import NiceGUIJSONResponse
 from .logging import log
+from .outbox import Outbox
 from .page import page
 from .slot import Slot
 from .staticfiles import CacheControlledStaticFiles
@@ -121,6 +122,10 @@ async def _startup() -> None:
     # NOTE ping interval and timeout need to be lower than the reconnect timeout, but can't be too low
     sio.eio.ping_interval = max(app.config.reconnect_timeout * 0.8, 4)
     sio.eio.ping_timeout = max(app.config.reconnect_timeout * 0.4, 2)
+    if app.config.message_format == 'msgpack':
+        sio.packet_class = msgpack_packet.create_packet_class()
+    else:
+        sio.packet_class = socketio.packet.Packet
     if core.app.config.favicon:
         if helpers.is_file(core.app.config.favicon):
             app.add_route('/favicon.ico', lambda _: FileResponse(core.app.config.favicon))  # type: ignore
@@ -131,10 +136,12 @@ async def _startup() -> None:
     core.loop = asyncio.get_running_loop()
     run.setup()
     app.start()
+    background_tasks.create(Outbox.loop(), name='outbox loop')
     background_tasks.create(binding.refresh_loop(), name='refresh bindings')
     background_tasks.create(Client.prune_instances(), name='prune clients')
     background_tasks.create(Slot.prune_stacks(), name='prune slot stacks')
     background_tasks.create(core.app.storage.prune_tab_storage(), name='prune tab storage')
+    background_tasks.create(core.app.storage.prune_user_storage(), name='prune user storage')
     air.connect()
 
 
@@ -169,7 +176,7 @@ async def _on_handshake(sid: str, data: Dict[str, Any]) -> bool:
     if not client:
         return False
     if data.get('old_tab_id'):
-        app.storage.copy_tab(data['old_tab_id'], data['tab_id'])
+        await app.storage.copy_tab(data['old_tab_id'], data['tab_id'])
     client.tab_id = data['tab_id']
     if sid[:5].startswith('test-'):
         client.environ = {'asgi.scope': {'description': 'test client', 'type': 'test'}}
@@ -213,4 +220,4 @@ def _on_ack(_: str, msg: Dict) -> None:
     client = Client.instances.get(msg['client_id'])
     if not client:
         return
-    client.outbox.prune_history(msg['next_message_id'])
+    client.outbox.handle_ack(msg['next_message_id'])
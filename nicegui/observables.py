@@ -1,25 +1,113 @@
 from __future__ import annotations
 
 import abc
+import asyncio
 import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 from copy import deepcopy
-from typing import Any, Callable, Collection, Dict, Iterable, List, Optional, Set, SupportsIndex, Union
+from dataclasses import dataclass, field
+from typing import Any, Callable, Collection, Dict, Iterable, Iterator, List, Optional, Set, SupportsIndex, Tuple, Union
 
 from typing_extensions import Self
 
 from . import events
 
 
-class ObservableCollection(abc.ABC):  # noqa: B024
+@dataclass
+class _PendingChanges:
+    root: ObservableCollection
+    senders: Dict[int, Tuple[ObservableCollection, Optional[Set[Any]]]] = field(default_factory=dict)
+
+    def add(self, sender: ObservableCollection, keys: Optional[Iterable[Any]]) -> None:
+        if id(sender) not in self.senders:
+            self.senders[id(sender)] = (sender, set())
+        sender_keys = self.senders[id(sender)][1]
+        if sender_keys is not None:
+            self.senders[id(sender)] = (sender, None if keys is None else sender_keys.union(keys))
+
+    def root_keys(self) -> Optional[Set[Any]]:
+        """Get the keys of the root collection which contain all changes (``None`` if unknown)."""
+        keys: Set[Any] = set()
+        for sender, sender_keys in self.senders.values():
+            if sender is self.root:
+                if sender_keys is None:
+                    return None
+                keys.update(sender_keys)
+                continue
+            child = sender
+            while child._parent is not None and child._parent is not self.root:  # pylint: disable=protected-access
+                child = child._parent  # pylint: disable=protected-access
+            if isinstance(self.root, dict):
+                keys.update(key for key, value in dict.items(self.root) if value is child)
+            elif isinstance(self.root, list):
+                keys.update(i for i, value in enumerate(list.__iter__(self.root)) if value is child)
+            else:
+                return None
+        return keys
+
+
+_batch: ContextVar[Optional[Dict[int, _PendingChanges]]] = ContextVar('observables_batch', default=None)
+_deferred_changes: Dict[int, _PendingChanges] = {}
+
+
+@contextmanager
+def batch() -> Iterator[None]:
+    """Collect the changes of all observable collections and notify the change handlers when leaving the context.
+
+    Each change handler is called once per root collection, with the root as sender
+    and the keys (or indices) of the root which contain the changes.
+    Nested batches are merged into the outermost one.
+    """
+    if _batch.get() is not None:
+        yield
+        return
+    pending: Dict[int, _PendingChanges] = {}
+    token = _batch.set(pending)
+    try:
+        yield
+    finally:
+        _batch.reset(token)
+        _notify(pending)
+
+
+def _flush_deferred_changes() -> None:
+    pending = dict(_deferred_changes)
+    _deferred_changes.clear()
+    _notify(pending)
+
+
+def _notify(pending: Dict[int, _PendingChanges]) -> None:
+    for changes in pending.values():
+        handlers: Dict[int, Callable] = {}
+        for sender, _ in changes.senders.values():
+            for handler in sender.change_handlers:
+                handlers.setdefault(id(handler), handler)
+        arguments = events.ObservableChangeEventArguments(sender=changes.root, keys=changes.root_keys())
+        for handler in handlers.values():
+            events.handle_event(handler, arguments)
+
+
+def _is_loop_running() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+class ObservableCollection(abc.ABC):
 
     def __init__(self, *,
                  factory: Callable,
                  data: Optional[Collection],
                  on_change: Optional[Callable],
+                 deferred: bool = False,
                  _parent: Optional[ObservableCollection],
                  ) -> None:
         super().__init__(factory() if data is None else data)  # type: ignore
         self._parent = _parent
+        self._deferred = deferred
         self.last_modified = time.time()
         self._change_handlers: List[Callable] = [on_change] if on_change else []
 
@@ -31,19 +119,57 @@ class ObservableCollection(abc.ABC):  # noqa: B024
             change_handlers.extend(self._parent.change_handlers)
         return change_handlers
 
-    def _handle_change(self) -> None:
+    @property
+    def root(self) -> ObservableCollection:
+        """The outermost collection this collection is nested in (or the collection itself)."""
+        return self if self._parent is None else self._parent.root
+
+    def _handle_change(self, keys: Optional[Iterable[Any]] = None) -> None:
+        """Notify the change handlers about changes of the given keys or indices (``None`` if unknown)."""
         self.last_modified = time.time()
+        pending = _batch.get()
+        if pending is None:
+            root = self.root
+            if root._deferred and _is_loop_running():  # pylint: disable=protected-access
+                if not _deferred_changes:
+                    asyncio.get_running_loop().call_soon(_flush_deferred_changes)
+                pending = _deferred_changes
+        if pending is not None:
+            root = self.root
+            if id(root) not in pending:
+                pending[id(root)] = _PendingChanges(root)
+            pending[id(root)].add(self, keys)
+            return
+        arguments = events.ObservableChangeEventArguments(sender=self, keys=None if keys is None else set(keys))
         for handler in self.change_handlers:
-            events.handle_event(handler, events.ObservableChangeEventArguments(sender=self))
+            events.handle_event(handler, arguments)
 
     def on_change(self, handler: Callable) -> None:
         """Register a handler to be called when the collection changes."""
         self._change_handlers.append(handler)
 
     def _observe(self, data: Any) -> Any:
+        """Prepare a value for being stored in this collection.
+
+        Nested observable collections notify this collection about their changes.
+        Plain dicts, lists and sets are copied, so that later changes of the original do not bypass this collection.
+        The copy is only wrapped into an observable collection when it is accessed (see ``_wrap``).
+        """
         if isinstance(data, ObservableCollection):
             data.on_change(self._handle_change)
             return data
+        if isinstance(data, dict):
+            return dict(data)
+        if isinstance(data, list):
+            return list(data)
+        if isinstance(data, set):
+            return set(data)
+        return data
+
+    def _wrap(self, data: Any) -> Any:
+        """Wrap a plain dict, list or set into an observable collection which notifies this collection."""
+        if isinstance(data, ObservableCollection):
+            return data
         if isinstance(data, dict):
             return ObservableDict(data, _parent=self)
         if isinstance(data, list):
@@ -52,20 +178,25 @@ class ObservableCollection(abc.ABC):  # noqa: B024
             return ObservableSet(data, _parent=self)
         return data
 
+    @abc.abstractmethod
+    def _wrap_all(self) -> None:
+        """Wrap all plain values of this collection, e.g. before they are iterated."""
+
     def __copy__(self) -> Self:
+        self._wrap_all()  # NOTE: the copy has to share the wrappers, not the plain values which are wrapped later
         if isinstance(self, dict):
             return ObservableDict(self, _parent=self._parent)
         if isinstance(self, list):
-            return ObservableList(self, _parent=self._parent)
+            return ObservableList(list.copy(self), _parent=self._parent)
         if isinstance(self, set):
             return ObservableSet(self, _parent=self._parent)
         raise NotImplementedError(f'ObservableCollection.__copy__ not implemented for {type(self)}')
 
     def __deepcopy__(self, memo: Dict) -> Self:
         if isinstance(self, dict):
-            return ObservableDict({key: deepcopy(self[key]) for key in self}, _parent=self._parent)
+            return ObservableDict({key: deepcopy(value) for key, value in dict.items(self)}, _parent=self._parent)
         if isinstance(self, list):
-            return ObservableList([deepcopy(item) for item in self], _parent=self._parent)
+            return ObservableList([deepcopy(item) for item in list.__iter__(self)], _parent=self._parent)
         if isinstance(self, set):
             return ObservableSet({deepcopy(item) for item in self}, _parent=self._parent)
         raise NotImplementedError(f'ObservableCollection.__deepcopy__ not implemented for {type(self)}')
@@ -77,42 +208,76 @@ class ObservableDict(ObservableCollection, dict):
                  data: Optional[Dict] = None,
                  *,
                  on_change: Optional[Callable] = None,
+                 deferred: bool = False,
                  _parent: Optional[ObservableCollection] = None,
                  ) -> None:
-        super().__init__(factory=dict, data=data, on_change=on_change, _parent=_parent)
-        for key, value in self.items():
+        super().__init__(factory=dict, data=data, on_change=on_change, deferred=deferred, _parent=_parent)
+        for key, value in dict.items(self):
             super().__setitem__(key, self._observe(value))
 
+    def _wrap_all(self) -> None:
+        for key, value in list(dict.items(self)):
+            wrapped = self._wrap(value)
+            if wrapped is not value:
+                super().__setitem__(key, wrapped)
+
+    def __getitem__(self, __key: Any) -> Any:
+        value = super().__getitem__(__key)
+        wrapped = self._wrap(value)
+        if wrapped is not value:
+            super().__setitem__(__key, wrapped)
+        return wrapped
+
+    def __iter__(self) -> Iterator[Any]:
+        # NOTE: overriding __iter__ makes dict(...) and {**...} read the values via __getitem__, which wraps them
+        return super().__iter__()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        return self[key] if key in self else default
+
+    def values(self) -> Any:
+        self._wrap_all()
+        return super().values()
+
+    def items(self) -> Any:
+        self._wrap_all()
+        return super().items()
+
+    def copy(self) -> Dict:
+        self._wrap_all()
+        return super().copy()
+
     def pop(self, k: Any, d: Any = None) -> Any:
         item = super().pop(k, d)
-        self._handle_change()
+        self._handle_change([k])
         return item
 
     def popitem(self) -> Any:
         item = super().popitem()
-        self._handle_change()
+        self._handle_change([item[0]])
         return item
 
     def update(self, *args: Any, **kwargs: Any) -> None:
-        super().update(self._observe(dict(*args, **kwargs)))
-        self._handle_change()
+        data = dict(*args, **kwargs)
+        super().update({key: self._observe(value) for key, value in data.items()})
+        self._handle_change(data)
 
     def clear(self) -> None:
         super().clear()
         self._handle_change()
 
     def setdefault(self, __key: Any, __default: Any = None) -> Any:
-        item = super().setdefault(__key, self._observe(__default))
-        self._handle_change()
-        return item
+        super().setdefault(__key, self._observe(__default))
+        self._handle_change([__key])
+        return self[__key]
 
     def __setitem__(self, __key: Any, __value: Any) -> None:
         super().__setitem__(__key, self._observe(__value))
-        self._handle_change()
+        self._handle_change([__key])
 
     def __delitem__(self, __key: Any) -> None:
         super().__delitem__(__key)
-        self._handle_change()
+        self._handle_change([__key])
 
     def __or__(self, other: Any) -> Any:
         try:
@@ -121,12 +286,12 @@ class ObservableDict(ObservableCollection, dict):
             return ObservableDict({**self, **other})  # NOTE: remove this when switching to Python 3.9
 
     def __ior__(self, other: Any) -> Any:
-        other_dict = self._observe(dict(other))
+        other_dict = {key: self._observe(value) for key, value in dict(other).items()}
         try:
             super().__ior__(other_dict)  # type: ignore # pylint: disable=no-member
         except TypeError:
             self.update(other_dict)  # NOTE: remove this when switching to Python 3.9
-        self._handle_change()
+        self._handle_change(other_dict)
         return self
 
 
@@ -136,19 +301,50 @@ class ObservableList(ObservableCollection, list):
                  data: Optional[List] = None,
                  *,
                  on_change: Optional[Callable] = None,
+                 deferred: bool = False,
                  _parent: Optional[ObservableCollection] = None,
                  ) -> None:
-        super().__init__(factory=list, data=data, on_change=on_change, _parent=_parent)
-        for i, item in enumerate(self):
+        super().__init__(factory=list, data=data, on_change=on_change, deferred=deferred, _parent=_parent)
+        for i, item in enumerate(list.__iter__(self)):
             super().__setitem__(i, self._observe(item))
 
+    def _wrap_all(self) -> None:
+        for i, item in enumerate(list.__iter__(self)):
+            wrapped = self._wrap(item)
+            if wrapped is not item:
+                super().__setitem__(i, wrapped)
+
+    def __getitem__(self, key: Union[SupportsIndex, slice]) -> Any:  # type: ignore[override]
+        if isinstance(key, slice):
+            for i in range(*key.indices(len(self))):
+                self[i]  # pylint: disable=pointless-statement
+            return super().__getitem__(key)
+        item = super().__getitem__(key)
+        wrapped = self._wrap(item)
+        if wrapped is not item:
+            super().__setitem__(key, wrapped)
+        return wrapped
+
+    def __iter__(self) -> Iterator[Any]:
+        self._wrap_all()
+        return super().__iter__()
+
+    def __reversed__(self) -> Iterator[Any]:
+        self._wrap_all()
+        return super().__reversed__()
+
+    def copy(self) -> List:
+        self._wrap_all()
+        return super().copy()
+
     def append(self, item: Any) -> None:
         super().append(self._observe(item))
-        self._handle_change()
+        self._handle_change([len(self) - 1])
 
     def extend(self, iterable: Iterable) -> None:
-        super().extend(self._observe(list(iterable)))
-        self._handle_change()
+        length = len(self)
+        super().extend([self._observe(item) for item in iterable])
+        self._handle_change(range(length, len(self)))
 
     def insert(self, index: SupportsIndex, obj: Any) -> None:
         super().insert(index, self._observe(obj))
@@ -180,15 +376,20 @@ class ObservableList(ObservableCollection, list):
         self._handle_change()
 
     def __setitem__(self, key: Union[SupportsIndex, slice], value: Any) -> None:
-        super().__setitem__(key, self._observe(value))
-        self._handle_change()
+        if isinstance(key, slice):
+            super().__setitem__(key, [self._observe(item) for item in value])
+            self._handle_change()
+        else:
+            super().__setitem__(key, self._observe(value))
+            self._handle_change([key.__index__() % len(self)])
 
     def __add__(self, other: Any) -> Any:
         return super().__add__(other)
 
     def __iadd__(self, other: Any) -> Any:
-        super().__iadd__(self._observe(other))
-        self._handle_change()
+        length = len(self)
+        super().__iadd__([self._observe(item) for item in other])
+        self._handle_change(range(length, len(self)))
         return self
 
 
@@ -198,27 +399,31 @@ class ObservableSet(ObservableCollection, set):
                  data: Optional[Set] = None,
                  *,
                  on_change: Optional[Callable] = None,
+                 deferred: bool = False,
                  _parent: Optional[ObservableCollection] = None,
                  ) -> None:
-        super().__init__(factory=set, data=data, on_change=on_change, _parent=_parent)
+        super().__init__(factory=set, data=data, on_change=on_change, deferred=deferred, _parent=_parent)
         for item in self:
-            super().add(self._observe(item))
+            self._observe(item)
+
+    def _wrap_all(self) -> None:
+        pass  # NOTE: items of a set are hashable, so they are never plain dicts, lists or sets which need wrapping
 
     def add(self, item: Any) -> None:
         super().add(self._observe(item))
-        self._handle_change()
+        self._handle_change([item])
 
     def remove(self, item: Any) -> None:
         super().remove(item)
-        self._handle_change()
+        self._handle_change([item])
 
     def discard(self, item: Any) -> None:
         super().discard(item)
-        self._handle_change()
+        self._handle_change([item])
 
     def pop(self) -> Any:
         item = super().pop()
-        self._handle_change()
+        self._handle_change([item])
         return item
 
     def clear(self) -> None:
@@ -226,8 +431,9 @@ class ObservableSet(ObservableCollection, set):
         self._handle_change()
 
     def update(self, *s: Iterable[Any]) -> None:
-        super().update(self._observe(set(*s)))
-        self._handle_change()
+        items = set(*s)
+        super().update(self._observe(items))
+        self._handle_change(items)
 
     def intersection_update(self, *s: Iterable[Any]) -> None:
         super().intersection_update(*s)
@@ -5,6 +5,7 @@ _optional_features: Set[str] = set()
 FEATURE = Literal[
     'highcharts',
     'matplotlib',
+    'msgpack',
     'pandas',
     'pillow',
     'plotly',
@@ -1,16 +1,20 @@
 from __future__ import annotations
 
 import asyncio
+import itertools
 import time
 import weakref
+import zlib
 from collections import deque
-from typing import TYPE_CHECKING, Any, Deque, Optional, Tuple, Union
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, ClassVar, Deque, Dict, Hashable, List, Optional, Tuple, Union
 
-from . import background_tasks, core
+from . import core, json, msgpack_packet
 
 if TYPE_CHECKING:
     from .client import Client
     from .element import Element
+    from .slot import SlotChange
 
 ElementId = int
 
@@ -21,7 +25,12 @@ Message = Tuple[ClientId, MessageType, Payload]
 
 MessageId = int
 MessageTime = float
-HistoryEntry = Tuple[MessageId, MessageTime, Message]
+Frame = bytes
+'''A serialized (and possibly compressed) message payload, as it is sent to the browser.'''
+HistoryEntry = Tuple[MessageId, MessageTime, ClientId, MessageType, Frame, bool]
+
+ElementState = Dict[str, Any]
+'''Snapshots of the sections (and fingerprints of individual props) of an element that the browser already knows.'''
 
 
 class Deleted:
@@ -31,22 +40,65 @@ class Deleted:
 deleted = Deleted()
 
 
+class _Identity:
+    """Wrapper which compares equal to another wrapper of the very same object."""
+    __slots__ = ('value',)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Identity) and other.value is self.value
+
+    def __hash__(self) -> int:
+        return id(self.value)
+
+
+@dataclass
+class CompressionStats:
+    """Statistics about the compression of large messages (see `compression_threshold` in `ui.run`)."""
+    messages: int = 0
+    raw_bytes: int = 0
+    compressed_bytes: int = 0
+    cpu_time: float = 0.0
+
+    @property
+    def ratio(self) -> float:
+        """Ratio of raw to compressed bytes, e.g. 4.0 if messages shrank to a quarter of their size."""
+        return self.raw_bytes / self.compressed_bytes if self.compressed_bytes else 1.0
+
+
 class Outbox:
+    CONGESTION_REPORT_DELAY: ClassVar[float] = 3.0
+    '''Time in seconds a client has to stay over a watermark before it is reported as slow.'''
+
+    ready: ClassVar[Dict[int, Outbox]] = {}
+    '''Outboxes of connected clients with pending updates or messages, waiting to be flushed.'''
+
+    _ready_event: ClassVar[Optional[asyncio.Event]] = None
 
     def __init__(self, client: Client) -> None:
         self._client = weakref.ref(client)
         self.updates: weakref.WeakValueDictionary[ElementId, Union[Element, Deleted]] = weakref.WeakValueDictionary()
         self.messages: Deque[Message] = deque()
         self.message_history: Deque[HistoryEntry] = deque()
+        self.history_bytes: int = 0
+        '''Total size of the frames in the message history.'''
+        self.element_states: Dict[ElementId, ElementState] = {}
         self.next_message_id: int = 0
-
+        self.in_flight: Deque[Tuple[MessageId, int]] = deque()
+        '''IDs and sizes of emitted messages which have not been acknowledged by the browser yet.'''
+        self.in_flight_bytes: int = 0
+        self.dropped_messages: int = 0
+        '''Number of pending messages which have been dropped because they were superseded.'''
+        self.compression_stats = CompressionStats()
+
+        self._keyed_messages: Dict[Hashable, Message] = {}
+        self._replay: Deque[HistoryEntry] = deque()
+        self._history_max_age: Optional[float] = None
+        self._should_resync = False
+        self._congested_since: Optional[float] = None
         self._should_stop = False
-        self._enqueue_event: Optional[asyncio.Event] = None
-
-        if core.app.is_started:
-            background_tasks.create(self.loop(), name=f'outbox loop {client.id}')
-        else:
-            core.app.on_startup(self.loop)
 
     @property
     def client(self) -> Client:
@@ -56,118 +108,401 @@ class Outbox:
             raise RuntimeError('The client this outbox belongs to has been deleted.')
         return client
 
-    def _set_enqueue_event(self) -> None:
-        """Set the enqueue event while accounting for lazy initialization."""
-        if self._enqueue_event:
-            self._enqueue_event.set()
+    @property
+    def is_congested(self) -> bool:
+        """Whether more messages or bytes are in flight than the watermarks configured via `ui.run` allow.
+
+        While a client is congested, its outbox is not flushed.
+        Pending updates are coalesced into the latest state of each element until the browser catches up.
+        """
+        config = core.app.config
+        return (config.outbox_max_messages is not None and len(self.in_flight) >= config.outbox_max_messages) or \
+            (config.outbox_max_bytes is not None and self.in_flight_bytes >= config.outbox_max_bytes)
+
+    def schedule(self) -> None:
+        """Schedule the outbox to be flushed by the outbox loop.
+
+        Outboxes of clients without socket connection are not scheduled.
+        They are scheduled as soon as the client connects.
+        """
+        if self._should_stop or not self.client.has_socket_connection:
+            return
+        Outbox.ready[id(self)] = self
+        if Outbox._ready_event is not None:
+            Outbox._ready_event.set()
 
     def enqueue_update(self, element: Element) -> None:
         """Enqueue an update for the given element."""
         self.client.check_existence()
         self.updates[element.id] = element
-        self._set_enqueue_event()
+        self.schedule()
 
     def enqueue_delete(self, element: Element) -> None:
         """Enqueue a deletion for the given element."""
         self.client.check_existence()
         self.updates[element.id] = deleted
-        self._set_enqueue_event()
+        self.schedule()
 
-    def enqueue_message(self, message_type: MessageType, data: Payload, target_id: ClientId) -> None:
-        """Enqueue a message for the given client."""
-        self.client.check_existence()
-        self.messages.append((target_id, message_type, data))
-        self._set_enqueue_event()
+    def forget_props(self, element: Element, *names: str) -> None:
+        """Forget what the browser knows about the given props, so they are sent with the next update.
+
+        This is needed when the browser changed these props on its own, e.g. when updating a value without loopback.
+        """
+        state = self.element_states.get(element.id)
+        if state is not None:
+            for name in names:
+                state['props'].pop(name, None)
 
-    async def loop(self) -> None:
-        """Send updates and messages to all clients in an endless loop."""
-        self._enqueue_event = asyncio.Event()
-        self._enqueue_event.set()
+    def enqueue_message(self, message_type: MessageType, data: Payload, target_id: ClientId, *,
+                        key: Optional[Hashable] = None) -> None:
+        """Enqueue a message for the given client.
 
-        while not self._should_stop:
+        If a key is given, a pending message with the same key is superseded and dropped.
+        """
+        self.client.check_existence()
+        message = (target_id, message_type, data)
+        if key is not None:
+            superseded = self._keyed_messages.get(key)
+            if superseded is not None:
+                try:
+                    self.messages.remove(superseded)
+                    self.dropped_messages += 1
+                except ValueError:
+                    pass  # NOTE: the superseded message has already been sent
+            self._keyed_messages[key] = message
+        self.messages.append(message)
+        self.schedule()
+
+    @classmethod
+    async def loop(cls) -> None:
+        """Flush all outboxes with pending updates or messages in an endless loop.
+
+        The loop sleeps until an outbox is scheduled, so idle clients do not cause any wakeups.
+        """
+        cls._ready_event = asyncio.Event()
+        if cls.ready:
+            cls._ready_event.set()
+        while True:
             try:
-                if not self._enqueue_event.is_set():
-                    try:
-                        await asyncio.wait_for(self._enqueue_event.wait(), timeout=1.0)
-                    except (TimeoutError, asyncio.TimeoutError):
-                        continue
-
-                client = self.client
-                if not client or not client.has_socket_connection:
-                    await asyncio.sleep(0.1)
-                    continue
-
-                self._enqueue_event.clear()
-
-                coros = []
-                if self.updates:
-                    data = {
-                        element_id: None if element is deleted else element._to_dict()  # type: ignore  # pylint: disable=protected-access
-                        for element_id, element in self.updates.items()
-                    }
-                    coros.append(self._emit((client.id, 'update', data)))
-                    self.updates.clear()
-
-                if self.messages:
-                    for message in self.messages:
-                        coros.append(self._emit(message))
-                    self.messages.clear()
-
-                for coro in coros:
-                    try:
-                        await coro
-                    except Exception as e:
-                        core.app.handle_exception(e)
+                await cls._ready_event.wait()
+                cls._ready_event.clear()
+                outboxes = list(cls.ready.values())
+                cls.ready.clear()
+                await asyncio.gather(*(outbox._flush() for outbox in outboxes))
             except asyncio.CancelledError:
+                cls._ready_event = None
                 break
             except Exception as e:
+                # NOTE: make sure the loop doesn't crash
                 core.app.handle_exception(e)
-                await asyncio.sleep(0.1)
 
-    async def _emit(self, message: Message) -> None:
-        client_id, message_type, data = message
-        data['_id'] = self.next_message_id
+    async def _flush(self) -> None:
+        """Send all pending updates and messages to the client."""
+        try:
+            client = self._client()
+            if client is None or self._should_stop or self.is_congested:
+                return
 
-        await core.sio.emit(message_type, data, room=client_id)
-        if core.air is not None and core.air.is_air_target(client_id):
-            await core.air.emit(message_type, data, room=client_id)
+            while self._replay:
+                entry = self._replay.popleft()
+                await self._send(entry)
+                self._track_in_flight(entry[0], len(entry[4]))
+
+            messages: List[Message] = []
+            if self._should_resync:
+                self._should_resync = False
+                messages.append((client.id, 'resync', self._collect_updates()))
+            elif self.updates:
+                data = self._collect_updates()
+                if data:
+                    messages.append((client.id, 'update', data))
+            messages.extend(self.messages)
+            self.messages.clear()
+            self._keyed_messages.clear()
+
+            for target_id, group in itertools.groupby(messages, key=lambda message: message[0]):
+                try:
+                    await self._emit(_batch(target_id, list(group)))
+                except Exception as e:
+                    core.app.handle_exception(e)
+        except Exception as e:
+            core.app.handle_exception(e)
+
+    def _collect_updates(self) -> Dict[ElementId, Optional[Dict[str, Any]]]:
+        """Collect the pending element updates and clear them.
+
+        New elements are sent as full dictionaries.
+        For elements the browser already knows, only a patch with the changed sections and props is sent.
+        """
+        updates = dict(self.updates)
+        self.updates.clear()
+        data: Dict[ElementId, Optional[Dict[str, Any]]] = {}
+        for element_id, element in updates.items():
+            if element is deleted:
+                self.element_states.pop(element_id, None)
+                data[element_id] = None
+                continue
+            element_dict = element._to_dict()  # type: ignore  # pylint: disable=protected-access
+            slot_changes = {
+                name: changes
+                for name, slot in element.slots.items()  # type: ignore
+                if (changes := slot.children.pop_changes())
+            }
+            state = _compute_state(element_dict)
+            previous_state = self.element_states.get(element_id)
+            self.element_states[element_id] = state
+            if previous_state is None:
+                data[element_id] = element_dict
+                continue
+            patch = _compute_patch(element_dict, state, previous_state, slot_changes)
+            if patch or element._update_method:  # type: ignore  # pylint: disable=protected-access
+                data[element_id] = patch
+        return data
+
+    async def _emit(self, message: Message) -> None:
+        target_id, message_type, data = message
+        frame, compressed = self._encode(data)
+        entry: HistoryEntry = (self.next_message_id, time.time(), target_id, message_type, frame, compressed)
+        await self._send(entry, data)
 
         client = self.client
         if client and not client.shared:
-            self.message_history.append((self.next_message_id, time.time(), message))
-            max_age = core.sio.eio.ping_interval + core.sio.eio.ping_timeout + client.page.resolve_reconnect_timeout()
-            while self.message_history and self.message_history[0][1] < time.time() - max_age:
-                self.message_history.popleft()
-            while len(self.message_history) > core.app.config.message_history_length:
-                self.message_history.popleft()
+            self._track_in_flight(self.next_message_id, len(frame))
+            self._append_history(entry)
 
         self.next_message_id += 1
 
+    async def _send(self, entry: HistoryEntry, data: Optional[Payload] = None) -> None:
+        """Send a frame to the browser.
+
+        Fresh uncompressed messages are sent as regular events.
+        Compressed and replayed frames are sent as they are stored via binary "frame" events,
+        which the browser inflates (if needed), decodes and passes to the handler of the original message type.
+        """
+        message_id, _, target_id, message_type, frame, compressed = entry
+        if compressed or data is None:
+            await core.sio.emit('frame', {
+                '_id': message_id,
+                'type': message_type,
+                'data': frame,
+                'compressed': compressed,
+            }, room=target_id)
+        else:
+            await core.sio.emit(message_type, {**data, '_id': message_id}, room=target_id)
+        if core.air is not None and core.air.is_air_target(target_id):
+            if data is None:
+                data = _deserialize(frame, compressed)
+            await core.air.emit(message_type, {**data, '_id': message_id}, room=target_id)
+
+    def _encode(self, data: Payload) -> Tuple[Frame, bool]:
+        """Serialize message data into a frame, which is compressed if it exceeds the compression threshold."""
+        frame = _serialize(data)
+        threshold = core.app.config.compression_threshold
+        if threshold is not None and len(frame) >= threshold:
+            compressed = self._compress(frame)
+            if compressed is not None:
+                return compressed, True
+        return frame, False
+
+    def _compress(self, serialized: bytes) -> Optional[bytes]:
+        """Compress a serialized message and update the compression stats.
+
+        Returns ``None`` if compression does not make the message smaller.
+        """
+        start = time.thread_time()
+        compressed = zlib.compress(serialized)
+        stats = self.compression_stats
+        stats.cpu_time += time.thread_time() - start
+        stats.messages += 1
+        stats.raw_bytes += len(serialized)
+        stats.compressed_bytes += min(len(compressed), len(serialized))
+        return compressed if len(compressed) < len(serialized) else None
+
+    def _append_history(self, entry: HistoryEntry) -> None:
+        """Append a frame to the message history and drop the oldest frames exceeding the configured limits."""
+        self.message_history.append(entry)
+        self.history_bytes += len(entry[4])
+        if self._history_max_age is None:
+            self._history_max_age = \
+                core.sio.eio.ping_interval + core.sio.eio.ping_timeout + self.client.page.resolve_reconnect_timeout()
+        min_time = entry[1] - self._history_max_age
+        max_length = core.app.config.message_history_length
+        max_bytes = core.app.config.message_history_bytes
+        while self.message_history and (
+            self.message_history[0][1] < min_time or
+            len(self.message_history) > max_length or
+            self.history_bytes > max_bytes
+        ):
+            self.history_bytes -= len(self.message_history.popleft()[4])
+
+    def _track_in_flight(self, message_id: MessageId, size: int) -> None:
+        self.in_flight.append((message_id, size))
+        self.in_flight_bytes += size
+        if self._congested_since is None and self.is_congested:
+            since = self._congested_since = time.time()
+            asyncio.get_running_loop().call_later(self.CONGESTION_REPORT_DELAY, self._report_congestion, since)
+
+    def _report_congestion(self, since: float) -> None:
+        client = self._client()
+        if client is None or self._should_stop or self._congested_since != since:
+            return
+        for t in core.app._slow_client_handlers:  # pylint: disable=protected-access
+            client.safe_invoke(t)
+
+    def handle_ack(self, next_message_id: MessageId) -> None:
+        """Handle the acknowledgement of all messages before the given message ID."""
+        self.prune_history(next_message_id)
+        while self.in_flight and self.in_flight[0][0] < next_message_id:
+            self.in_flight_bytes -= self.in_flight.popleft()[1]
+        if self._congested_since is not None and not self.is_congested:
+            self._congested_since = None
+            if self.updates or self.messages:
+                self.schedule()
+
     def try_rewind(self, target_message_id: MessageId) -> None:
-        """Rewind to the given message ID and discard all messages before it."""
+        """Replay the frames starting with the given message ID, or resync if they are not in the history anymore."""
+        # messages in flight are either lost or will be resent
+        self.in_flight.clear()
+        self.in_flight_bytes = 0
+        self._congested_since = None
+
         # nothing to do, the next message ID is already the target message ID
         if self.next_message_id == target_message_id:
             return
 
-        # rewind to the target message ID
-        while self.message_history:
-            self.next_message_id, _, message = self.message_history.pop()
-            self.messages.appendleft(message)
-            if self.next_message_id == target_message_id:
-                self.message_history.clear()
-                self._set_enqueue_event()
-                return
+        # replay the frames starting with the target message ID
+        frames = [entry for entry in self.message_history if entry[0] >= target_message_id]
+        if frames and frames[0][0] == target_message_id:
+            self._replay = deque(frames)
+            self.schedule()
+            return
+
+        # target message ID not found, send the whole element tree instead
+        if not self.client.shared:
+            self.resync()
 
-        # target message ID not found, reload the page
+    def resync(self) -> None:
+        """Send a snapshot of all elements, so that the browser can continue without reloading the page.
+
+        Elements which are not part of the snapshot are removed by the browser.
+        """
         client = self.client
-        if not client.shared:
-            client.run_javascript('window.location.reload()')
+        self._replay.clear()
+        self.updates.clear()
+        self.element_states.clear()
+        for element in client.elements.values():
+            self.updates[element.id] = element
+        self._should_resync = True
+        self.schedule()
 
     def prune_history(self, next_message_id: MessageId) -> None:
         """Prune the message history up to the given message ID."""
         while self.message_history and self.message_history[0][0] < next_message_id:
-            self.message_history.popleft()
+            self.history_bytes -= len(self.message_history.popleft()[4])
 
     def stop(self) -> None:
-        """Stop the outbox loop."""
+        """Stop sending updates and messages."""
         self._should_stop = True
+        Outbox.ready.pop(id(self), None)
+
+
+def _batch(target_id: ClientId, messages: List[Message]) -> Message:
+    """Combine multiple messages for the same target into a single batch message."""
+    if len(messages) == 1:
+        return messages[0]
+    return target_id, 'batch', {'messages': [[message_type, data] for _, message_type, data in messages]}
+
+
+def _serialize(data: Payload) -> Frame:
+    """Serialize message data in the format the browser decodes frames with."""
+    if core.app.config.message_format == 'msgpack':
+        return msgpack_packet.dumps(data)
+    return json.dumps_bytes(data)
+
+
+def _deserialize(frame: Frame, compressed: bool) -> Payload:
+    """Deserialize a frame back into message data."""
+    serialized = zlib.decompress(frame) if compressed else frame
+    if core.app.config.message_format == 'msgpack':
+        return msgpack_packet.loads(serialized)
+    return json.loads(serialized.decode())
+
+
+def _fingerprint(value: Any) -> Any:
+    """Return a value which compares equal as long as the given prop value does not change.
+
+    Scalars are kept as they are (together with their type, so that ``1`` and ``True`` differ).
+    Nested values are mutated in place (e.g. rows of a table), so only their serialization can tell them apart.
+    """
+    if value is None or isinstance(value, (str, int, float)):
+        return type(value), value
+    return hash(json.dumps(value))
+
+
+def _compute_state(element_dict: Dict[str, Any]) -> ElementState:
+    """Compute the state of all sections of an element dictionary and of each individual prop.
+
+    Most sections are flat and compared directly.
+    Events, component and libraries are cached by the element and only replaced when they change,
+    so the cached objects themselves are kept and compared by identity.
+    The IDs of child elements are not part of the state, because structural changes are sent as slot changes.
+    """
+    state: ElementState = {}
+    for key, value in element_dict.items():
+        if key in ('props', 'slots', 'children'):
+            continue
+        if key == 'class':
+            state[key] = tuple(value)
+        elif key == 'style':
+            state[key] = dict(value)
+        elif key in ('events', 'component', 'libraries'):
+            state[key] = _Identity(value)
+        else:
+            state[key] = value
+    state['props'] = {key: _fingerprint(value) for key, value in element_dict.get('props', {}).items()}
+    state['slots'] = {name: slot.get('template') for name, slot in element_dict.get('slots', {}).items()}
+    return state
+
+
+def _compute_patch(element_dict: Dict[str, Any],
+                   state: ElementState,
+                   previous_state: ElementState,
+                   slot_changes: Dict[str, List[SlotChange]]) -> Dict[str, Any]:
+    """Compute a patch that transforms the previously sent element into the current one.
+
+    The patch contains the changed sections (``patch``), the sections to remove (``unset``),
+    the props to remove (``unset_props``) and the structural changes of each slot (``slot_changes``).
+    Props are compared individually so that changing a single prop does not resend all others.
+    If a slot has been reset or the named slots have changed, the affected child IDs are sent in full.
+    """
+    changes: Dict[str, Any] = {
+        key: value
+        for key, value in element_dict.items()
+        if key not in ('props', 'slots', 'children') and state[key] != previous_state.get(key)
+    }
+    if any(change[0] == 'reset' for slot in slot_changes.values() for change in slot):
+        changes['children'] = element_dict.get('children', [])
+        changes['slots'] = element_dict.get('slots', {})
+        slot_changes = {}
+    elif state['slots'] != previous_state['slots']:
+        changes['slots'] = element_dict.get('slots', {})
+        slot_changes = {name: slot for name, slot in slot_changes.items() if name == 'default'}
+    props = element_dict.get('props', {})
+    props_state: Dict[str, Any] = state['props']
+    previous_props_state: Dict[str, Any] = previous_state['props']
+    changed_props = {key: props[key] for key, value in props_state.items() if value != previous_props_state.get(key)}
+    if changed_props:
+        changes['props'] = changed_props
+    unset: List[str] = [key for key in previous_state if key not in state]
+    unset_props: List[str] = [key for key in previous_props_state if key not in props_state]
+
+    patch: Dict[str, Any] = {}
+    if changes:
+        patch['patch'] = changes
+    if unset:
+        patch['unset'] = unset
+    if unset_props:
+        patch['unset_props'] = unset_props
+    if slot_changes:
+        patch['slot_changes'] = slot_changes
+    return patch
@@ -1,43 +1,132 @@
+import asyncio
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Literal, Optional, Set
 
 import aiofiles
 
-from nicegui import background_tasks, core, json
+from nicegui import background_tasks, core, events, json
 from nicegui.logging import log
 
 from .persistent_dict import PersistentDict
 
+Durability = Literal['none', 'snapshot', 'full']
+
+journal_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='nicegui-journal')
+'''Single thread which writes journals and snapshots in the order in which they have been prepared.'''
+
 
 class FilePersistentDict(PersistentDict):
 
-    def __init__(self, filepath: Path, encoding: Optional[str] = None, *, indent: bool = False) -> None:
+    def __init__(self, filepath: Path, encoding: Optional[str] = None, *,
+                 indent: bool = False,
+                 journal: bool = False,
+                 flush_interval: float = 1.0,
+                 durability: Durability = 'snapshot',
+                 compaction_size: int = 1_000_000,
+                 ) -> None:
+        """Persistent dict which is stored in a JSON file.
+
+        By default, the whole file is rewritten after every change.
+        In journal mode, the changed top-level keys are appended to a journal file next to the JSON file
+        every ``flush_interval`` seconds.
+        Once the journal grows larger than ``compaction_size`` bytes, it is compacted into a new snapshot
+        which atomically replaces the JSON file.
+
+        :param filepath: path of the JSON file
+        :param encoding: encoding of the JSON file and the journal
+        :param indent: whether to indent the JSON file
+        :param journal: whether to append changes to a journal instead of rewriting the whole file (default: ``False``)
+        :param flush_interval: seconds between writing changes to the journal (default: 1.0)
+        :param durability: "none" (never fsync), "snapshot" (fsync snapshots before replacing the JSON file)
+            or "full" (also fsync the journal after every flush) (default: "snapshot")
+        :param compaction_size: journal size in bytes which triggers a compaction (default: 1 MB)
+        """
         self.filepath = filepath
         self.encoding = encoding
         self.indent = indent
-        super().__init__(data={}, on_change=self.backup)
+        self.journal = journal
+        self.flush_interval = flush_interval
+        self.durability = durability
+        self.compaction_size = compaction_size
+        self.journal_path = filepath.with_name(filepath.name + '.journal')
+        self._loaded = False
+        self._loading = False
+        self._snapshot_digest = _digest('')
+        self._journal_size = 0
+        self._dirty_keys: Optional[Set[Any]] = set()  # NOTE: None means that a new snapshot has to be written
+        self._flush_scheduled = False
+        super().__init__(data={}, on_change=self._record_change if journal else self.backup, deferred=True)
 
     async def initialize(self) -> None:
         try:
+            snapshot: Optional[str] = None
+            journal: Optional[str] = None
             if self.filepath.exists():
                 async with aiofiles.open(self.filepath, encoding=self.encoding) as f:
-                    data = json.loads(await f.read())
-            else:
-                data = {}
-            self.update(data)
+                    snapshot = await f.read()
+            if self.journal and self.journal_path.exists():
+                async with aiofiles.open(self.journal_path, encoding=self.encoding) as f:
+                    journal = await f.read()
+            self._load(snapshot, journal)
         except Exception:
             log.warning(f'Could not load storage file {self.filepath}')
 
     def initialize_sync(self) -> None:
         try:
-            if self.filepath.exists():
-                data = json.loads(self.filepath.read_text(encoding=self.encoding))
-            else:
-                data = {}
-            self.update(data)
+            snapshot = self.filepath.read_text(encoding=self.encoding) if self.filepath.exists() else None
+            journal = self.journal_path.read_text(encoding=self.encoding) \
+                if self.journal and self.journal_path.exists() else None
+            self._load(snapshot, journal)
         except Exception:
             log.warning(f'Could not load storage file {self.filepath}')
 
+    def _load(self, snapshot: Optional[str], journal: Optional[str]) -> None:
+        data = json.loads(snapshot) if snapshot else {}
+        self._reset_size(len(snapshot or '') + len(journal or ''))
+        if not self.journal:
+            self.update(data)
+            return
+
+        self._snapshot_digest = _digest(snapshot or '')
+        intact = journal is None or self._replay(data, journal)
+        self._journal_size = self._size(journal) if journal is not None and intact else 0
+        changed_before_loading = self._dirty_keys is None or bool(self._dirty_keys)
+        self._loading = True
+        self._deferred = False  # NOTE: notify observers right away while the journal ignores the loaded data
+        try:
+            self.update(data)
+        finally:
+            self._loading = False
+            self._deferred = True
+        self._loaded = True
+        if changed_before_loading or not intact:
+            self._dirty_keys = None
+            self._schedule_flush()
+
+    def _replay(self, data: dict, journal: str) -> bool:
+        """Apply the records of the journal to the snapshot data and return whether new records can be appended."""
+        lines = journal.splitlines()
+        try:
+            header = json.loads(lines[0])
+        except (IndexError, ValueError):
+            return False
+        if not isinstance(header, dict) or header.get('snapshot') != self._snapshot_digest:
+            return False  # NOTE: the journal belongs to an older snapshot which already contains its records
+        for line in lines[1:]:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                return False  # NOTE: the last record is incomplete if the process crashed while appending it
+            if 'value' in record:
+                data[record['key']] = record['value']
+            else:
+                data.pop(record['key'], None)
+        return True
+
     def backup(self) -> None:
         """Back up the data to the given file path."""
         if not self.filepath.exists():
@@ -47,14 +136,137 @@ class FilePersistentDict(PersistentDict):
 
         @background_tasks.await_on_shutdown
         async def async_backup() -> None:
+            text = json.dumps(self, indent=self.indent)
+            self._reset_size(len(text))
             async with aiofiles.open(self.filepath, 'w', encoding=self.encoding) as f:
-                await f.write(json.dumps(self, indent=self.indent))
+                await f.write(text)
 
         if core.loop and core.loop.is_running():
             background_tasks.create_lazy(async_backup(), name=self.filepath.stem)
         else:
-            self.filepath.write_text(json.dumps(self, indent=self.indent), encoding=self.encoding)
+            text = json.dumps(self, indent=self.indent)
+            self._reset_size(len(text))
+            self.filepath.write_text(text, encoding=self.encoding)
+
+    def _record_change(self, e: events.ObservableChangeEventArguments) -> None:
+        if self._loading:
+            return
+        if self._dirty_keys is not None:
+            if e.sender is not self or e.keys is None:
+                self._dirty_keys = None
+            else:
+                self._dirty_keys.update(e.keys)
+        if self._loaded:
+            self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        if core.loop and core.loop.is_running():
+            if not self._flush_scheduled:
+                self._flush_scheduled = True
+                background_tasks.create_lazy(self._flush_later(), name=f'{self.filepath.stem}-journal')
+        else:
+            write = self._prepare_flush()
+            if write is not None:
+                write()
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Write pending changes to the journal or compact the journal into a new snapshot (journal mode only)."""
+        self._flush_scheduled = False
+        write = self._prepare_flush()
+        if write is not None:
+            await asyncio.get_running_loop().run_in_executor(journal_executor, write)
+
+    def _prepare_flush(self) -> Optional[Callable[[], None]]:
+        """Collect the pending changes and return a function which writes them to disk (or ``None``)."""
+        if self._dirty_keys is None or self._journal_size > self.compaction_size:
+            self._dirty_keys = set()
+            if not self and not self.filepath.exists() and not self.journal_path.exists():
+                return None
+            # NOTE: serialize on the event loop, because nested values may change while the executor is writing
+            snapshot = json.dumps(self, indent=self.indent)
+            self._snapshot_digest = _digest(snapshot)
+            self._journal_size = self._size(_header(self._snapshot_digest))
+            self._reset_size(len(snapshot))
+            return partial(self._write_snapshot, snapshot, self._snapshot_digest)
+
+        if not self._dirty_keys:
+            return None
+        records = ''.join(
+            json.dumps({'key': key, 'value': dict.get(self, key)} if key in self else {'key': key}) + '\n'
+            for key in self._dirty_keys
+        )
+        if self._journal_size == 0:
+            records = _header(self._snapshot_digest) + records
+        self._dirty_keys = set()
+        self._journal_size += self._size(records)
+        self.size += len(records)  # NOTE: the journal grows until it is compacted
+        return partial(self._append_to_journal, records)
+
+    def _write_snapshot(self, snapshot: str, digest: str) -> None:
+        """Write the serialized data as new snapshot with an empty journal."""
+        self.filepath.parent.mkdir(exist_ok=True)
+        snapshot_path = self._write_temporary_file(self.filepath, snapshot)
+        journal_path = self._write_temporary_file(self.journal_path, _header(digest))
+        # NOTE: if the process crashes in between, the old journal is ignored because it belongs to the old snapshot
+        os.replace(snapshot_path, self.filepath)
+        os.replace(journal_path, self.journal_path)
+        if self.durability != 'none':
+            _fsync_directory(self.filepath.parent)
+
+    def _write_temporary_file(self, path: Path, text: str) -> Path:
+        temporary_path = path.with_name(path.name + '.tmp')
+        with temporary_path.open('w', encoding=self.encoding) as f:
+            f.write(text)
+            if self.durability != 'none':
+                f.flush()
+                os.fsync(f.fileno())
+        return temporary_path
+
+    def _append_to_journal(self, records: str) -> None:
+        self.filepath.parent.mkdir(exist_ok=True)
+        with self.journal_path.open('a', encoding=self.encoding) as f:
+            f.write(records)
+            if self.durability == 'full':
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _size(self, text: str) -> int:
+        return len(text.encode(self.encoding or 'utf-8'))
+
+    async def close(self) -> None:
+        await asyncio.sleep(0)  # NOTE: let deferred change notifications arrive
+        if self.journal:
+            if self._loaded:
+                await self.flush()
+        else:
+            await background_tasks.wait_for_lazy(self.filepath.stem)
 
     def clear(self) -> None:
         super().clear()
         self.filepath.unlink(missing_ok=True)
+        self.journal_path.unlink(missing_ok=True)
+        self._snapshot_digest = _digest('')
+        self._journal_size = 0
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def _header(digest: str) -> str:
+    return json.dumps({'snapshot': digest}) + '\n'
+
+
+def _fsync_directory(path: Path) -> None:
+    """Make renames within the directory durable (not supported on Windows)."""
+    if os.name == 'nt':
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
@@ -1,10 +1,17 @@
 import abc
+from typing import Any, Dict, Optional
 
 from nicegui import observables
 
 
 class PersistentDict(observables.ObservableDict, abc.ABC):
 
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.size = 0
+        '''Approximate size of the serialized data in bytes, as of the last time it has been loaded or written.'''
+        self._key_sizes: Dict[Any, int] = {}
+
     @abc.abstractmethod
     async def initialize(self) -> None:
         """Load initial data from the persistence layer."""
@@ -15,3 +22,15 @@ class PersistentDict(observables.ObservableDict, abc.ABC):
 
     async def close(self) -> None:
         """Clean up the persistence layer."""
+
+    def _track_size(self, key: Any, size: Optional[int]) -> None:
+        """Update the size after a single key has been loaded or written (``None`` if it has been deleted)."""
+        self.size -= self._key_sizes.pop(key, 0)
+        if size is not None:
+            self._key_sizes[key] = size
+            self.size += size
+
+    def _reset_size(self, size: int = 0) -> None:
+        """Set the size after the whole data has been loaded or written."""
+        self._key_sizes.clear()
+        self.size = size
@@ -1,4 +1,8 @@
-from .. import background_tasks, core, json, optional_features
+import asyncio
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from .. import background_tasks, core, events, json, observables, optional_features
 from ..logging import log
 from .persistent_dict import PersistentDict
 
@@ -10,30 +14,146 @@ try:
 except ImportError:
     pass
 
+WRITE_DELTA_SCRIPT = '''
+if ARGV[3] == '1' then
+    redis.call('DEL', KEYS[1])
+end
+local count = tonumber(ARGV[4])
+for i = 5, 4 + 2 * count, 2 do
+    redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+for i = 5 + 2 * count, #ARGV do
+    redis.call('HDEL', KEYS[1], ARGV[i])
+end
+local version = redis.call('INCR', KEYS[2])
+redis.call('PUBLISH', KEYS[3], '{"version":' .. version .. ',"origin":"' .. ARGV[2] .. '","delta":' .. ARGV[1] .. '}')
+return version
+'''
+'''Lua script which atomically applies a delta to the hash, increments the version and publishes the delta.'''
 
-class RedisPersistentDict(PersistentDict):
 
-    def __init__(self, *, url: str, id: str, key_prefix: str = 'nicegui:') -> None:  # pylint: disable=redefined-builtin
-        if not optional_features.has('redis'):
-            raise ImportError('Redis is not installed. Please run "pip install nicegui[redis]".')
+class _Connection:
+    """Redis client and pattern subscription which are shared by all dicts with the same URL."""
+
+    def __init__(self, url: str) -> None:
         self.url = url
-        self.redis_client = redis.from_url(
+        self.client = redis.from_url(
             url,
             health_check_interval=10,
             socket_connect_timeout=5,
             retry_on_timeout=True,
             socket_keepalive=True,
         )
-        self.pubsub = self.redis_client.pubsub()
+        self.pubsub = self.client.pubsub()
+        self.patterns: Set[str] = set()
+        self.listeners: Dict[str, List[RedisPersistentDict]] = {}
+        self.reference_count = 0
+        self.listen_task: Optional[asyncio.Task] = None
+        self.closing = False
+
+    async def subscribe(self, dict_: 'RedisPersistentDict') -> None:
+        """Dispatch messages of the dict's channel to the dict."""
+        self.listeners.setdefault(dict_.channel, []).append(dict_)
+        if dict_.key_prefix not in self.patterns:
+            self.patterns.add(dict_.key_prefix)
+            await self.pubsub.psubscribe(dict_.key_prefix + '*')
+        if self.listen_task is None or self.listen_task.done():
+            self.listen_task = background_tasks.create(self._listen(), name=f'redis-listen-{self.url}')
+
+    def unsubscribe(self, dict_: 'RedisPersistentDict') -> None:
+        """Stop dispatching messages to the dict."""
+        listeners = self.listeners.get(dict_.channel, [])
+        listeners[:] = [listener for listener in listeners if listener is not dict_]
+        if not listeners:
+            self.listeners.pop(dict_.channel, None)
+
+    async def _listen(self) -> None:
+        try:
+            async for message in self.pubsub.listen():
+                if message['type'] != 'pmessage':
+                    continue
+                channel = message['channel'].decode()
+                for dict_ in self.listeners.get(channel, [])[:]:
+                    try:
+                        await dict_._handle_message(message['data'])  # pylint: disable=protected-access
+                    except Exception:
+                        log.exception(f'Unexpected error in Redis listener for {dict_.key}')
+        except Exception as e:
+            if isinstance(e, redis_exceptions.ConnectionError) and self.closing:
+                return  # NOTE: the connection has been closed while waiting for messages
+            log.exception(f'Unexpected error in Redis listener for {self.url}')
+
+    async def release(self) -> None:
+        """Close the client and the subscription once no dict uses them anymore."""
+        self.reference_count -= 1
+        if self.reference_count > 0:
+            return
+        self.closing = True
+        if _connections.get(self.url) is self:
+            del _connections[self.url]
+        if self.pubsub.subscribed:
+            await self.pubsub.punsubscribe()
+        await self.pubsub.close()
+        await self.client.close()
+
+
+_connections: Dict[str, _Connection] = {}
+
+
+class RedisPersistentDict(PersistentDict):
+
+    def __init__(self, *,
+                 url: str,
+                 id: str,  # pylint: disable=redefined-builtin
+                 key_prefix: str = 'nicegui:',
+                 field_level: bool = False,
+                 ) -> None:
+        """Persistent dict which is stored in Redis and synchronized between instances via pub/sub.
+
+        By default, the whole dict is stored as a JSON string and published after every change.
+        In field-level mode, every top-level key is a field of a Redis hash and only the changed keys are published
+        together with a version counter, so that receivers can apply the delta and detect missed messages.
+
+        :param url: Redis URL
+        :param id: ID of the dict
+        :param key_prefix: prefix of the Redis keys (default: "nicegui:")
+        :param field_level: whether to store top-level keys in a hash and publish deltas (default: ``False``)
+        """
+        if not optional_features.has('redis'):
+            raise ImportError('Redis is not installed. Please run "pip install nicegui[redis]".')
+        self.url = url
+        if url not in _connections:
+            _connections[url] = _Connection(url)
+        self._connection = _connections[url]
+        self._connection.reference_count += 1
+        self.redis_client = self._connection.client
+        self.key_prefix = key_prefix
         self.key = key_prefix + id
+        self.field_level = field_level
+        self.channel = self.key + ('deltas' if field_level else 'changes')
+        self.hash_key = self.key + ':fields'
+        self.version_key = self.key + ':version'
         self._should_listen = True
-        super().__init__(data={}, on_change=self.publish)
+        self._closed = False
+        self._version = 0
+        self._latest_version = 0
+        self._reload_task: Optional[asyncio.Task] = None
+        self._origin = uuid.uuid4().hex
+        self._dirty_keys: Set[Any] = set()
+        self._rewrite_all = False
+        self._silent = False
+        self._write_delta_script = self.redis_client.register_script(WRITE_DELTA_SCRIPT)
+        super().__init__(data={}, on_change=self._record_change if field_level else self.publish, deferred=True)
 
     async def initialize(self) -> None:
         """Load initial data from Redis and start listening for changes."""
         try:
-            data = await self.redis_client.get(self.key)
-            self.update(json.loads(data) if data else {})
+            if self.field_level:
+                await self._load_fields()
+            else:
+                data = await self.redis_client.get(self.key)
+                self.update(json.loads(data) if data else {})
+                self._reset_size(len(data) if data else 0)
             self._start_listening()
         except Exception:
             log.warning(f'Could not load data from Redis with key {self.key}')
@@ -48,63 +168,174 @@ class RedisPersistentDict(PersistentDict):
             socket_keepalive=True,
         ) as redis_client_sync:
             try:
-                data = redis_client_sync.get(self.key)
-                self.update(json.loads(data) if data else {})
+                if self.field_level:
+                    pipeline = redis_client_sync.pipeline()
+                    pipeline.hgetall(self.hash_key)
+                    pipeline.get(self.version_key)
+                    self._apply_fields(*pipeline.execute())
+                else:
+                    data = redis_client_sync.get(self.key)
+                    self.update(json.loads(data) if data else {})
+                    self._reset_size(len(data) if data else 0)
                 self._start_listening()
             except Exception:
                 log.warning(f'Could not load data from Redis with key {self.key}')
 
     def _start_listening(self) -> None:
         async def listen():
-            try:
-                if not self._should_listen:
-                    return
-                await self.pubsub.subscribe(self.key + 'changes')
-                if not self._should_listen:
-                    await self.pubsub.unsubscribe()
-                    return
-                async for message in self.pubsub.listen():
-                    t = message['type']
-                    if t == 'message':
-                        new_data = json.loads(message['data'])
-                        if new_data != self:
-                            self.update(new_data)
-                    elif t in ('unsubscribe', 'punsubscribe') and message.get('data') == 0:
-                        break
-            except Exception as e:
-                if isinstance(e, redis_exceptions.ConnectionError) and not self._should_listen:
-                    return  # NOTE: on quick instantiation cycles, unsubscribe event might not be received before the connection is closed
-                log.exception(f'Unexpected error in Redis listener for {self.key}')
+            if self._should_listen:
+                await self._connection.subscribe(self)
 
         if core.loop and core.loop.is_running():
             background_tasks.create(listen(), name=f'redis-listen-{self.key}')
         else:
             core.app.on_startup(listen())
 
+    async def _handle_message(self, data: bytes) -> None:
+        if self.field_level:
+            await self._handle_delta(json.loads(data))
+        else:
+            new_data = json.loads(data)
+            if new_data != self:
+                self.update(new_data)
+            self._reset_size(len(data))
+
     def publish(self) -> None:
         """Publish the data to Redis and notify other instances."""
         async def backup() -> None:
             if not await self.redis_client.exists(self.key) and not self:
                 return
+            data = json.dumps(self)
+            self._reset_size(len(data))
             pipeline = self.redis_client.pipeline()
-            pipeline.set(self.key, json.dumps(self))
-            pipeline.publish(self.key + 'changes', json.dumps(self))
+            pipeline.set(self.key, data)
+            pipeline.publish(self.channel, data)
             await pipeline.execute()
         if core.loop:
             background_tasks.create_lazy(backup(), name=f'redis-{self.key}')
         else:
             core.app.on_startup(backup())
 
+    async def _load_fields(self) -> None:
+        pipeline = self.redis_client.pipeline()
+        pipeline.hgetall(self.hash_key)
+        pipeline.get(self.version_key)
+        self._apply_fields(*await pipeline.execute())
+
+    def _apply_fields(self, fields: Dict[bytes, bytes], version: Optional[bytes]) -> None:
+        """Replace the data with the fields of the hash, except for local changes which have not been written yet."""
+        self._version = int(version or 0)
+        if self._rewrite_all:
+            return
+        self._reset_size()
+        for field, value in fields.items():
+            self._track_size(field.decode(), len(field) + len(value))  # NOTE: same keys as in the deltas
+        data = {json.loads(field): json.loads(value) for field, value in fields.items()}
+        self._update_silently(clear=False,
+                              values={key: value for key, value in data.items() if key not in self._dirty_keys},
+                              deleted=[key for key in dict.keys(self)
+                                       if key not in data and key not in self._dirty_keys])
+
+    async def _handle_delta(self, message: Dict[str, Any]) -> None:
+        version = message['version']
+        if self._reload_task is not None:
+            self._latest_version = max(self._latest_version, version)
+            return  # NOTE: the running reload fetches this delta or reloads again
+        if version <= self._version:
+            return
+        if version > self._version + 1:
+            self._latest_version = version  # NOTE: some deltas have been missed
+            self._reload_task = background_tasks.create(self._reload_fields(), name=f'redis-reload-{self.key}')
+            return
+        self._version = version
+        if message['origin'] != self._origin:
+            delta = message['delta']
+            if delta['clear']:
+                self._reset_size()
+            for field, value in delta['set'].items():
+                self._track_size(field, len(field) + len(json.dumps(value)))
+            for field in delta['delete']:
+                self._track_size(field, None)
+            self._update_silently(clear=delta['clear'],
+                                  values={json.loads(field): value for field, value in delta['set'].items()},
+                                  deleted=[json.loads(field) for field in delta['delete']])
+
+    async def _reload_fields(self) -> None:
+        """Reload all fields without blocking the shared listener until no delta has been dropped in the meantime."""
+        try:
+            await self._load_fields()
+            while self._latest_version > self._version:
+                await self._load_fields()
+        finally:
+            self._reload_task = None
+
+    def _update_silently(self, *, clear: bool, values: Dict[Any, Any], deleted: Iterable[Any]) -> None:
+        """Apply changes from Redis without writing them back."""
+        self._silent = True
+        self._deferred = False  # NOTE: notify observers right away while the changes are not recorded
+        try:
+            with observables.batch():
+                if clear:
+                    observables.ObservableDict.clear(self)
+                self.update(values)
+                for key in deleted:
+                    self.pop(key, None)
+        finally:
+            self._silent = False
+            self._deferred = True
+
+    def _record_change(self, e: events.ObservableChangeEventArguments) -> None:
+        if self._silent:
+            return
+        if e.sender is not self or e.keys is None:
+            self._rewrite_all = True
+        else:
+            self._dirty_keys.update(e.keys)
+        if core.loop:
+            background_tasks.create_lazy(self._write_delta(), name=f'redis-{self.key}')
+        else:
+            core.app.on_startup(self._write_delta())
+
+    async def _write_delta(self) -> None:
+        """Write the changed keys to the hash and publish them to other instances."""
+        clear = self._rewrite_all
+        keys = set(dict.keys(self)) if clear else self._dirty_keys
+        self._rewrite_all = False
+        self._dirty_keys = set()
+        if not clear and not keys:
+            return
+        values = {json.dumps(key): json.dumps(dict.get(self, key)) for key in keys if key in self}
+        deleted = [json.dumps(key) for key in keys if key not in self]
+        if clear:
+            self._reset_size()
+        for field, value in values.items():
+            self._track_size(field, len(field) + len(value))
+        for field in deleted:
+            self._track_size(field, None)
+        fields = ','.join(f'{json.dumps(field)}:{value}' for field, value in values.items())  # NOTE: values are JSON
+        delta = f'{{"clear":{json.dumps(clear)},"set":{{{fields}}},"delete":{json.dumps(deleted)}}}'
+        await self._write_delta_script(
+            keys=[self.hash_key, self.version_key, self.channel],
+            args=[delta, self._origin, '1' if clear else '0', len(values),
+                  *(item for field_value in values.items() for item in field_value), *deleted],
+        )
+
     async def close(self) -> None:
-        """Close Redis connection and subscription."""
+        """Stop listening for changes, wait for pending writes and release the shared Redis connection."""
         self._should_listen = False
-        if self.pubsub.subscribed:
-            await self.pubsub.unsubscribe()
-        await self.pubsub.close()
-        await self.redis_client.close()
+        self._connection.unsubscribe(self)
+        if self._reload_task is not None:
+            self._reload_task.cancel()
+        await asyncio.sleep(0)  # NOTE: let deferred change notifications arrive
+        await background_tasks.wait_for_lazy(f'redis-{self.key}')
+        if not self._closed:
+            self._closed = True
+            await self._connection.release()
 
     def clear(self) -> None:
         super().clear()
+        if self.field_level:
+            return  # NOTE: the change is written as a delta which clears the hash
         if core.loop:
             background_tasks.create_lazy(self.redis_client.delete(self.key), name=f'redis-delete-{self.key}')
         else:
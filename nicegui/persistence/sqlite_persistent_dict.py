@@ -0,0 +1,184 @@
+import asyncio
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .. import background_tasks, core, events, json
+from ..logging import log
+from .persistent_dict import PersistentDict
+
+
+class _Database:
+    """SQLite database which stores all dicts as one row per key and commits their changes in batches."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='nicegui-sqlite')
+        self.connection: Optional[sqlite3.Connection] = None
+        self.lock = threading.Lock()  # NOTE: the connection is used by the event loop and the writer thread
+        self.changed_keys: Dict[Tuple[str, Any], SqlitePersistentDict] = {}
+        self.cleared_ids: Set[str] = set()
+        self.commit_scheduled = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return the connection, creating it if needed (the caller must hold the lock)."""
+        if self.connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.connection = sqlite3.connect(self.path, check_same_thread=False)
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute('PRAGMA synchronous=NORMAL')
+            self.connection.execute('CREATE TABLE IF NOT EXISTS storage ('
+                                    'id TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, PRIMARY KEY (id, key)'
+                                    ') WITHOUT ROWID')
+        return self.connection
+
+    def load(self, id: str) -> Tuple[Dict, Dict[Any, int]]:  # pylint: disable=redefined-builtin
+        """Load the data of a dict together with the serialized size of each key."""
+        with self.lock:
+            rows = self._connect().execute('SELECT key, value FROM storage WHERE id = ?', (id,)).fetchall()
+        data: Dict = {}
+        sizes: Dict[Any, int] = {}
+        for key, value in rows:
+            data[json.loads(key)] = json.loads(value)
+            sizes[json.loads(key)] = len(key) + len(value)
+        return data, sizes
+
+    def apply_uncommitted_changes(self, id: str, data: Dict) -> None:  # pylint: disable=redefined-builtin
+        """Apply changes of a previous dict with the same ID which have not been committed yet."""
+        if id in self.cleared_ids:
+            data.clear()
+        for (id_, key), dict_ in self.changed_keys.items():
+            if id_ == id:
+                if key in dict_:
+                    data[key] = json.loads(json.dumps(dict.get(dict_, key)))
+                else:
+                    data.pop(key, None)
+
+    def record(self, dict_: 'SqlitePersistentDict', keys: Optional[Set[Any]]) -> None:
+        """Remember changed keys of the given dict (``None`` if all rows of the dict have to be rewritten)."""
+        if keys is None:
+            dict_._reset_size()  # pylint: disable=protected-access
+            for changed_key in [changed_key for changed_key in self.changed_keys if changed_key[0] == dict_.id]:
+                del self.changed_keys[changed_key]
+            self.cleared_ids.add(dict_.id)
+            keys = set(dict.keys(dict_))
+        for key in keys:
+            self.changed_keys[(dict_.id, key)] = dict_
+        if core.loop and core.loop.is_running():
+            if not self.commit_scheduled:
+                self.commit_scheduled = True
+                background_tasks.create(self._commit_later(dict_.flush_interval), name=f'sqlite-commit-{self.path}')
+        else:
+            self._write(*self._take_changes())
+
+    async def _commit_later(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        await self.commit()
+
+    async def commit(self) -> None:
+        """Write all pending changes to the database within a single transaction."""
+        self.commit_scheduled = False
+        cleared_ids, rows = self._take_changes()
+        if cleared_ids or rows:
+            await asyncio.get_running_loop().run_in_executor(self.executor, self._write, cleared_ids, rows)
+
+    def _take_changes(self) -> Tuple[Set[str], List[Tuple[str, str, Optional[str]]]]:
+        """Serialize the pending changes into rows (with ``None`` values for deleted keys) and reset them."""
+        rows: List[Tuple[str, str, Optional[str]]] = []
+        for (id, key), dict_ in self.changed_keys.items():  # pylint: disable=redefined-builtin
+            serialized_key = json.dumps(key)
+            value = json.dumps(dict.get(dict_, key)) if key in dict_ else None
+            rows.append((id, serialized_key, value))
+            size = None if value is None else len(serialized_key) + len(value)
+            dict_._track_size(key, size)  # pylint: disable=protected-access
+        cleared_ids = self.cleared_ids
+        self.changed_keys = {}
+        self.cleared_ids = set()
+        return cleared_ids, rows
+
+    def _write(self, cleared_ids: Set[str], rows: List[Tuple[str, str, Optional[str]]]) -> None:
+        with self.lock, self._connect() as connection:
+            connection.executemany('DELETE FROM storage WHERE id = ?', [(id,) for id in cleared_ids])
+            connection.executemany('DELETE FROM storage WHERE id = ? AND key = ?',
+                                   [(id, key) for id, key, value in rows if value is None])
+            connection.executemany('INSERT OR REPLACE INTO storage (id, key, value) VALUES (?, ?, ?)',
+                                   [row for row in rows if row[2] is not None])
+
+    def clear(self) -> None:
+        """Delete the rows of all dicts."""
+        self.changed_keys.clear()
+        self.cleared_ids.clear()
+        with self.lock, self._connect() as connection:
+            connection.execute('DELETE FROM storage')
+
+
+_databases: Dict[Path, _Database] = {}
+
+
+class SqlitePersistentDict(PersistentDict):
+
+    def __init__(self, *,
+                 path: Path,
+                 id: str,  # pylint: disable=redefined-builtin
+                 flush_interval: float = 1.0,
+                 ) -> None:
+        """Persistent dict which is stored in a SQLite database.
+
+        All dicts with the same database path share one database in WAL mode, in which every top-level key is a row.
+        Changes of all dicts are collected and committed together every ``flush_interval`` seconds.
+
+        :param path: path of the SQLite database file
+        :param id: ID of the dict within the database
+        :param flush_interval: seconds between committing changes to the database (default: 1.0)
+        """
+        self.path = path
+        self.id = id
+        self.flush_interval = flush_interval
+        if path not in _databases:
+            _databases[path] = _Database(path)
+        self._database = _databases[path]
+        self._loading = False
+        super().__init__(data={}, on_change=self._record_change, deferred=True)
+
+    async def initialize(self) -> None:
+        """Load initial data from the database."""
+        try:
+            data, sizes = await asyncio.get_running_loop().run_in_executor(self._database.executor,
+                                                                           self._database.load, self.id)
+            self._load(data, sizes)
+        except Exception:
+            log.warning(f'Could not load data from SQLite database {self.path} with id {self.id}')
+
+    def initialize_sync(self) -> None:
+        """Load initial data from the database in a synchronous context."""
+        try:
+            self._load(*self._database.load(self.id))
+        except Exception:
+            log.warning(f'Could not load data from SQLite database {self.path} with id {self.id}')
+
+    def _load(self, data: Dict, sizes: Dict[Any, int]) -> None:
+        for key, size in sizes.items():
+            self._track_size(key, size)
+        self._database.apply_uncommitted_changes(self.id, data)
+        self._loading = True
+        self._deferred = False  # NOTE: notify observers right away while the loaded data is not recorded as changes
+        try:
+            self.update(data)
+        finally:
+            self._loading = False
+            self._deferred = True
+
+    def _record_change(self, e: events.ObservableChangeEventArguments) -> None:
+        if not self._loading:
+            self._database.record(self, e.keys if e.sender is self else None)
+
+    async def close(self) -> None:
+        """Commit pending changes."""
+        await asyncio.sleep(0)  # NOTE: let deferred change notifications arrive
+        await self._database.commit()
+
+    def clear_database(self) -> None:
+        """Delete the data of all dicts which are stored in the same database."""
+        self._database.clear()
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import weakref
-from typing import TYPE_CHECKING, ClassVar, Dict, Iterator, List, Optional
+from typing import TYPE_CHECKING, Any, ClassVar, Dict, Iterable, Iterator, List, Optional, SupportsIndex, Tuple
 
 from typing_extensions import Self
 
@@ -12,6 +12,95 @@ if TYPE_CHECKING:
     from .element import Element
 
 
+SlotChange = Tuple[Any, ...]
+'''A structural change of a slot: ``('insert', index, id)``, ``('remove', index)``, ``('clear',)`` or ``('reset',)``.'''
+
+
+class SlotChildren(List['Element']):
+    """List of child elements that records structural changes, so they can be sent to the browser incrementally.
+
+    Insertions, removals and clearing are recorded as individual changes.
+    All other modifications, as well as too many changes, are recorded as a single reset.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.changes: List[SlotChange] = []
+
+    def _record(self, change: SlotChange) -> None:
+        if self.changes and self.changes[0][0] == 'reset':
+            return
+        if len(self.changes) > len(self):  # NOTE: resending all IDs is cheaper than replaying more changes
+            self.changes[:] = [('reset',)]
+        else:
+            self.changes.append(change)
+
+    def _reset(self) -> None:
+        self.changes[:] = [('reset',)]
+
+    def pop_changes(self) -> List[SlotChange]:
+        """Return and forget all changes recorded since the last call."""
+        changes = self.changes
+        self.changes = []
+        return changes
+
+    def append(self, element: Element) -> None:
+        self._record(('insert', len(self), element.id))
+        super().append(element)
+
+    def insert(self, index: SupportsIndex, element: Element) -> None:
+        i = index.__index__()
+        i = min(max(i + len(self) if i < 0 else i, 0), len(self))
+        self._record(('insert', i, element.id))
+        super().insert(i, element)
+
+    def extend(self, elements: Iterable[Element]) -> None:
+        for element in elements:
+            self.append(element)
+
+    def remove(self, element: Element) -> None:
+        index = self.index(element)
+        self._record(('remove', index))
+        super().__delitem__(index)
+
+    def pop(self, index: SupportsIndex = -1) -> Element:
+        i = index.__index__()
+        self._record(('remove', i + len(self) if i < 0 else i))
+        return super().pop(i)
+
+    def clear(self) -> None:
+        self._record(('clear',))
+        super().clear()
+
+    def __delitem__(self, key: Any) -> None:
+        if isinstance(key, slice):
+            self._reset()
+        else:
+            i = key.__index__()
+            self._record(('remove', i + len(self) if i < 0 else i))
+        super().__delitem__(key)
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self._reset()
+        super().__setitem__(key, value)
+
+    def __iadd__(self, elements: Iterable[Element]) -> SlotChildren:  # type: ignore[override]
+        self.extend(elements)
+        return self
+
+    def __imul__(self, n: SupportsIndex) -> SlotChildren:  # type: ignore[override]
+        self._reset()
+        return super().__imul__(n)
+
+    def sort(self, *args: Any, **kwargs: Any) -> None:
+        self._reset()
+        super().sort(*args, **kwargs)
+
+    def reverse(self) -> None:
+        self._reset()
+        super().reverse()
+
+
 class Slot:
     stacks: ClassVar[Dict[int, List[Slot]]] = {}
     '''Maps asyncio task IDs to slot stacks, which keep track of the current slot in each task.'''
@@ -20,7 +109,7 @@ class Slot:
         self.name = name
         self._parent = weakref.ref(parent)
         self.template = template
-        self.children: List[Element] = []
+        self.children = SlotChildren()
 
     @property
     def parent(self) -> Element:
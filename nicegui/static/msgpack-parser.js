@@ -0,0 +1,227 @@
+// MessagePack codec and socket.io parser for the binary wire format (see `message_format` in `ui.run`).
+// Extension types 1 to 8 carry raw little-endian NumPy arrays which are decoded into typed arrays.
+const msgpackParser = (() => {
+  const TYPED_ARRAYS = {
+    1: Int8Array,
+    2: Uint8Array,
+    3: Int16Array,
+    4: Uint16Array,
+    5: Int32Array,
+    6: Uint32Array,
+    7: Float32Array,
+    8: Float64Array,
+  };
+  const textEncoder = new TextEncoder();
+  const textDecoder = new TextDecoder();
+
+  function decode(data) {
+    const bytes = ArrayBuffer.isView(data)
+      ? new Uint8Array(data.buffer, data.byteOffset, data.byteLength)
+      : new Uint8Array(data);
+    const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+    let offset = 0;
+
+    const advance = (size, value) => ((offset += size), value);
+    const uint8 = () => bytes[offset++];
+    const uint16 = () => advance(2, view.getUint16(offset));
+    const uint32 = () => advance(4, view.getUint32(offset));
+    const str = (length) => advance(length, textDecoder.decode(bytes.subarray(offset, offset + length)));
+    const bin = (length) => advance(length, bytes.slice(offset, offset + length));
+    const array = (length) => Array.from({ length }, () => read());
+    const map = (length) => {
+      const result = {};
+      for (let i = 0; i < length; i++) {
+        const key = read();
+        result[key] = read();
+      }
+      return result;
+    };
+    const ext = (length) => {
+      const TypedArray = TYPED_ARRAYS[advance(1, view.getInt8(offset))];
+      const buffer = bin(length); // NOTE: a fresh copy, so the typed array is properly aligned
+      return TypedArray ? new TypedArray(buffer.buffer) : buffer;
+    };
+
+    function read() {
+      const byte = uint8();
+      if (byte < 0x80) return byte;
+      if (byte < 0x90) return map(byte & 0x0f);
+      if (byte < 0xa0) return array(byte & 0x0f);
+      if (byte < 0xc0) return str(byte & 0x1f);
+      if (byte >= 0xe0) return byte - 0x100;
+      switch (byte) {
+        case 0xc0:
+          return null;
+        case 0xc2:
+          return false;
+        case 0xc3:
+          return true;
+        case 0xc4:
+          return bin(uint8());
+        case 0xc5:
+          return bin(uint16());
+        case 0xc6:
+          return bin(uint32());
+        case 0xc7:
+          return ext(uint8());
+        case 0xc8:
+          return ext(uint16());
+        case 0xc9:
+          return ext(uint32());
+        case 0xca:
+          return advance(4, view.getFloat32(offset));
+        case 0xcb:
+          return advance(8, view.getFloat64(offset));
+        case 0xcc:
+          return uint8();
+        case 0xcd:
+          return uint16();
+        case 0xce:
+          return uint32();
+        case 0xcf:
+          return advance(8, Number(view.getBigUint64(offset)));
+        case 0xd0:
+          return advance(1, view.getInt8(offset));
+        case 0xd1:
+          return advance(2, view.getInt16(offset));
+        case 0xd2:
+          return advance(4, view.getInt32(offset));
+        case 0xd3:
+          return advance(8, Number(view.getBigInt64(offset)));
+        case 0xd4:
+          return ext(1);
+        case 0xd5:
+          return ext(2);
+        case 0xd6:
+          return ext(4);
+        case 0xd7:
+          return ext(8);
+        case 0xd8:
+          return ext(16);
+        case 0xd9:
+          return str(uint8());
+        case 0xda:
+          return str(uint16());
+        case 0xdb:
+          return str(uint32());
+        case 0xdc:
+          return array(uint16());
+        case 0xdd:
+          return array(uint32());
+        case 0xde:
+          return map(uint16());
+        case 0xdf:
+          return map(uint32());
+      }
+      throw new Error(`Invalid MessagePack byte 0x${byte.toString(16)}`);
+    }
+
+    return read();
+  }
+
+  function encode(value) {
+    let bytes = new Uint8Array(1024);
+    let view = new DataView(bytes.buffer);
+    let offset = 0;
+
+    function reserve(size) {
+      if (offset + size <= bytes.length) return;
+      const grown = new Uint8Array(Math.max(2 * bytes.length, offset + size));
+      grown.set(bytes);
+      bytes = grown;
+      view = new DataView(bytes.buffer);
+    }
+    function put(setter, size, value) {
+      reserve(size);
+      view[setter](offset, value);
+      offset += size;
+    }
+    function raw(data) {
+      reserve(data.length);
+      bytes.set(data, offset);
+      offset += data.length;
+    }
+    function header(length, fix, fixLimit, codes) {
+      if (length < fixLimit) put("setUint8", 1, fix | length);
+      else if (codes[0] !== undefined && length < 0x100) put("setUint8", 1, codes[0]), put("setUint8", 1, length);
+      else if (length < 0x10000) put("setUint8", 1, codes[1]), put("setUint16", 2, length);
+      else put("setUint8", 1, codes[2]), put("setUint32", 4, length);
+    }
+    function number(value) {
+      if (!Number.isInteger(value) || value < -0x80000000 || value > 0xffffffff) {
+        put("setUint8", 1, 0xcb);
+        put("setFloat64", 8, value);
+      } else if (value >= 0) {
+        if (value < 0x80) put("setUint8", 1, value);
+        else if (value < 0x100) put("setUint8", 1, 0xcc), put("setUint8", 1, value);
+        else if (value < 0x10000) put("setUint8", 1, 0xcd), put("setUint16", 2, value);
+        else put("setUint8", 1, 0xce), put("setUint32", 4, value);
+      } else {
+        if (value >= -0x20) put("setInt8", 1, value);
+        else if (value >= -0x80) put("setUint8", 1, 0xd0), put("setInt8", 1, value);
+        else if (value >= -0x8000) put("setUint8", 1, 0xd1), put("setInt16", 2, value);
+        else put("setUint8", 1, 0xd2), put("setInt32", 4, value);
+      }
+    }
+
+    function write(value) {
+      if (value === null || value === undefined) return put("setUint8", 1, 0xc0);
+      if (typeof value === "boolean") return put("setUint8", 1, value ? 0xc3 : 0xc2);
+      if (typeof value === "number") return number(value);
+      if (typeof value === "string") {
+        const data = textEncoder.encode(value);
+        header(data.length, 0xa0, 0x20, [0xd9, 0xda, 0xdb]);
+        return raw(data);
+      }
+      if (value instanceof ArrayBuffer || ArrayBuffer.isView(value)) {
+        const data = value instanceof ArrayBuffer ? new Uint8Array(value) : new Uint8Array(value.buffer, value.byteOffset, value.byteLength);
+        header(data.length, 0, 0, [0xc4, 0xc5, 0xc6]);
+        return raw(data);
+      }
+      if (Array.isArray(value)) {
+        header(value.length, 0x90, 0x10, [undefined, 0xdc, 0xdd]);
+        return value.forEach(write);
+      }
+      if (typeof value.toJSON === "function") return write(value.toJSON());
+      if (typeof value === "object") {
+        // NOTE: like JSON.stringify, skip undefined values and functions
+        const entries = Object.entries(value).filter(([_, v]) => v !== undefined && typeof v !== "function");
+        header(entries.length, 0x80, 0x10, [undefined, 0xde, 0xdf]);
+        return entries.forEach(([k, v]) => (write(k), write(v)));
+      }
+      put("setUint8", 1, 0xc0);
+    }
+
+    write(value);
+    return bytes.slice(0, offset);
+  }
+
+  class Encoder {
+    encode(packet) {
+      return [encode(packet)];
+    }
+  }
+
+  class Decoder {
+    constructor() {
+      this.callbacks = [];
+    }
+    on(event, callback) {
+      if (event === "decoded") this.callbacks.push(callback);
+      return this;
+    }
+    off(event, callback) {
+      this.callbacks = callback ? this.callbacks.filter((c) => c !== callback) : [];
+      return this;
+    }
+    add(data) {
+      const packet = decode(data);
+      this.callbacks.forEach((callback) => callback(packet));
+    }
+    destroy() {
+      this.callbacks = [];
+    }
+  }
+
+  return { Encoder, Decoder, encode, decode };
+})();
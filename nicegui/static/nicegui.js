@@ -29,11 +29,31 @@ function replaceUndefinedAttributes(element) {
   element.component ??= null;
   element.libraries ??= [];
   element.slots = {
-    default: { ids: element.children || [] },
     ...(element.slots ?? {}),
+    default: { ids: element.children || [] },
   };
 }
 
+function applySlotChanges(ids, changes) {
+  for (const [type, index, id] of changes) {
+    if (type === "insert") ids.splice(index, 0, id);
+    else if (type === "remove") ids.splice(index, 1);
+    else if (type === "clear") ids.splice(0);
+  }
+}
+
+function applyPatch(element, { patch = {}, unset = [], unset_props = [], slot_changes = {} }) {
+  const { props = {}, ...sections } = patch;
+  unset.forEach((key) => delete element[key]);
+  Object.assign(element, sections);
+  Object.assign(element.props, props);
+  unset_props.forEach((key) => delete element.props[key]);
+  Object.entries(slot_changes).forEach(([name, changes]) =>
+    applySlotChanges(name === "default" ? (element.children ??= []) : element.slots[name].ids, changes)
+  );
+  replaceUndefinedAttributes(element);
+}
+
 function getElement(id) {
   const _id = id instanceof Element ? id.id.slice(1) : id;
   return mounted_app.$refs["r" + _id];
@@ -344,6 +364,7 @@ function createApp(elements, options) {
         query: options.query,
         extraHeaders: options.extraHeaders,
         transports: options.transports,
+        parser: options.messageFormat === "msgpack" ? msgpackParser : undefined,
       });
       window.did_handshake = false;
       const messageHandlers = {
@@ -380,9 +401,11 @@ function createApp(elements, options) {
           document.getElementById("popup").ariaHidden = false;
         },
         update: async (msg) => {
-          const loadPromises = Object.entries(msg)
-            .filter(([_, element]) => element && (element.component || element.libraries))
-            .map(([_, element]) => loadDependencies(element, options.prefix, options.version));
+          // NOTE: full element dictionaries always contain a tag, patches never do
+          const loadPromises = Object.values(msg)
+            .map((element) => (element?.tag === undefined ? element?.patch : element))
+            .filter((element) => element && (element.component || element.libraries))
+            .map((element) => loadDependencies(element, options.prefix, options.version));
           await Promise.all(loadPromises);
 
           for (const [id, element] of Object.entries(msg)) {
@@ -390,17 +413,26 @@ function createApp(elements, options) {
               delete this.elements[id];
               continue;
             }
+            if (element.tag === undefined) {
+              if (this.elements[id]) applyPatch(this.elements[id], element);
+              continue;
+            }
             replaceUndefinedAttributes(element);
             this.elements[id] = element;
           }
 
           await this.$nextTick();
           for (const [id, element] of Object.entries(msg)) {
-            if (element?.update_method) {
-              getElement(id)[element.update_method]();
+            if (element !== null && this.elements[id]?.update_method) {
+              getElement(id)[this.elements[id].update_method]();
             }
           }
         },
+        resync: async (msg) => {
+          // NOTE: the snapshot contains all elements, so everything else has been deleted in the meantime
+          for (const id of Object.keys(this.elements)) if (!(id in msg)) delete this.elements[id];
+          await messageHandlers.update(msg);
+        },
         run_javascript: (msg) => runJavascript(msg.code, msg.request_id),
         open: (msg) => {
           const url = msg.path.startsWith("/") ? options.prefix + msg.path : msg.path;
@@ -409,6 +441,22 @@ function createApp(elements, options) {
         },
         download: (msg) => download(msg.src, msg.filename, msg.media_type, options.prefix),
         notify: (msg) => Quasar.Notify.create(msg),
+        batch: async (msg) => {
+          for (const [type, data] of msg.messages) await messageHandlers[type](data);
+        },
+        frame: async (msg) => {
+          // NOTE: compressed messages and replayed messages from the history are sent as serialized binary frames
+          let buffer = msg.data;
+          if (msg.compressed) {
+            const stream = new Blob([msg.data]).stream().pipeThrough(new DecompressionStream("deflate"));
+            buffer = await new Response(stream).arrayBuffer();
+          }
+          const data =
+            options.messageFormat === "msgpack"
+              ? msgpackParser.decode(buffer)
+              : JSON.parse(new TextDecoder().decode(buffer));
+          await messageHandlers[msg.type](data);
+        },
       };
       const socketMessageQueue = [];
       let isProcessingSocketMessage = false;
@@ -419,6 +467,7 @@ function createApp(elements, options) {
             if (message_id < window.nextMessageId) return;
             window.nextMessageId = message_id + 1;
             delete args[0]._id;
+            throttle(ack, 0.1, false, true, "ack"); // NOTE: let the server know promptly that we are keeping up
           }
           socketMessageQueue.push(() => handler(...args));
           if (!isProcessingSocketMessage) {
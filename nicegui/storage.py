@@ -1,22 +1,35 @@
 import asyncio
 import contextvars
+import dataclasses
+import heapq
 import os
+import sqlite3
 import time
 import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
 from pathlib import Path
-from typing import Dict, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from starlette.middleware import Middleware
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.requests import Request
 from starlette.responses import Response
+from starlette.routing import Match
 
-from . import core, observables
+from . import background_tasks, core, json, observables
 from .context import context
 from .observables import ObservableDict
-from .persistence import FilePersistentDict, PersistentDict, ReadOnlyDict, RedisPersistentDict
+from .persistence import (
+    FilePersistentDict,
+    PersistentDict,
+    ReadOnlyDict,
+    RedisPersistentDict,
+    SqlitePersistentDict,
+)
+from .version import __version__
 
 request_contextvar: contextvars.ContextVar[Optional[Request]] = contextvars.ContextVar('request_var', default=None)
 
@@ -26,18 +39,138 @@ PURGE_INTERVAL = timedelta(minutes=5).total_seconds()
 class RequestTrackingMiddleware(BaseHTTPMiddleware):
 
     async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        if _is_asset_route(request.url.path):
+            return await call_next(request)
         request_contextvar.set(request)
         if 'id' not in request.session:
             request.session['id'] = str(uuid.uuid4())
+        if _is_page_route(request):
+            await core.app.storage.load_user_storage(request.session['id'])
         request.state.responded = False
-        await core.app.storage._create_user_storage(request.session['id'])  # pylint: disable=protected-access
         response = await call_next(request)
-        if response.headers.get('X-NiceGUI-Content') != 'page':
-            await core.app.storage.user.close()
         request.state.responded = True
         return response
 
 
+def _is_asset_route(path: str) -> bool:
+    """Whether the path belongs to a static file, library, component, resource or favicon which never uses storage."""
+    return (path.startswith(f'/_nicegui/{__version__}/') and
+            not path.startswith(f'/_nicegui/{__version__}/dynamic_resources/')) or \
+        path.startswith('/_nicegui/auto/') or \
+        path.endswith('/favicon.ico')
+
+
+def _is_page_route(request: Request) -> bool:
+    """Whether the request is handled by a page builder function, which usually accesses user storage."""
+    from .client import Client  # pylint: disable=import-outside-toplevel
+    for route in core.app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return getattr(getattr(route, 'endpoint', None), '__wrapped__', None) in Client.page_routes
+    return False
+
+
+@dataclasses.dataclass
+class UserStorageStats:
+    """Statistics of the user storage which is kept in memory (see ``app.storage.user_stats``)."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    resident: int = 0
+    resident_bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of accesses which found the user storage already loaded."""
+        accesses = self.hits + self.misses
+        return self.hits / accesses if accesses else 0.0
+
+
+class _TabStore:
+    """SQLite database which keeps idle tab storage on disk until it is used again or expires."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='nicegui-tabs')
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('CREATE TABLE IF NOT EXISTS tabs '
+                                     '(id TEXT PRIMARY KEY, data TEXT NOT NULL, last_modified REAL NOT NULL)')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS tabs_last_modified ON tabs (last_modified)')
+        return self._connection
+
+    def _exists(self) -> bool:
+        return self._connection is not None or self.path.exists()
+
+    async def store(self, rows: List[Tuple[str, str, float]]) -> None:
+        """Write tab storage to disk, given as rows of tab ID, JSON data and last modification time."""
+        await asyncio.get_running_loop().run_in_executor(self.executor, self._store, rows)
+
+    async def load(self, tab_id: str) -> Optional[ObservableDict]:
+        """Remove the tab storage with the given ID from disk and return it (or ``None`` if it is not stored)."""
+        if not self._exists():
+            return None
+        row = await asyncio.get_running_loop().run_in_executor(self.executor, self._load, tab_id)
+        if row is None:
+            return None
+        tab = ObservableDict(json.loads(row[0]))
+        tab.last_modified = row[1]
+        return tab
+
+    async def prune(self, min_last_modified: float) -> None:
+        """Delete tab storage which has not been modified since the given time."""
+        if self._exists():
+            await asyncio.get_running_loop().run_in_executor(self.executor, self._prune, min_last_modified)
+
+    def _store(self, rows: List[Tuple[str, str, float]]) -> None:
+        with self._connect() as connection:
+            connection.executemany('INSERT OR REPLACE INTO tabs (id, data, last_modified) VALUES (?, ?, ?)', rows)
+
+    def _load(self, tab_id: str) -> Optional[Tuple[str, float]]:
+        with self._connect() as connection:
+            row = connection.execute('SELECT data, last_modified FROM tabs WHERE id = ?', (tab_id,)).fetchone()
+            if row is not None:
+                connection.execute('DELETE FROM tabs WHERE id = ?', (tab_id,))
+        return row
+
+    def _prune(self, min_last_modified: float) -> None:
+        with self._connect() as connection:
+            connection.execute('DELETE FROM tabs WHERE last_modified < ?', (min_last_modified,))
+
+    def clear(self) -> None:
+        """Close and delete the database."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        for suffix in ['', '-wal', '-shm']:
+            self.path.with_name(self.path.name + suffix).unlink(missing_ok=True)
+
+
+def _serialize_tab(tab: ObservableDict) -> Optional[str]:
+    """Serialize tab storage for spilling it to disk (or return ``None`` if it would not be restored unchanged)."""
+    try:
+        data = json.dumps(tab)
+    except TypeError:
+        return None
+    return data if _is_restored(tab, json.loads(data)) else None
+
+
+def _is_restored(value: Any, restored: Any) -> bool:
+    """Whether a value is equal to its JSON round trip, including its types (e.g. no tuples, int keys or decimals)."""
+    if isinstance(value, dict):
+        return type(restored) is dict and all(type(key) is str for key in value) and value.keys() == restored.keys() \
+            and all(_is_restored(item, restored[key]) for key, item in value.items())
+    if isinstance(value, list):
+        return type(restored) is list and len(value) == len(restored) \
+            and all(_is_restored(item, restored_item) for item, restored_item in zip(value, restored))
+    return type(value) is type(restored) and value == restored  # NOTE: also rejects NaN, which is restored as None
+
+
 def set_storage_secret(storage_secret: Optional[str] = None) -> None:
     """Set storage_secret and add request tracking middleware."""
     if any(m.cls == SessionMiddleware for m in core.app.user_middleware):
@@ -62,20 +195,60 @@ class Storage:
     redis_key_prefix = os.environ.get('NICEGUI_REDIS_KEY_PREFIX', 'nicegui:')
     '''Prefix for Redis keys. Defaults to "nicegui:".'''
 
+    redis_field_level = os.environ.get('NICEGUI_REDIS_FIELD_LEVEL', 'false').lower() == 'true'
+    '''Whether Redis storage keeps top-level keys in a hash and only publishes changed keys. Defaults to False.'''
+
+    sqlite_path = os.environ.get('NICEGUI_SQLITE_PATH', None)
+    '''Path of a SQLite database which stores all users instead of one file per user. Defaults to None.'''
+
+    journal = os.environ.get('NICEGUI_STORAGE_JOURNAL', 'false').lower() == 'true'
+    '''Whether local storage files append changes to a journal instead of being rewritten. Defaults to False.'''
+
+    flush_interval = float(os.environ.get('NICEGUI_STORAGE_FLUSH_INTERVAL', '1.0'))
+    '''Seconds between writing changes to the journal of local storage files or the SQLite database. Defaults to 1.0.'''
+
+    durability = os.environ.get('NICEGUI_STORAGE_DURABILITY', 'snapshot')
+    '''Whether journaled storage files are synced to disk: "none", "snapshot" or "full". Defaults to "snapshot".'''
+
     max_tab_storage_age: float = timedelta(days=30).total_seconds()
     '''Maximum age in seconds before tab storage is automatically purged. Defaults to 30 days.'''
 
+    spill_tab_storage = os.environ.get('NICEGUI_STORAGE_SPILL_TABS', 'false').lower() == 'true'
+    '''Whether idle tab storage which only contains plain JSON data is moved to disk. Defaults to False.'''
+
+    tab_storage_spill_time: float = timedelta(minutes=10).total_seconds()
+    '''Time in seconds after which unmodified tab storage without a client is moved to disk. Defaults to 10 minutes.'''
+
+    max_user_storages = int(os.environ.get('NICEGUI_STORAGE_MAX_USERS', '10000'))
+    '''Maximum number of user storages which are kept in memory. Defaults to 10000.'''
+
+    max_user_storage_idle_time = float(os.environ.get('NICEGUI_STORAGE_MAX_USER_IDLE_TIME',
+                                                      timedelta(hours=1).total_seconds()))
+    '''Time in seconds after which unused user storage is removed from memory. Defaults to 1 hour.'''
+
     def __init__(self) -> None:
         self._general = Storage._create_persistent_dict('general')
-        self._users: Dict[str, PersistentDict] = {}
+        self._users: OrderedDict[str, PersistentDict] = OrderedDict()  # NOTE: least recently used first
+        self._user_access_times: Dict[str, float] = {}
+        self._user_stats = UserStorageStats()
+        self._closing_users: Dict[str, Tuple[PersistentDict, asyncio.Task]] = {}  # NOTE: evicted, but not yet closed
         self._tabs: Dict[str, ObservableDict] = {}
+        self._tab_checks: List[Tuple[float, str]] = []  # NOTE: heap of times when a tab should be spilled or pruned
+        self._tab_store = _TabStore(self.path / 'tabs.db')
 
     @staticmethod
     def _create_persistent_dict(id: str) -> PersistentDict:  # pylint: disable=redefined-builtin
         if Storage.redis_url:
-            return RedisPersistentDict(url=Storage.redis_url, id=id, key_prefix=Storage.redis_key_prefix)
+            return RedisPersistentDict(url=Storage.redis_url, id=id, key_prefix=Storage.redis_key_prefix,
+                                       field_level=Storage.redis_field_level)
+        elif Storage.sqlite_path:
+            return SqlitePersistentDict(path=Path(Storage.sqlite_path).resolve(), id=id,
+                                        flush_interval=Storage.flush_interval)
         else:
-            return FilePersistentDict(Storage.path / f'storage-{id}.json', encoding='utf-8')
+            return FilePersistentDict(Storage.path / f'storage-{id}.json', encoding='utf-8',
+                                      journal=Storage.journal,
+                                      flush_interval=Storage.flush_interval,
+                                      durability=Storage.durability)  # type: ignore[arg-type]
 
     @property
     def browser(self) -> Union[ReadOnlyDict, Dict]:
@@ -106,6 +279,8 @@ class Storage:
 
         The data is stored on the server.
         It is shared between all browser tabs by identifying the user via session cookie ID.
+        It is loaded asynchronously before page builder functions are called.
+        Other requests load it on first access, so requests which do not use it never touch the persistence layer.
         """
         request: Optional[Request] = request_contextvar.get()
         if request is None:
@@ -116,13 +291,94 @@ class Storage:
                 raise RuntimeError('app.storage.user needs a storage_secret passed in ui.run()')
             raise RuntimeError('app.storage.user can only be used within a UI context')
         session_id = request.session['id']
-        assert session_id in self._users, f'user storage for {session_id} should be created before accessing it'
-        return self._users[session_id]
+        user = self._users.get(session_id)
+        if user is None:
+            self._user_stats.misses += 1
+            user = Storage._create_persistent_dict(f'user-{session_id}')
+            user.initialize_sync()  # NOTE: fallback for requests which are not handled by page builder functions
+            if session_id in self._closing_users:
+                evicted, _ = self._closing_users[session_id]
+                self._restore_user_storage(user, evicted)
+            self._add_user_storage(session_id, user)
+        else:
+            self._user_stats.hits += 1
+            self._users.move_to_end(session_id)
+            self._user_access_times[session_id] = time.time()
+        return user
+
+    async def load_user_storage(self, session_id: str) -> None:
+        """Load the user storage for the given session ID without blocking the event loop. (For internal use only.)"""
+        if session_id in self._users:
+            return
+        if session_id in self._closing_users:
+            _, task = self._closing_users[session_id]
+            await asyncio.wait([task])  # NOTE: the evicted storage might still be writing its latest changes
+            if session_id in self._users:
+                return
+        self._user_stats.misses += 1
+        user = Storage._create_persistent_dict(f'user-{session_id}')
+        await user.initialize()
+        if session_id in self._users:  # NOTE: a concurrent request has loaded the storage in the meantime
+            await user.close()
+            return
+        self._add_user_storage(session_id, user)
 
-    async def _create_user_storage(self, session_id: str) -> None:
-        if session_id not in self._users:
-            self._users[session_id] = Storage._create_persistent_dict(f'user-{session_id}')
-            await self._users[session_id].initialize()
+    @staticmethod
+    def _restore_user_storage(user: PersistentDict, evicted: PersistentDict) -> None:
+        """Bring freshly loaded user storage up to date with evicted storage which might not have been written yet."""
+        data = json.loads(json.dumps(evicted))
+        if data == user:
+            return
+        with observables.batch():
+            for key in [key for key in user if key not in data]:
+                del user[key]
+            user.update(data)
+
+    def _add_user_storage(self, session_id: str, user: PersistentDict) -> None:
+        self._users[session_id] = user
+        self._user_access_times[session_id] = time.time()
+        if len(self._users) > self.max_user_storages:
+            self._evict_user_storage()
+
+    @property
+    def user_stats(self) -> UserStorageStats:
+        """Statistics of the user storage which is kept in memory, e.g. the hit rate and the resident bytes."""
+        return dataclasses.replace(self._user_stats,
+                                   resident=len(self._users),
+                                   resident_bytes=sum(user.size for user in self._users.values()))
+
+    def _evict_user_storage(self) -> None:
+        """Close and forget least recently used or idle user storage which is not used by a connected client.
+
+        The storage is loaded again when it is accessed the next time.
+        """
+        from .client import Client  # pylint: disable=import-outside-toplevel
+        active_session_ids = {
+            client.request.session.get('id')
+            for client in Client.instances.values()
+            if client.request is not None and 'session' in client.request.scope
+        }
+        max_count = int(0.9 * self.max_user_storages)  # NOTE: evict in batches to not collect active sessions too often
+        min_access_time = time.time() - self.max_user_storage_idle_time
+        for session_id in list(self._users):
+            if len(self._users) <= max_count and self._user_access_times[session_id] > min_access_time:
+                break
+            if session_id in active_session_ids:
+                continue
+            user = self._users.pop(session_id)
+            del self._user_access_times[session_id]
+            self._user_stats.evictions += 1
+            task = background_tasks.create(self._close_user_storage(session_id, user),
+                                           name=f'close user storage {session_id}')
+            self._closing_users[session_id] = (user, task)
+
+    async def _close_user_storage(self, session_id: str, user: PersistentDict) -> None:
+        try:
+            await user.close()
+        finally:
+            closing = self._closing_users.get(session_id)
+            if closing is not None and closing[0] is user:
+                del self._closing_users[session_id]
 
     @staticmethod
     def _is_in_auto_index_context() -> bool:
@@ -171,26 +427,80 @@ class Storage:
                 assert isinstance(tab, PersistentDict)
                 await tab.initialize()
             else:
-                self._tabs[tab_id] = ObservableDict()
+                tab = await self._tab_store.load(tab_id)
+                if tab_id in self._tabs:  # NOTE: the tab has been created or copied in the meantime
+                    return
+                self._tabs[tab_id] = tab or ObservableDict()
+            self._schedule_tab_check(tab_id)
 
-    def copy_tab(self, old_tab_id: str, tab_id: str) -> None:
+    async def copy_tab(self, old_tab_id: str, tab_id: str) -> None:
         """Copy the tab storage to a new tab. (For internal use only.)"""
+        if old_tab_id not in self._tabs and not Storage.redis_url:
+            old_tab = await self._tab_store.load(old_tab_id)
+            if old_tab is not None and old_tab_id not in self._tabs:
+                self._tabs[old_tab_id] = old_tab
+                self._schedule_tab_check(old_tab_id)
         if old_tab_id in self._tabs:
             if Storage.redis_url:
                 self._tabs[tab_id] = Storage._create_persistent_dict(f'tab-{tab_id}')
             else:
                 self._tabs[tab_id] = ObservableDict()
             self._tabs[tab_id].update(self._tabs[old_tab_id])
+            self._schedule_tab_check(tab_id)
+
+    def _schedule_tab_check(self, tab_id: str, not_before: float = 0) -> None:
+        tab = self._tabs[tab_id]
+        delay = min(self.tab_storage_spill_time, self.max_tab_storage_age)
+        heapq.heappush(self._tab_checks, (max(tab.last_modified + delay, not_before), tab_id))
 
     async def prune_tab_storage(self) -> None:
-        """Regularly prune tab storage that is older than the configured `max_tab_storage_age`."""
+        """Regularly prune tab storage that is older than the configured `max_tab_storage_age`.
+
+        If `spill_tab_storage` is enabled, tab storage which has not been modified for `tab_storage_spill_time`,
+        is not used by a client and survives a JSON round trip unchanged is moved to disk.
+        Only tabs which are due are visited, so pruning does not depend on the total number of tabs.
+        """
+        while True:
+            await self._check_tabs()
+            try:
+                await asyncio.sleep(PURGE_INTERVAL)
+            except asyncio.CancelledError:
+                break
+
+    async def _check_tabs(self) -> None:
+        from .client import Client  # pylint: disable=import-outside-toplevel
+        now = time.time()
+        active_tab_ids = {client.tab_id for client in Client.instances.values() if client.tab_id is not None}
+        rows: List[Tuple[str, str, float]] = []
+        while self._tab_checks and self._tab_checks[0][0] <= now:
+            _, tab_id = heapq.heappop(self._tab_checks)
+            tab = self._tabs.get(tab_id)
+            if tab is None:
+                continue  # NOTE: the tab has been spilled or pruned already
+            if now > tab.last_modified + self.max_tab_storage_age:
+                tab.clear()
+                if isinstance(tab, PersistentDict):
+                    await tab.close()
+                del self._tabs[tab_id]
+            elif now < tab.last_modified + self.tab_storage_spill_time:
+                self._schedule_tab_check(tab_id)  # NOTE: the tab has been modified in the meantime
+            elif tab_id in active_tab_ids:
+                self._schedule_tab_check(tab_id, not_before=now + self.tab_storage_spill_time)
+            else:
+                data = _serialize_tab(tab) if self.spill_tab_storage and not isinstance(tab, PersistentDict) else None
+                if data is None:
+                    self._schedule_tab_check(tab_id, not_before=tab.last_modified + self.max_tab_storage_age)
+                    continue
+                rows.append((tab_id, data, tab.last_modified))
+                del self._tabs[tab_id]
+        if rows:
+            await self._tab_store.store(rows)
+        await self._tab_store.prune(now - self.max_tab_storage_age)
+
+    async def prune_user_storage(self) -> None:
+        """Regularly evict user storage which has not been used for `max_user_storage_idle_time`."""
         while True:
-            for tab_id, tab in list(self._tabs.items()):
-                if time.time() > tab.last_modified + self.max_tab_storage_age:
-                    tab.clear()
-                    if isinstance(tab, PersistentDict):
-                        await tab.close()
-                    del self._tabs[tab_id]
+            self._evict_user_storage()
             try:
                 await asyncio.sleep(PURGE_INTERVAL)
             except asyncio.CancelledError:
@@ -199,7 +509,12 @@ class Storage:
     def clear(self) -> None:
         """Clears all storage."""
         self._general.clear()
+        if isinstance(self._general, SqlitePersistentDict):
+            self._general.clear_database()
         self._users.clear()
+        self._user_access_times.clear()
+        self._closing_users.clear()
+        self._user_stats = UserStorageStats()
         try:
             client = context.client
         except RuntimeError:
@@ -207,13 +522,17 @@ class Storage:
         else:
             client.storage.clear()
         self._tabs.clear()
-        for filepath in self.path.glob('storage-*.json'):
+        self._tab_checks.clear()
+        self._tab_store.clear()
+        for filepath in self.path.glob('storage-*.json*'):
             filepath.unlink()
-        if self.path.exists():
+        if self.path.exists() and not any(self.path.iterdir()):  # NOTE: the path might contain the SQLite database
             self.path.rmdir()
 
     async def on_shutdown(self) -> None:
         """Close all persistent storage. (For internal use only.)"""
         for user in self._users.values():
             await user.close()
+        if self._closing_users:
+            await asyncio.wait([task for _, task in self._closing_users.values()])
         await self._general.close()
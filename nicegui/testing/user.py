@@ -88,14 +88,16 @@ class User:
         async def simulated_emit(message: Message) -> None:
             await original_emit(message)
             _, type_, data = message
-            if type_ == 'run_javascript':
-                for rule, result in self.javascript_rules.items():
-                    match = rule.match(data['code'])
-                    if match:
-                        self._client.handle_javascript_response({
-                            'request_id': data['request_id'],
-                            'result': result(match),
-                        })
+            for inner_type, inner_data in data['messages'] if type_ == 'batch' else [(type_, data)]:
+                if inner_type == 'run_javascript':
+                    for rule, result in self.javascript_rules.items():
+                        match = rule.match(inner_data['code'])
+                        if match:
+                            self._client.handle_javascript_response({
+                                'request_id': inner_data['request_id'],
+                                'result': result(match),
+                            })
+            self._client.outbox.handle_ack(self._client.outbox.next_message_id)
 
         self._client.outbox._emit = simulated_emit  # type: ignore
 
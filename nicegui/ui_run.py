@@ -55,7 +55,13 @@ def run(*,
         language: Language = 'en-US',
         binding_refresh_interval: float = 0.1,
         reconnect_timeout: float = 3.0,
+        unconnected_client_timeout: float = 60.0,
         message_history_length: int = 1000,
+        message_history_bytes: int = 1_000_000,
+        outbox_max_messages: Optional[int] = None,
+        outbox_max_bytes: Optional[int] = None,
+        message_format: Literal['json', 'msgpack'] = 'json',
+        compression_threshold: Optional[int] = None,
         cache_control_directives: str = 'public, max-age=31536000, immutable, stale-while-revalidate=31536000',
         fastapi_docs: Union[bool, DocsConfig] = False,
         show: bool = True,
@@ -90,7 +96,13 @@ def run(*,
     :param language: Quasar 元素的语言 (default: `'en-US'`)
     :param binding_refresh_interval: 绑定更新之间的时间 (default: `0.1` seconds, 越大越节省 CPU)
     :param reconnect_timeout: 服务器等待浏览器重新连接的最大时间 (default: 3.0 seconds)
+    :param unconnected_client_timeout: 从未建立连接的客户端（例如爬虫和健康检查的页面请求）在被删除前保留的时间，之后才连接的浏览器会重新加载页面，必须为正数 (default: 60.0 seconds)
     :param message_history_length: 连接中断后将存储并重新发送的最大消息数 (default: 1000, use 0 to disable, *added in version 2.9.0*)
+    :param message_history_bytes: 每个客户端为重新连接而存储的已序列化消息的最大总字节数，可通过 `client.outbox.history_bytes` 查看 (default: 1 MB)
+    :param outbox_max_messages: 每个客户端未确认消息的最大数量，超过后暂停发送并合并待处理的更新 (default: `None`, backpressure disabled)
+    :param outbox_max_bytes: 每个客户端未确认数据的最大字节数，超过后暂停发送并合并待处理的更新 (default: `None`, backpressure disabled)
+    :param message_format: socket.io 消息的传输格式，`'msgpack'` 使用二进制帧并将 NumPy 数组作为类型化数组发送 (default: `'json'`, `'msgpack'` requires `pip install nicegui[msgpack]` and is not supported with On Air)
+    :param compression_threshold: 消息达到此字节数时压缩后发送，压缩统计信息可通过 `client.outbox.compression_stats` 获取 (default: `None`, compression disabled; note that uvicorn's `ws_per_message_deflate` already compresses every websocket frame)
     :param cache_control_directives: 内部静态文件的缓存控制指令 (default: `'public, max-age=31536000, immutable, stale-while-revalidate=31536000'`)
     :param fastapi_docs: 启用 FastAPI 的自动文档，包括 Swagger UI、ReDoc 和 OpenAPI JSON (bool or dictionary as described `here <https://fastapi.tiangolo.com/tutorial/metadata/>`_, default: `False`, *updated in version 2.9.0*)
     :param show: 自动在浏览器标签页中打开 UI (default: `True`)
@@ -111,6 +123,9 @@ def run(*,
     :param show_welcome_message: 是否显示欢迎消息 (default: `True`)
     :param kwargs: 附加的关键字参数将传递给 `uvicorn.run`
     """
+    if on_air and message_format == 'msgpack':
+        raise ValueError('message_format="msgpack" is not supported with On Air.')
+
     core.app.config.add_run_config(
         reload=reload,
         title=title,
@@ -120,7 +135,13 @@ def run(*,
         language=language,
         binding_refresh_interval=binding_refresh_interval,
         reconnect_timeout=reconnect_timeout,
+        unconnected_client_timeout=unconnected_client_timeout,
         message_history_length=message_history_length,
+        message_history_bytes=message_history_bytes,
+        outbox_max_messages=outbox_max_messages,
+        outbox_max_bytes=outbox_max_bytes,
+        message_format=message_format,
+        compression_threshold=compression_threshold,
         cache_control_directives=cache_control_directives,
         tailwind=tailwind,
         prod_js=prod_js,
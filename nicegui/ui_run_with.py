@@ -21,7 +21,13 @@ def run_with(
     language: Language = 'en-US',
     binding_refresh_interval: float = 0.1,
     reconnect_timeout: float = 3.0,
+    unconnected_client_timeout: float = 60.0,
     message_history_length: int = 1000,
+    message_history_bytes: int = 1_000_000,
+    outbox_max_messages: Optional[int] = None,
+    outbox_max_bytes: Optional[int] = None,
+    message_format: Literal['json', 'msgpack'] = 'json',
+    compression_threshold: Optional[int] = None,
     cache_control_directives: str = 'public, max-age=31536000, immutable, stale-while-revalidate=31536000',
     mount_path: str = '/',
     on_air: Optional[Union[str, Literal[True]]] = None,
@@ -40,7 +46,13 @@ def run_with(
     :param language: language for Quasar elements (default: `'en-US'`)
     :param binding_refresh_interval: time between binding updates (default: `0.1` seconds, bigger is more CPU friendly)
     :param reconnect_timeout: maximum time the server waits for the browser to reconnect (default: 3.0 seconds)
+    :param unconnected_client_timeout: time after which clients that never connected (e.g. page requests of crawlers and health checks) are deleted, browsers connecting later reload the page (must be positive, default: 60.0 seconds)
     :param message_history_length: maximum number of messages that will be stored and resent after a connection interruption (default: 1000, use 0 to disable, *added in version 2.9.0*)
+    :param message_history_bytes: maximum total size of the serialized messages stored per client for reconnects, see `client.outbox.history_bytes` (default: 1 MB)
+    :param outbox_max_messages: maximum number of unacknowledged messages per client before sending is paused and pending updates are coalesced (default: `None`, backpressure disabled)
+    :param outbox_max_bytes: maximum number of unacknowledged bytes per client before sending is paused and pending updates are coalesced (default: `None`, backpressure disabled)
+    :param message_format: wire format of socket.io messages, `'msgpack'` uses binary frames and sends NumPy arrays as typed arrays (default: `'json'`, `'msgpack'` requires `pip install nicegui[msgpack]` and is not supported with On Air)
+    :param compression_threshold: minimum size in bytes of messages which are sent compressed, see `client.outbox.compression_stats` for statistics (default: `None`, compression disabled)
     :param cache_control_directives: cache control directives for internal static files (default: `'public, max-age=31536000, immutable, stale-while-revalidate=31536000'`)
     :param mount_path: mount NiceGUI at this path (default: `'/'`)
     :param on_air: tech preview: `allows temporary remote access <https://nicegui.io/documentation/section_configuration_deployment#nicegui_on_air>`_ if set to `True` (default: disabled)
@@ -49,6 +61,9 @@ def run_with(
     :param storage_secret: secret key for browser-based storage (default: `None`, a value is required to enable ui.storage.individual and ui.storage.browser)
     :param show_welcome_message: whether to show the welcome message (default: `True`)
     """
+    if on_air and message_format == 'msgpack':
+        raise ValueError('message_format="msgpack" is not supported with On Air.')
+
     core.app.config.add_run_config(
         reload=False,
         title=title,
@@ -58,7 +73,13 @@ def run_with(
         language=language,
         binding_refresh_interval=binding_refresh_interval,
         reconnect_timeout=reconnect_timeout,
+        unconnected_client_timeout=unconnected_client_timeout,
         message_history_length=message_history_length,
+        message_history_bytes=message_history_bytes,
+        outbox_max_messages=outbox_max_messages,
+        outbox_max_bytes=outbox_max_bytes,
+        message_format=message_format,
+        compression_threshold=compression_threshold,
         tailwind=tailwind,
         prod_js=prod_js,
         show_welcome_message=show_welcome_message,
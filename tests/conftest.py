@@ -1 +1,24 @@
+from typing import Iterator
+
+import pytest
+
+try:
+    # try to import module, only run Redis tests if succeeded
+    import fakeredis
+except ImportError:
+    pass
+
 pytest_plugins = ['nicegui.testing.plugin']
+
+
+@pytest.fixture
+def redis_server(monkeypatch: pytest.MonkeyPatch) -> Iterator['fakeredis.FakeServer']:
+    """Let all Redis URLs connect to the same in-memory server, so different URLs behave like different processes."""
+    # pylint: disable=import-outside-toplevel
+    from nicegui.persistence import redis_persistent_dict
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis_persistent_dict.redis, 'from_url',
+                        lambda url, **kwargs: fakeredis.FakeAsyncRedis(server=server))
+    monkeypatch.setattr(redis_persistent_dict.redis_sync, 'from_url',
+                        lambda url, **kwargs: fakeredis.FakeRedis(server=server))
+    yield server
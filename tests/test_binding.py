@@ -1,10 +1,14 @@
+import asyncio
 import copy
+import time
 import weakref
 from typing import Dict, Optional, Tuple
 
+import pytest
 from selenium.webdriver.common.keys import Keys
 
-from nicegui import binding, ui
+from nicegui import app, binding, ui
+from nicegui.observables import ObservableDict
 from nicegui.testing import Screen, User
 
 
@@ -205,3 +209,187 @@ async def test_nested_propagation(user: User):
 
     await user.open('/')
     await user.should_see('a = 2')  # the final value of a should be 2
+
+
+async def test_observable_sources_are_not_polled(user: User):
+    data = ObservableDict({'text': 'Hello'})
+
+    class Model(binding.BindableObject):
+        def __init__(self) -> None:
+            self.text = 'first'
+
+    model = Model()
+    ui.label().bind_text_from(data, 'text')
+    ui.label().bind_text_from(model, 'text')
+    assert not binding.active_links
+
+    await user.open('/')
+    await user.should_see('Hello')
+    await user.should_see('first')
+
+    data['text'] = 'World'
+    model.text = 'second'
+    labels = [element for element in user.client.elements.values() if isinstance(element, ui.label)]
+    assert [label.text for label in labels] == ['World', 'second'], 'changes are propagated immediately'
+
+
+async def test_refresh_loop_waits_for_active_links(user: User):
+    async def wait_for_refresh() -> None:
+        await asyncio.sleep(3 * app.config.binding_refresh_interval)
+
+    calls = []
+    original_refresh_step = binding._refresh_step  # pylint: disable=protected-access
+    binding._refresh_step = lambda: (calls.append(1), original_refresh_step())  # pylint: disable=protected-access
+    try:
+        await user.open('/')
+        await wait_for_refresh()
+        assert not calls, 'there is nothing to poll'
+
+        data = {'text': 'Hello'}
+        label = ui.label().bind_text_from(data, 'text')
+        data['text'] = 'World'
+        await wait_for_refresh()
+        assert calls
+        assert label.text == 'World'
+    finally:
+        binding._refresh_step = original_refresh_step  # pylint: disable=protected-access
+
+
+def test_remove_keeps_other_bindings(nicegui_reset_globals):
+    class Model:
+        value = binding.BindableProperty()
+
+        def __init__(self) -> None:
+            self.value = 'bindable'
+            self.plain = 'polled'
+
+    model = Model()
+    labels = [ui.label().bind_text_from(model, 'value' if i % 2 else 'plain') for i in range(6)]
+    assert len(binding.active_links) == 3
+
+    binding.remove([labels[0], labels[3]])
+    assert len(binding.active_links) == 2
+    assert {id(link[2]) for link in binding.active_links} == {id(labels[2]), id(labels[4])}
+    assert [id(target) for _, target, _, _ in binding.bindings[(id(model), 'value')]] == [id(labels[1]), id(labels[5])]
+
+    binding.remove([model])
+    assert not binding.active_links
+    assert not binding.bindings
+    assert not binding._binding_keys_by_object and not binding._links_by_object  # pylint: disable=protected-access
+    assert not any(obj_id == id(model) for obj_id, _ in binding.bindable_properties)
+
+
+def test_transaction(nicegui_reset_globals):
+    changes = []
+
+    class Model:
+        a = binding.BindableProperty(on_change=lambda obj, value: changes.append(('a', value)))
+        b = binding.BindableProperty(on_change=lambda obj, value: changes.append(('b', value)))
+
+        def __init__(self) -> None:
+            self.a = 0
+            self.b = 0
+
+    model = Model()
+    texts = []
+    label = ui.label().bind_text_from(model, 'a', lambda a: texts.append(a) or f'a = {a}')
+    number = ui.number().bind_value(model, 'b')
+    texts.clear()
+
+    with binding.transaction():
+        for i in range(1, 11):
+            model.a = i
+        model.b = 5
+        assert label.text == 'a = 0', 'targets are updated when the transaction ends'
+        assert not changes, 'change handlers are deferred'
+    assert label.text == 'a = 10'
+    assert number.value == 5
+    assert texts == [10], 'only the final value is propagated'
+    assert changes == [('a', 10), ('b', 5)]
+
+    changes.clear()
+    with binding.transaction():
+        number.value = 7
+        model.b = 3
+    assert model.b == 3 and number.value == 3, 'the latest change wins'
+    assert changes == [('b', 3)]
+
+    changes.clear()
+    with binding.transaction():
+        model.a = 11
+        model.a = 10
+    assert changes == [], 'no change handler is called if the value is restored'
+
+
+async def test_refresh_intervals_and_link_stats(user: User):
+    def slow_str(value: int) -> str:
+        time.sleep(0.02)
+        return str(value)
+
+    data = {'fast': 0, 'slow': 0}
+    fast_label = ui.label()
+    slow_label = ui.label()
+    binding.bind_from(fast_label, 'text', data, 'fast', backward=str, refresh_interval=0.05)
+    binding.bind_from(slow_label, 'text', data, 'slow', backward=slow_str, refresh_interval=10.0)
+
+    await user.open('/')
+    await asyncio.sleep(0.1)
+    data['fast'] = data['slow'] = 1
+    await asyncio.sleep(0.3)
+    assert fast_label.text == '1'
+    assert slow_label.text == '0', 'the slow link is not due yet'
+
+    slow_stats, fast_stats = binding.link_stats()
+    assert slow_stats.source_name == 'slow' and slow_stats.transform is slow_str
+    assert slow_stats.transform_time >= 0.02
+    assert slow_stats.max_time >= slow_stats.transform_time / slow_stats.checks
+    assert fast_stats.source_name == 'fast'
+    assert fast_stats.checks >= 3
+    assert fast_stats.changes == 1
+    assert fast_stats.change_rate == 1 / fast_stats.checks
+
+
+def test_refresh_step_is_time_budgeted(nicegui_reset_globals, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(app.config, 'binding_refresh_interval', 0.1, raising=False)
+
+    def slow_str(value: int) -> str:
+        time.sleep(0.005)
+        return str(value)
+
+    data = {'value': 0}
+    labels = [ui.label().bind_text_from(data, 'value', backward=slow_str) for _ in range(10)]
+    data['value'] = 1
+    binding._refresh_step()  # pylint: disable=protected-access
+    updated = sum(label.text == '1' for label in labels)
+    assert 0 < updated < 10, 'the remaining links are refreshed in the next steps'
+    for _ in range(10):
+        binding._refresh_step()  # pylint: disable=protected-access
+    assert all(label.text == '1' for label in labels)
+
+
+async def test_bindable_dataclass_with_slots(user: User):
+    @binding.bindable_dataclass(slots=True, bindable_fields=['value'])
+    class Row:
+        value: int = 1
+        note: str = 'plain'
+
+    row = Row()
+    assert not hasattr(row, '__dict__')
+    assert Row.__slots__ == ('note', '_bindable_value', '__weakref__')
+    ui.label().bind_text_from(row, 'value', lambda v: f'value={v}')
+    ui.label().bind_text_from(row, 'note')
+    assert len(binding.active_links) == 1, 'only the plain field is polled'
+
+    await user.open('/')
+    await user.should_see('value=1')
+    await user.should_see('plain')
+
+    row.value = 2
+    await user.should_see('value=2')
+
+    copied_row = copy.copy(row)
+    assert copied_row == row
+    ui.label().bind_text_from(copied_row, 'value', lambda v: f'copy={v}')
+    copied_row.value = 3
+    await user.should_see('copy=3')
+    await user.should_see('value=2')
@@ -358,3 +358,17 @@ def test_no_cyclic_references(screen: Screen):
     assert len(elements) == 0, 'all elements should be deleted immediately'
 
     screen.open('/')
+
+
+def test_serialization_cache(nicegui_reset_globals):
+    input_ = ui.input('Name').props('color=red')
+    first, second = input_._to_dict(), input_._to_dict()  # pylint: disable=protected-access
+    assert first['events'] is second['events'], 'event listeners are serialized once'
+    assert first['component'] is second['component'] is ui.input('Other')._to_dict()['component']  # pylint: disable=protected-access
+
+    input_.on('dblclick', lambda: None)
+    input_.props('color=blue')
+    third = input_._to_dict()  # pylint: disable=protected-access
+    assert third['events'][-1]['type'] == 'dblclick'
+    assert third['props']['color'] == 'blue'
+    assert first['events'] == second['events'] != third['events'], 'previously serialized events are not modified'
@@ -24,7 +24,9 @@ def test_json():
 
     # pylint: disable=import-outside-toplevel
     from nicegui.json.builtin_wrapper import dumps as builtin_dumps
+    from nicegui.json.builtin_wrapper import dumps_bytes as builtin_dumps_bytes
     from nicegui.json.orjson_wrapper import dumps as orjson_dumps
+    from nicegui.json.orjson_wrapper import dumps_bytes as orjson_dumps_bytes
 
     # test different scalar and array types
     tests = [
@@ -51,3 +53,4 @@ def test_json():
         orjson_str = orjson_dumps(test)
         builtin_str = builtin_dumps(test)
         assert orjson_str == builtin_str, f'json serializer implementations do not match: orjson={orjson_str}, built-in={builtin_str}'
+        assert orjson_dumps_bytes(test) == builtin_dumps_bytes(test) == orjson_str.encode()
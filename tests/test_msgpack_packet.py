@@ -0,0 +1,74 @@
+import sys
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+import pytest
+from socketio import packet
+
+from nicegui import json, ui
+from nicegui.msgpack_packet import TYPED_ARRAY_CODES, create_packet_class
+
+try:
+    # try to import module, only run test if succeeded
+    import msgpack
+except ImportError:
+    pass
+
+
+@pytest.mark.skipif('msgpack' not in sys.modules, reason='requires the msgpack library.')
+def test_typed_arrays():
+    dtypes = {code: np.dtype(name) for name, code in TYPED_ARRAY_CODES.items()}
+
+    def ext_hook(code: int, data: bytes) -> list:
+        return np.frombuffer(data, dtype=dtypes[code].newbyteorder('<')).tolist()
+
+    data = {
+        'float64': np.array([1.5, -2.25]),
+        'float32': np.array([0.5], dtype=np.float32),
+        'uint8': np.array([0, 255], dtype=np.uint8),
+        'big_endian': np.array([1, 2], dtype='>i4'),
+        'int64': np.array([1, 2, 3], dtype=np.int64),
+        'matrix': np.ones((2, 2), dtype=np.int16),
+    }
+    encoded = create_packet_class()(packet.EVENT, data=['update', data]).encode()
+    assert isinstance(encoded, bytes)
+    assert msgpack.loads(encoded, ext_hook=ext_hook)['data'][1] == {key: value.tolist() for key, value in data.items()}
+
+    raw = msgpack.loads(encoded)['data'][1]
+    assert raw['float64'].code == TYPED_ARRAY_CODES['float64']
+    assert raw['int64'].code == TYPED_ARRAY_CODES['float64'], 'int64 arrays are sent as float64 arrays'
+
+
+@pytest.mark.skipif('msgpack' not in sys.modules, reason='requires the msgpack library.')
+def test_same_values_as_json():
+    tests = [
+        None,
+        'text €',
+        [1, -3.5, True, None],
+        {'key': 'value', 'nested': {'list': []}},
+        date(2020, 1, 31),
+        Decimal('1.5'),
+        np.float32(0.5),
+        np.int64(7),
+        np.array([True, False]),
+        np.array([1.0, None, 'test'], dtype=np.object_),
+        np.array(['2010-10-17 07:15:30'], dtype=np.datetime64),
+    ]
+    packet_class = create_packet_class()
+    for test in tests:
+        decoded = msgpack.loads(packet_class(packet.EVENT, data=['message', test]).encode())['data'][1]
+        assert decoded == json.loads(json.dumps(test)), f'msgpack and json messages do not match for {test!r}'
+
+
+@pytest.mark.skipif('msgpack' not in sys.modules, reason='requires the msgpack library.')
+def test_packet_class_without_configure(monkeypatch: pytest.MonkeyPatch):
+    from socketio.msgpack_packet import MsgPackPacket  # pylint: disable=import-outside-toplevel
+    monkeypatch.delattr(MsgPackPacket, 'configure')  # NOTE: not available before python-socketio 5.12
+    encoded = create_packet_class()(packet.EVENT, data=['update', {'x': np.array([1.0])}]).encode()
+    assert msgpack.loads(encoded)['data'][1]['x'].code == TYPED_ARRAY_CODES['float64']
+
+
+def test_msgpack_is_rejected_with_on_air():
+    with pytest.raises(ValueError):
+        ui.run(message_format='msgpack', on_air=True)
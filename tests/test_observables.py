@@ -1,8 +1,10 @@
 import asyncio
 import copy
 import sys
+from typing import List
 
-from nicegui import ui
+from nicegui import observables, ui
+from nicegui.events import ObservableChangeEventArguments
 from nicegui.observables import ObservableDict, ObservableList, ObservableSet
 from nicegui.testing import Screen
 
@@ -166,3 +168,102 @@ def test_copy():
     assert a == [[0, 2, 3], [4, 5, 6], [7, 8, 9]]
     assert b == [[0, 2, 3], [4, 5, 6]]
     assert c == [[1, 2, 3], [4, 5, 6]]
+
+
+def test_changed_keys():
+    events: List[ObservableChangeEventArguments] = []
+    data = ObservableDict({'a': 1, 'items': [1, 2]}, on_change=events.append)
+    data['b'] = 2
+    assert events[-1].sender is data and events[-1].keys == {'b'}
+    data.update(c=3, d=4)
+    assert events[-1].keys == {'c', 'd'}
+    data['items'].extend([3, 4])
+    assert events[-1].sender is data['items'] and events[-1].keys == {2, 3}
+    data['items'][-1] = 5
+    assert events[-1].keys == {3}
+    data['items'].sort()
+    assert events[-1].keys is None
+
+
+def test_batch():
+    events: List[ObservableChangeEventArguments] = []
+    data = ObservableDict({'a': 1, 'items': [1, 2], 'nested': {'x': 1}}, on_change=events.append)
+    with observables.batch():
+        data['a'] = 2
+        for i in range(100):
+            data['items'].append(i)
+        with observables.batch():
+            data['nested']['x'] = 2
+        assert not events
+    assert len(events) == 1, 'all changes are collapsed into a single notification'
+    assert events[0].sender is data
+    assert events[0].keys == {'a', 'items', 'nested'}
+
+    with observables.batch():
+        data['items'].clear()
+        data.clear()
+    assert events[-1].keys is None
+
+
+async def test_deferred_notifications():
+    events: List[ObservableChangeEventArguments] = []
+    data = ObservableDict({'items': []}, on_change=events.append, deferred=True)
+    for i in range(100):
+        data['items'].append(i)
+    assert not events
+    await asyncio.sleep(0)
+    assert len(events) == 1, 'changes are collapsed into one notification per event loop iteration'
+    assert events[0].keys == {'items'}
+
+    data['x'] = 1
+    await asyncio.sleep(0)
+    assert len(events) == 2
+    assert events[1].keys == {'x'}
+
+
+def test_lazy_wrapping():
+    reset_counter()
+    data = ObservableDict({'a': {'b': [1, {'c': 2}]}, 'x': [[1], [2]]}, on_change=increment_counter)
+    assert type(dict.__getitem__(data, 'a')) is dict, 'nested values are not wrapped before they are accessed'
+
+    a = data['a']
+    assert isinstance(a, ObservableDict)
+    assert data['a'] is a, 'wrappers are cached'
+    assert type(dict.__getitem__(a, 'b')) is list
+
+    a['b'][1]['c'] = 3
+    assert count == 1
+    assert data == {'a': {'b': [1, {'c': 3}]}, 'x': [[1], [2]]}
+
+    for item in data['x']:
+        item.append(0)
+    assert count == 3
+    assert data.get('x') == [[1, 0], [2, 0]]
+
+    for value in data.values():
+        assert isinstance(value, (ObservableDict, ObservableList))
+
+
+def test_values_are_copied_on_assignment():
+    reset_counter()
+    data = ObservableDict(on_change=increment_counter)
+    original = {'k': 1}
+    data['d'] = original
+    original['k'] = 99
+    assert data == {'d': {'k': 1}}, 'changing the original does not bypass the observable collection'
+
+    rows = [[1], [2]]
+    data.update({'rows': rows})
+    rows.append([3])
+    items = [1]
+    data['rows'].extend([items])
+    items.append(2)
+    assert data['rows'] == [[1], [2], [1]]
+    assert count == 3
+
+    copied = dict(data)
+    assert isinstance(copied['d'], ObservableDict), 'values handed out via dict(...) are wrapped'
+    copied['d']['k'] = 2
+    assert count == 4
+    assert {**data}['d'] is data['d']
+    assert data.copy()['rows'] is data['rows']
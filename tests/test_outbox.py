@@ -1,25 +1,403 @@
 import asyncio
+import types
+import zlib
+from typing import Callable, Dict, List, Tuple
 
-from nicegui import ui
-from nicegui.testing import Screen
+import pytest
 
+from nicegui import Client, app, core, json, outbox, ui
+from nicegui.outbox import Outbox
+from nicegui.testing import User
 
-def test_removing_outbox_loops(screen: Screen):
-    @ui.page('/page', reconnect_timeout=0.1)
+
+def capture_messages(client: Client, message_type: str) -> List[Dict]:
+    """Record the data of all messages of the given type emitted to the client, including those within batches."""
+    messages: List[Dict] = []
+    original_emit = client.outbox._emit
+
+    async def capture_emit(message):
+        _, type_, data = message
+        batched = type_ == 'batch' and message_type != 'batch'
+        for inner_type, inner_data in data['messages'] if batched else [(type_, data)]:
+            if inner_type == message_type:
+                messages.append(dict(inner_data))
+        await original_emit(message)
+    client.outbox._emit = capture_emit  # type: ignore
+    return messages
+
+
+def capture_events(monkeypatch: pytest.MonkeyPatch) -> List[Tuple[str, Dict]]:
+    """Record all events emitted via socket.io."""
+    events: List[Tuple[str, Dict]] = []
+
+    async def emit(event: str, data: Dict, room: str) -> None:
+        events.append((event, data))
+    monkeypatch.setattr(core.sio, 'emit', emit)
+    return events
+
+
+async def test_single_outbox_loop_for_all_clients(create_user: Callable[[], User]):
+    @ui.page('/')
     def page():
         ui.button('Click me', on_click=lambda: ui.notify('Hello world!'))
 
     def count_outbox_loop_tasks() -> int:
         return len([t for t in asyncio.all_tasks() if t.get_name().startswith('outbox loop')])
 
-    count = ui.label()
-    ui.timer(0.1, lambda: count.set_text(f'{count_outbox_loop_tasks()} tasks'))
+    user1, user2 = create_user(), create_user()
+    client1 = await user1.open('/')
+    await user2.open('/')
+    user1.find('Click me').click()
+    await user1.should_see('Hello world!')
+    await asyncio.sleep(0.1)
+    assert count_outbox_loop_tasks() == 1
+    assert not Outbox.ready, 'flushed outboxes are not scheduled anymore'
+
+    client1.delete()
+    await asyncio.sleep(0.1)
+    assert count_outbox_loop_tasks() == 1
+
+
+async def test_idle_outbox_is_not_scheduled(user: User):
+    @ui.page('/')
+    def page():
+        ui.label('Hello')
+
+    client = await user.open('/')
+    await asyncio.sleep(0.1)
+    assert id(client.outbox) not in Outbox.ready
+
+    ui.notify('Hi')  # NOTE: the auto-index client is not connected
+    assert id(Client.auto_index_client.outbox) not in Outbox.ready
+
+    with client:
+        ui.label('World')
+    assert id(client.outbox) in Outbox.ready
+    await asyncio.sleep(0.1)
+    assert id(client.outbox) not in Outbox.ready
+
+
+async def test_property_level_updates(user: User):
+    @ui.page('/')
+    def page():
+        ui.label('Hello').props('foo=1 bar=2')
+
+    client = await user.open('/')
+    label = client.elements[max(client.elements)]
+    updates = capture_messages(client, 'update')
+
+    label.props('foo=3')
+    await asyncio.sleep(0.1)
+    assert updates[-1][label.id]['tag'] == 'div', 'the first update after page load contains the full element'
+
+    label.props('foo=4')
+    await asyncio.sleep(0.1)
+    assert updates[-1][label.id] == {'patch': {'props': {'foo': '4'}}}
+
+    label.props(remove='bar')
+    label.set_text('World')
+    await asyncio.sleep(0.1)
+    assert updates[-1][label.id] == {'patch': {'text': 'World'}, 'unset_props': ['bar']}
+
+    count = len(updates)
+    label.update()
+    await asyncio.sleep(0.1)
+    assert len(updates) == count, 'unchanged elements are not sent again'
+
+
+async def test_value_without_loopback_is_resent(user: User):
+    @ui.page('/')
+    def page():
+        ui.input('Name')
+
+    client = await user.open('/')
+    input_ = client.elements[max(client.elements)]
+    assert isinstance(input_, ui.input)
+    input_.props('label=Name2')  # NOTE: send the full element once so the outbox knows the browser state
+    await asyncio.sleep(0.1)
+
+    updates = capture_messages(client, 'update')
+
+    listener = next(listener for listener in input_._event_listeners.values() if listener.type == 'update:value')
+    client.handle_event({'id': input_.id, 'listener_id': listener.id, 'args': ['"abc"']})  # NOTE: simulate typing
+    await asyncio.sleep(0.1)
+    assert input_.value == 'abc'
+    input_.set_value('')
+    await asyncio.sleep(0.1)
+    assert updates[-1][input_.id]['patch']['props']['value'] == ''
+
+
+async def test_sections_are_compared_without_serialization(user: User, monkeypatch: pytest.MonkeyPatch):
+    @ui.page('/')
+    def page():
+        ui.label('Hello').props('foo=1')
+
+    client = await user.open('/')
+    label = client.elements[max(client.elements)]
+    label.props('foo=2')  # NOTE: send the full element once so the outbox knows the browser state
+    await asyncio.sleep(0.1)
+
+    serialized: List = []
+    original_dumps = json.dumps
+    monkeypatch.setattr(json, 'dumps', lambda *args, **kwargs: serialized.append(args) or original_dumps(*args, **kwargs))
+    label.classes('text-red').style('margin: 0').props('foo=3')
+    label.set_text('World')
+    assert client.outbox._collect_updates() == {label.id: {'patch': {
+        'text': 'World',
+        'class': ['text-red'],
+        'style': {'margin': '0'},
+        'props': {'foo': '3'},
+    }}}
+    assert not serialized, 'flat sections and scalar props are compared directly'
+
+    label._props['foo'] = True
+    label._props['items'] = [1]
+    label.update()
+    assert client.outbox._collect_updates() == {label.id: {'patch': {'props': {'foo': True, 'items': [1]}}}}
+    label._props['foo'] = 1
+    label._props['items'].append(2)
+    label.update()
+    assert client.outbox._collect_updates() == {label.id: {'patch': {'props': {'foo': 1, 'items': [1, 2]}}}}, \
+        'scalars of different types and nested values mutated in place are detected'
+
+
+async def test_shared_client_resyncs_on_every_connection(create_user: Callable[[], User]):
+    label = ui.label('Hello')
+    user1, user2 = create_user(), create_user()
+    client = await user1.open('/')
+    assert client.shared
+    await asyncio.sleep(0.1)
+    label.set_text('World')  # NOTE: the patch only reaches the first tab
+    await asyncio.sleep(0.1)
+
+    resyncs = capture_messages(client, 'resync')
+    updates = capture_messages(client, 'update')
+    await user2.open('/')
+    await asyncio.sleep(0.1)
+    assert len(resyncs) == 1, 'a new tab of a shared client gets a snapshot instead of patches it cannot apply'
+    assert resyncs[0][label.id]['text'] == 'World'
+    assert not updates
+
+
+async def test_structural_updates(user: User):
+    @ui.page('/')
+    def page():
+        with ui.column():
+            ui.label('A')
+            ui.label('B')
+
+    client = await user.open('/')
+    column = next(element for element in client.elements.values() if isinstance(element, ui.column))
+    a, b = column
+    updates = capture_messages(client, 'update')
+
+    column.classes('gap-0')
+    await asyncio.sleep(0.1)
+    assert updates[-1][column.id]['children'] == [a.id, b.id], 'the first update after page load contains all children'
+
+    with column:
+        c = ui.label('C')
+    await asyncio.sleep(0.1)
+    assert updates[-1][column.id] == {'slot_changes': {'default': [('insert', 2, c.id)]}}
+    assert updates[-1][c.id]['tag'] == 'div'
+
+    c.move(target_index=0)
+    await asyncio.sleep(0.1)
+    assert updates[-1][column.id] == {'slot_changes': {'default': [('remove', 2), ('insert', 0, c.id)]}}
+
+    column.remove(a)
+    await asyncio.sleep(0.1)
+    assert updates[-1][column.id] == {'slot_changes': {'default': [('remove', 1)]}}
+    assert updates[-1][a.id] is None
+
+    column.clear()
+    await asyncio.sleep(0.1)
+    assert updates[-1][column.id] == {'slot_changes': {'default': [('clear',)]}}
+
+
+async def test_single_emit_per_flush(user: User):
+    @ui.page('/')
+    def page():
+        ui.label('Hello')
+
+    client = await user.open('/')
+    label = client.elements[max(client.elements)]
+    await asyncio.sleep(0.1)
+    batches = capture_messages(client, 'batch')
+    updates = capture_messages(client, 'update')
+
+    label.set_text('World')
+    for i in range(5):
+        label.run_method('foo', i)
+    await asyncio.sleep(0.1)
+    assert len(batches) == 1
+    assert len(updates) == 1, 'no message is emitted outside of the batch'
+    data = batches[0]
+    assert [inner_type for inner_type, _ in data['messages']] == ['update'] + 5 * ['run_javascript']
+    assert [inner_data['code'] for _, inner_data in data['messages'][1:]] == \
+        [f'return runMethod({label.id}, "foo", [{i}])' for i in range(5)]
+
+
+async def test_rewind_replays_serialized_frames(user: User, monkeypatch: pytest.MonkeyPatch):
+    @ui.page('/')
+    def page():
+        ui.label('Hello')
+
+    client = await user.open('/')
+    label = client.elements[max(client.elements)]
+    label.set_text('Hello world')
+    await asyncio.sleep(0.1)
+    client.outbox._emit = types.MethodType(Outbox._emit, client.outbox)  # type: ignore  # NOTE: the browser does not ack
+    label.set_text('World')
+    label.run_method('foo')
+    await asyncio.sleep(0.1)
+    assert client.outbox.history_bytes == sum(len(entry[4]) for entry in client.outbox.message_history)
+
+    emitted = capture_events(monkeypatch)
+    monkeypatch.setattr(outbox, '_deserialize', None)  # NOTE: replayed frames are sent without decoding them
+    client.outbox.try_rewind(client.outbox.next_message_id - 1)
+    await asyncio.sleep(0.1)
+    assert len(emitted) == 1
+    event, data = emitted[0]
+    assert event == 'frame'
+    assert data['_id'] == client.outbox.next_message_id - 1
+    assert data['type'] == 'batch'
+    assert data['compressed'] is False
+    assert data['data'] == client.outbox.message_history[-1][4], 'the stored frame is sent as it is'
+    assert json.loads(data['data']) == {'messages': [
+        ['update', {str(label.id): {'patch': {'text': 'World'}}}],
+        ['run_javascript', {'code': f'return runMethod({label.id}, "foo", [])'}],
+    ]}
+
+
+async def test_history_is_bounded_by_bytes(user: User, monkeypatch: pytest.MonkeyPatch):
+    @ui.page('/')
+    def page():
+        ui.label('Hello')
+
+    client = await user.open('/')
+    label = client.elements[max(client.elements)]
+    client.outbox._emit = types.MethodType(Outbox._emit, client.outbox)  # type: ignore  # NOTE: the browser does not ack
+    monkeypatch.setattr(app.config, 'message_history_bytes', 1000)
+    for i in range(10):
+        label.set_text(f'{i}' * 300)
+        await asyncio.sleep(0.05)
+    assert 0 < client.outbox.history_bytes <= 1000
+    assert len(client.outbox.message_history) < 10
+
+    resyncs = capture_messages(client, 'resync')
+    client.outbox.try_rewind(client.outbox.next_message_id - 10)
+    await asyncio.sleep(0.1)
+    assert len(resyncs) == 1, 'the oldest frames are gone, so the whole element tree is sent'
+
+
+async def test_resync_instead_of_reload(user: User):
+    @ui.page('/')
+    def page():
+        with ui.row():
+            ui.label('Hello')
+
+    client = await user.open('/')
+    row = next(element for element in client.elements.values() if isinstance(element, ui.row))
+    label = row.default_slot.children[0]
+    await asyncio.sleep(0.1)
+    client.outbox.message_history.clear()
+
+    resyncs = capture_messages(client, 'resync')
+    updates = capture_messages(client, 'update')
+    scripts = capture_messages(client, 'run_javascript')
+    label.set_text('World')
+    client.outbox.try_rewind(client.outbox.next_message_id - 1)
+    await asyncio.sleep(0.1)
+    assert not scripts, 'the page is not reloaded'
+    assert not updates
+    assert len(resyncs) == 1
+    assert set(resyncs[0]) == set(client.elements)
+    assert resyncs[0][label.id]['text'] == 'World'
+    assert resyncs[0][row.id]['children'] == [label.id]
+
+    label.set_text('Again')
+    await asyncio.sleep(0.1)
+    assert updates == [{label.id: {'patch': {'text': 'Again'}}}], 'the browser state is known after a resync'
+
+
+async def test_no_backpressure_by_default(user: User):
+    @ui.page('/')
+    def page():
+        ui.label('Hello')
+
+    client = await user.open('/')
+    label = client.elements[max(client.elements)]
+    await asyncio.sleep(0.1)
+    client.outbox._emit = types.MethodType(Outbox._emit, client.outbox)  # type: ignore  # NOTE: the browser does not ack
+    assert app.config.outbox_max_messages is None
+    assert app.config.outbox_max_bytes is None
+
+    updates = capture_messages(client, 'update')
+    for i in range(1000):
+        label.set_text(f'Hello {i}')
+        await client.outbox._flush()
+    assert len(client.outbox.in_flight) == 1000
+    assert not client.outbox.is_congested
+    assert updates[-1] == {label.id: {'patch': {'text': 'Hello 999'}}}, 'slow clients are not throttled unless enabled'
+
+
+async def test_backpressure_for_slow_clients(user: User, monkeypatch: pytest.MonkeyPatch):
+    @ui.page('/')
+    def page():
+        ui.label('Hello')
+
+    client = await user.open('/')
+    label = client.elements[max(client.elements)]
+    await asyncio.sleep(0.1)
+    client.outbox._emit = types.MethodType(Outbox._emit, client.outbox)  # type: ignore  # NOTE: the browser does not ack
+    monkeypatch.setattr(app.config, 'outbox_max_messages', 3)
+    monkeypatch.setattr(Outbox, 'CONGESTION_REPORT_DELAY', 0.2)
+    slow_clients: List[Client] = []
+    app.on_slow_client(slow_clients.append)
+
+    for i in range(10):
+        label.set_text(f'Hello {i}')
+        label.run_method('foo', i, supersede=True)
+        await asyncio.sleep(0.05)
+    assert client.outbox.is_congested
+    assert len(client.outbox.in_flight) == 3
+    assert len(client.outbox.messages) == 1, 'superseded calls are dropped'
+    assert client.outbox.dropped_messages == 6
+    await asyncio.sleep(0.2)
+    assert slow_clients == [client]
+
+    updates = capture_messages(client, 'update')
+    scripts = capture_messages(client, 'run_javascript')
+    client.outbox.handle_ack(client.outbox.next_message_id)
+    await asyncio.sleep(0.1)
+    assert not client.outbox.is_congested
+    assert updates == [{label.id: {'patch': {'text': 'Hello 9'}}}], 'pending updates are coalesced'
+    assert scripts == [{'code': f'return runMethod({label.id}, "foo", [9])'}]
+
+
+async def test_compression_of_large_messages(user: User, monkeypatch: pytest.MonkeyPatch):
+    @ui.page('/')
+    def page():
+        ui.label('Hello')
+
+    client = await user.open('/')
+    label = client.elements[max(client.elements)]
+    await asyncio.sleep(0.1)
+    monkeypatch.setattr(app.config, 'compression_threshold', 1000)
+    emitted = capture_events(monkeypatch)
 
-    screen.open('/page')
-    screen.click('Click me')
-    screen.should_contain('Hello world!')
-    assert count.text == '1 tasks'
+    label.set_text('World')
+    await asyncio.sleep(0.1)
+    label.set_text('x' * 10_000)
+    await asyncio.sleep(0.1)
+    assert [event for event, _ in emitted] == ['update', 'frame'], 'only compressed messages are sent as binary frames'
+    assert label.id in emitted[0][1]
+    assert emitted[1][1]['type'] == 'update'
+    assert emitted[1][1]['compressed'] is True
+    assert json.loads(zlib.decompress(emitted[1][1]['data'])) == {str(label.id): {'patch': {'text': 'x' * 10_000}}}
 
-    screen.open('/')
-    screen.wait(0.5)
-    assert count.text == '0 tasks'
+    stats = client.outbox.compression_stats
+    assert stats.messages == 1
+    assert stats.ratio > 10
+    assert stats.cpu_time >= 0
@@ -3,11 +3,12 @@ import re
 from typing import Optional
 from uuid import uuid4
 
+import pytest
 from fastapi.responses import PlainTextResponse
 from selenium.webdriver.common.by import By
 
-from nicegui import app, background_tasks, ui
-from nicegui.testing import Screen
+from nicegui import Client, app, background_tasks, ui
+from nicegui.testing import Screen, User
 
 
 def test_page(screen: Screen):
@@ -341,3 +342,28 @@ def test_multicast(screen: Screen):
     screen.should_contain('added')
     screen.switch_to(0)
     screen.should_contain('added')
+
+
+async def test_unconnected_clients_are_pruned(user: User, monkeypatch: pytest.MonkeyPatch):
+    @ui.page('/')
+    def page():
+        ui.label('Hello')
+
+    monkeypatch.setattr(app.config, 'unconnected_client_timeout', 0.1)
+    connected_client = await user.open('/')
+    await user.http_client.get('/')  # NOTE: a crawler which never opens the websocket
+    unconnected_client = next(c for c in Client.instances.values() if c.request is not None and c is not connected_client)
+    Client._prune_unconnected()  # pylint: disable=protected-access
+    assert unconnected_client.id in Client.instances, 'the timeout has not passed yet'
+
+    await asyncio.sleep(0.2)
+    Client._prune_unconnected()  # pylint: disable=protected-access
+    assert unconnected_client.id not in Client.instances
+    assert connected_client.id in Client.instances
+
+
+def test_unconnected_client_timeout_must_be_positive():
+    with pytest.raises(ValueError):
+        app.config.add_run_config(reload=False, title='', viewport='', favicon=None, dark=False, language='en-US',
+                                  binding_refresh_interval=0.1, reconnect_timeout=3.0, unconnected_client_timeout=0,
+                                  message_history_length=1000, tailwind=True, prod_js=True, show_welcome_message=False)
@@ -0,0 +1,276 @@
+import asyncio
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+from nicegui import core
+from nicegui.persistence import FilePersistentDict, RedisPersistentDict, SqlitePersistentDict
+
+try:
+    # try to import module, only run Redis tests if succeeded
+    import fakeredis
+except ImportError:
+    pass
+
+
+def load(filepath: Path, **kwargs) -> FilePersistentDict:
+    storage = FilePersistentDict(filepath, encoding='utf-8', journal=True, **kwargs)
+    storage.initialize_sync()
+    return storage
+
+
+def test_journal(tmp_path: Path):
+    filepath = tmp_path / 'storage.json'
+    storage = load(filepath)
+    storage['a'] = 1
+    storage['b'] = {'nested': [1, 2]}
+    storage['b']['nested'].append(3)
+    del storage['a']
+    assert load(filepath) == {'b': {'nested': [1, 2, 3]}}
+    assert storage.journal_path.exists()
+
+    storage.journal_path.write_text(storage.journal_path.read_text() + '{"key": "c", "val', encoding='utf-8')
+    storage = load(filepath)
+    assert storage == {'b': {'nested': [1, 2, 3]}}, 'an incomplete record is ignored'
+    storage['c'] = 3
+    assert load(filepath) == {'b': {'nested': [1, 2, 3]}, 'c': 3}, 'the damaged journal has been compacted'
+    assert not filepath.with_name('storage.json.tmp').exists()
+
+
+def test_compaction(tmp_path: Path):
+    filepath = tmp_path / 'storage.json'
+    storage = load(filepath, compaction_size=200)
+    for i in range(20):
+        storage['counter'] = i
+    assert filepath.exists()
+    assert storage.journal_path.stat().st_size < 200
+    assert load(filepath) == {'counter': 19}
+
+    storage['text'] = 'Grüße'
+    assert storage.journal_path.stat().st_size == storage._journal_size, 'the journal size is counted in bytes'
+    del storage['text']
+
+    old_journal = storage.journal_path.read_text(encoding='utf-8')
+    for i in range(20, 40):
+        storage['counter'] = i
+    storage.journal_path.write_text(old_journal, encoding='utf-8')  # NOTE: crash before replacing the journal
+    snapshot = json.loads(filepath.read_text(encoding='utf-8'))
+    assert snapshot['counter'] >= 20
+    assert load(filepath) == snapshot, 'a journal of an older snapshot is ignored'
+
+    storage.clear()
+    assert not filepath.exists()
+    assert not storage.journal_path.exists()
+    assert load(filepath) == {}
+
+
+async def test_background_compaction(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(core, 'loop', asyncio.get_running_loop())
+    filepath = tmp_path / 'storage.json'
+    storage = load(filepath, compaction_size=100, flush_interval=0)
+    for i in range(50):
+        storage['counter'] = i
+        storage['history'] = list(range(i))
+        await asyncio.sleep(0)  # NOTE: let deferred change notifications arrive
+        await storage.flush()
+    await storage.close()
+    assert json.loads(filepath.read_text(encoding='utf-8'))['counter'] > 0, 'the journal has been compacted'
+    assert load(filepath) == {'counter': 49, 'history': list(range(49))}
+
+
+def test_compaction_snapshot_is_taken_on_the_event_loop(tmp_path: Path):
+    filepath = tmp_path / 'storage.json'
+    storage = load(filepath)
+    storage['history'] = [{'i': 0}]
+    storage._dirty_keys = None  # pylint: disable=protected-access  # NOTE: force a compaction
+    write = storage._prepare_flush()  # pylint: disable=protected-access
+    assert write is not None
+    storage['history'].append({'i': 1})  # NOTE: the event loop keeps changing nested values while the executor writes
+    storage['history'][0]['i'] = 2
+    write()
+    assert json.loads(filepath.read_text(encoding='utf-8')) == {'history': [{'i': 0}]}
+    assert load(filepath) == {'history': [{'i': 0}]}
+
+
+def test_sqlite(tmp_path: Path):
+    path = tmp_path / 'storage.db'
+    alice = SqlitePersistentDict(path=path, id='user-alice')
+    alice.initialize_sync()
+    alice['a'] = 1
+    alice['b'] = {'nested': [1, 2]}
+    alice['b']['nested'].append(3)
+    bob = SqlitePersistentDict(path=path, id='user-bob')
+    bob.initialize_sync()
+    bob[1] = 'one'
+    del alice['a']
+
+    alice = SqlitePersistentDict(path=path, id='user-alice')
+    alice.initialize_sync()
+    assert alice == {'b': {'nested': [1, 2, 3]}}
+    bob = SqlitePersistentDict(path=path, id='user-bob')
+    bob.initialize_sync()
+    assert bob == {1: 'one'}, 'keys keep their type'
+
+    bob.clear()
+    bob = SqlitePersistentDict(path=path, id='user-bob')
+    bob.initialize_sync()
+    assert bob == {}
+
+
+async def test_sqlite_batched_commits(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(core, 'loop', asyncio.get_running_loop())
+    path = tmp_path / 'storage.db'
+    users = [SqlitePersistentDict(path=path, id=f'user-{i}', flush_interval=0.1) for i in range(10)]
+    for user in users:
+        await user.initialize()
+    for i, user in enumerate(users):
+        user['count'] = i
+    await asyncio.sleep(0.05)
+    assert sqlite3.connect(path).execute('SELECT COUNT(*) FROM storage').fetchone() == (0,)
+    await asyncio.sleep(0.2)
+    assert sqlite3.connect(path).execute('SELECT COUNT(*) FROM storage').fetchone() == (10,)
+
+    users[0]['count'] = 42
+    await users[0].close()
+    user = SqlitePersistentDict(path=path, id='user-0')
+    await user.initialize()
+    assert user == {'count': 42}
+
+
+async def test_sqlite_concurrent_access(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(core, 'loop', asyncio.get_running_loop())
+    path = tmp_path / 'storage.db'
+    user = SqlitePersistentDict(path=path, id='user', flush_interval=0)
+    await user.initialize()
+    for i in range(200):
+        user['count'] = i
+        user[f'key-{i}'] = i
+        await asyncio.sleep(0)
+        SqlitePersistentDict(path=path, id='user').initialize_sync()  # NOTE: read while the writer thread commits
+    await user.close()
+    user = SqlitePersistentDict(path=path, id='user')
+    await user.initialize()
+    assert user['count'] == 199
+    assert len(user) == 201
+
+
+@pytest.mark.skipif('fakeredis' not in sys.modules, reason='requires the fakeredis library.')
+async def test_redis_field_level_deltas(redis_server: 'fakeredis.FakeServer', monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(core, 'loop', asyncio.get_running_loop())
+    alice = RedisPersistentDict(url='redis://alice', id='user', field_level=True)
+    bob = RedisPersistentDict(url='redis://bob', id='user', field_level=True)
+    await alice.initialize()
+    bob.initialize_sync()
+    await asyncio.sleep(0.1)
+
+    alice['a'] = 1
+    alice['b'] = {'nested': [1, 2]}
+    await asyncio.sleep(0.1)
+    alice['b']['nested'].append(3)
+    del alice['a']
+    await asyncio.sleep(0.1)
+    assert bob == alice == {'b': {'nested': [1, 2, 3]}}
+    assert bob._version == alice._version == 2  # pylint: disable=protected-access
+    redis = fakeredis.FakeAsyncRedis(server=redis_server)
+    assert await redis.hgetall('nicegui:user:fields') == {b'"b"': b'{"nested":[1,2,3]}'}, 'the Lua script applied the delta'
+    assert await redis.get('nicegui:user:version') == b'2'
+
+    bob._connection.unsubscribe(bob)  # pylint: disable=protected-access
+    alice['c'] = 3  # NOTE: bob misses this delta
+    await asyncio.sleep(0.1)
+    await bob._connection.subscribe(bob)  # pylint: disable=protected-access
+    alice['d'] = 4
+    await asyncio.sleep(0.1)
+    assert bob == {'b': {'nested': [1, 2, 3]}, 'c': 3, 'd': 4}, 'the gap is detected and all fields are reloaded'
+    assert bob._version == 4  # pylint: disable=protected-access
+    assert alice.size == bob.size == len('"b"{"nested":[1,2,3]}"c"3"d"4'), 'the size is tracked per field'
+
+    alice.clear()
+    await asyncio.sleep(0.1)
+    assert bob == {}
+    assert alice.size == bob.size == 0
+    assert await redis.hgetall('nicegui:user:fields') == {}
+    await alice.close()
+    await bob.close()
+
+
+@pytest.mark.skipif('fakeredis' not in sys.modules, reason='requires the fakeredis library.')
+async def test_redis_gap_reload_does_not_block_shared_listener(redis_server: 'fakeredis.FakeServer',
+                                                               monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(core, 'loop', asyncio.get_running_loop())
+    writer1 = RedisPersistentDict(url='redis://writer', id='user1', field_level=True)
+    writer2 = RedisPersistentDict(url='redis://writer', id='user2', field_level=True)
+    reader1 = RedisPersistentDict(url='redis://reader', id='user1', field_level=True)
+    reader2 = RedisPersistentDict(url='redis://reader', id='user2', field_level=True)
+    for dict_ in [writer1, writer2, reader1, reader2]:
+        await dict_.initialize()
+    await asyncio.sleep(0.1)
+
+    reader1._connection.unsubscribe(reader1)  # pylint: disable=protected-access
+    writer1['a'] = 1  # NOTE: reader1 misses this delta
+    await asyncio.sleep(0.1)
+    await reader1._connection.subscribe(reader1)  # pylint: disable=protected-access
+
+    reload_started = asyncio.Event()
+    reload_released = asyncio.Event()
+    load_fields = reader1._load_fields  # pylint: disable=protected-access
+
+    async def slow_load_fields() -> None:
+        reload_started.set()
+        await reload_released.wait()
+        await load_fields()
+    monkeypatch.setattr(reader1, '_load_fields', slow_load_fields)
+
+    writer1['b'] = 2
+    await asyncio.wait_for(reload_started.wait(), timeout=1)
+    writer2['x'] = 1
+    writer1['c'] = 3  # NOTE: this delta is dropped while reloading and fetched by a second reload
+    await asyncio.sleep(0.1)
+    assert reader2 == {'x': 1}, 'other dicts on the same connection still receive deltas'
+    assert reader1 == {}
+
+    reload_released.set()
+    await asyncio.sleep(0.1)
+    assert reader1 == {'a': 1, 'b': 2, 'c': 3}
+    assert reader1._reload_task is None  # pylint: disable=protected-access
+
+    for dict_ in [writer1, writer2, reader1, reader2]:
+        await dict_.close()
+
+
+@pytest.mark.skipif('fakeredis' not in sys.modules, reason='requires the fakeredis library.')
+async def test_redis_connection_is_shared_and_released(redis_server: 'fakeredis.FakeServer',
+                                                       monkeypatch: pytest.MonkeyPatch):
+    # pylint: disable=import-outside-toplevel,protected-access
+    from nicegui.persistence.redis_persistent_dict import _connections
+    monkeypatch.setattr(core, 'loop', asyncio.get_running_loop())
+    a = RedisPersistentDict(url='redis://shared', id='a')
+    b = RedisPersistentDict(url='redis://shared', id='b')
+    await a.initialize()
+    await b.initialize()
+    await asyncio.sleep(0.1)
+    connection = a._connection
+    assert b._connection is connection
+    assert _connections['redis://shared'] is connection
+    assert connection.reference_count == 2
+    assert connection.patterns == {'nicegui:'}, 'dicts with the same prefix share one pattern subscription'
+
+    await a.close()
+    await a.close()
+    assert connection.reference_count == 1, 'closing twice releases the connection only once'
+    assert 'redis://shared' in _connections
+    assert not connection.listen_task.done()
+
+    await b.close()
+    await asyncio.sleep(0.1)
+    assert connection.reference_count == 0
+    assert 'redis://shared' not in _connections
+    assert connection.listen_task.done()
+
+    c = RedisPersistentDict(url='redis://shared', id='c')
+    assert c._connection is not connection, 'a new connection is created after the old one has been released'
+    await c.initialize()
+    await c.close()
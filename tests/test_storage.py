@@ -1,14 +1,29 @@
 import asyncio
 import copy
+import dataclasses
+import sys
+import threading
 import time
+from datetime import date
+from decimal import Decimal
 from pathlib import Path
+from typing import Callable, List, Set
 
 import httpx
+import numpy as np
 import pytest
 
 from nicegui import app, background_tasks, context, core, ui
 from nicegui import storage as storage_module
-from nicegui.testing import Screen
+from nicegui.persistence import FilePersistentDict, RedisPersistentDict
+from nicegui.testing import Screen, User
+from nicegui.version import __version__
+
+try:
+    # try to import module, only run Redis tests if succeeded
+    import fakeredis
+except ImportError:
+    pass
 
 
 def test_browser_data_is_stored_in_the_browser(screen: Screen):
@@ -337,3 +352,214 @@ def test_tab_storage_holds_non_serializable_objects(screen: Screen):
     screen.open('/')
     screen.click('Update storage')
     screen.wait(0.5)
+
+
+async def test_user_storage_is_created_lazily(create_user: Callable[[], User], monkeypatch: pytest.MonkeyPatch):
+    @ui.page('/')
+    def page():
+        ui.label(f'count: {app.storage.user.get("count", 0)}')
+
+    @app.get('/increment')
+    def increment():
+        app.storage.user['count'] = app.storage.user.get('count', 0) + 1
+        return {'count': app.storage.user['count']}
+
+    @app.get('/ping')
+    def ping():
+        return 'pong'
+
+    alice, bob = create_user(), create_user()
+    await alice.http_client.get(f'/_nicegui/{__version__}/static/favicon.ico')
+    await alice.http_client.get('/ping')
+    assert not app.storage._users  # pylint: disable=protected-access
+
+    assert (await alice.http_client.get('/increment')).json() == {'count': 1}
+    assert (await alice.http_client.get('/increment')).json() == {'count': 2}
+    assert len(app.storage._users) == 1  # pylint: disable=protected-access
+
+    def initialize_sync(self):
+        raise AssertionError('user storage is loaded asynchronously before page builder functions are called')
+    monkeypatch.setattr(FilePersistentDict, 'initialize_sync', initialize_sync)
+    await alice.open('/')
+    await alice.should_see('count: 2')
+    await bob.open('/')
+    await bob.should_see('count: 0')
+    assert len(app.storage._users) == 2  # pylint: disable=protected-access
+
+
+async def test_user_storage_eviction(create_user: Callable[[], User], monkeypatch: pytest.MonkeyPatch):
+    @app.get('/visit')
+    def visit():
+        storage = app.storage.user
+        storage['count'] = storage.get('count', 0) + 1
+        return {'count': storage['count']}
+
+    monkeypatch.setattr(storage_module.Storage, 'max_user_storages', 2)
+    alice, bob, carol = create_user(), create_user(), create_user()
+    for user in [alice, bob, alice, carol]:
+        await user.http_client.get('/visit')
+    stats = app.storage.user_stats
+    assert (stats.hits, stats.misses, stats.evictions, stats.resident) == (1, 3, 2, 1)
+    assert stats.resident_bytes == len('{"count":1}')
+    with monkeypatch.context() as m:
+        m.setattr(storage_module.json, 'dumps', None)
+        assert app.storage.user_stats.resident_bytes == len('{"count":1}'), 'size is tracked without serializing'
+
+    await asyncio.sleep(0.1)
+    assert (await alice.http_client.get('/visit')).json() == {'count': 3}, 'evicted storage is loaded again'
+    assert app.storage.user_stats.hit_rate == 0.2
+
+
+async def test_idle_tab_storage_is_spilled_to_disk(nicegui_reset_globals,  # pylint: disable=unused-argument
+                                                   tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    # pylint: disable=protected-access
+    storage = app.storage
+    monkeypatch.setattr(storage, '_tab_store', storage_module._TabStore(tmp_path / 'tabs.db'))
+    monkeypatch.setattr(storage, 'tab_storage_spill_time', 60)
+    monkeypatch.setattr(storage, 'spill_tab_storage', True)
+    threads: Set[str] = set()
+
+    def track_thread(original: Callable) -> Callable:
+        def run(*args):
+            threads.add(threading.current_thread().name.split('_')[0])
+            return original(*args)
+        return run
+    for name in ['_store', '_load', '_prune']:
+        monkeypatch.setattr(storage_module._TabStore, name, track_thread(getattr(storage_module._TabStore, name)))
+    for tab_id in ['a', 'b', 'c']:
+        await storage._create_tab_storage(tab_id)
+        storage._tabs[tab_id]['id'] = tab_id
+    storage._tabs['b']['function'] = len  # NOTE: non-serializable objects can not be spilled
+    for tab_id in ['a', 'b']:
+        storage._tabs[tab_id].last_modified -= 120
+        storage._schedule_tab_check(tab_id)
+    await storage._check_tabs()
+    assert set(storage._tabs) == {'b', 'c'}
+    assert [tab_id for _, tab_id in storage._tab_checks if tab_id == 'c'] == ['c'], 'c is not due yet'
+
+    await storage.copy_tab('a', 'd')
+    assert storage._tabs['a'] == storage._tabs['d'] == {'id': 'a'}, 'spilled storage is reloaded'
+
+    storage._tabs['a'].last_modified -= 120
+    storage._schedule_tab_check('a')
+    await storage._check_tabs()
+    assert 'a' not in storage._tabs
+    monkeypatch.setattr(storage, 'max_tab_storage_age', 60)
+    await storage._check_tabs()
+    await storage._create_tab_storage('a')
+    assert storage._tabs['a'] == {}, 'expired storage is pruned from disk'
+    assert threads == {'nicegui-tabs'}, 'the database is not accessed on the event loop'
+
+
+async def test_evicted_user_storage_is_closed_before_reloading(create_user: Callable[[], User],
+                                                               monkeypatch: pytest.MonkeyPatch):
+    @ui.page('/')
+    def page():
+        ui.label(f'count: {app.storage.user.get("count", 0)}')
+
+    @app.get('/visit')
+    def visit():
+        app.storage.user['count'] = app.storage.user.get('count', 0) + 1
+
+    events: List[str] = []
+    original_close = FilePersistentDict.close
+    original_initialize = FilePersistentDict.initialize
+
+    async def close(self: FilePersistentDict) -> None:
+        await asyncio.sleep(0.2)  # NOTE: simulate a slow write
+        await original_close(self)
+        events.append(f'close {self.filepath.name}')
+
+    async def initialize(self: FilePersistentDict) -> None:
+        events.append(f'initialize {self.filepath.name}')
+        await original_initialize(self)
+    monkeypatch.setattr(FilePersistentDict, 'close', close)
+    monkeypatch.setattr(FilePersistentDict, 'initialize', initialize)
+    monkeypatch.setattr(storage_module.Storage, 'max_user_storages', 2)
+
+    alice, bob, carol = create_user(), create_user(), create_user()
+    for user in [alice, bob, carol]:
+        await user.http_client.get('/visit')
+    assert app.storage.user_stats.evictions == 2
+    await alice.open('/')
+    await alice.should_see('count: 1')
+    alice_file = next(event.split()[1] for event in events if event.startswith('initialize'))
+    assert events.index(f'close {alice_file}') < events.index(f'initialize {alice_file}')
+
+
+@pytest.mark.skipif('fakeredis' not in sys.modules, reason='requires the fakeredis library.')
+async def test_user_storage_is_reloaded_while_evicted_storage_is_closing(
+        redis_server: 'fakeredis.FakeServer',  # pylint: disable=unused-argument
+        create_user: Callable[[], User], monkeypatch: pytest.MonkeyPatch):
+    # pylint: disable=protected-access
+    @app.get('/visit')
+    def visit():
+        app.storage.user['count'] = app.storage.user.get('count', 0) + 1
+
+    original_close = RedisPersistentDict.close
+
+    async def close(self: RedisPersistentDict) -> None:
+        await original_close(self)
+        await asyncio.sleep(0.2)  # NOTE: simulate a slow close
+    monkeypatch.setattr(RedisPersistentDict, 'close', close)
+    monkeypatch.setattr(storage_module.Storage, 'redis_url', 'redis://app')
+    monkeypatch.setattr(storage_module.Storage, 'max_user_storages', 2)
+
+    alice, bob, carol = create_user(), create_user(), create_user()
+    for user in [alice, bob, carol]:
+        await user.http_client.get('/visit')
+    session_id, (evicted, _) = next(iter(app.storage._closing_users.items()))
+    await alice.http_client.get('/visit')
+    revived = app.storage._users[session_id]
+    assert revived is not evicted, 'storage which is closing is not used again'
+    assert revived['count'] == 2
+
+    await asyncio.sleep(0.1)
+    remote = RedisPersistentDict(url='redis://remote', id=f'user-{session_id}')
+    await remote.initialize()
+    assert remote['count'] == 2, 'writes of the reloaded storage are stored'
+    remote['color'] = 'red'
+    await asyncio.sleep(0.1)
+    assert revived['color'] == 'red', 'reloaded storage receives remote updates'
+    await remote.close()
+
+
+@dataclasses.dataclass
+class Point:
+    x: int
+    y: int
+
+
+async def test_tab_storage_with_non_json_values_is_not_spilled(
+        nicegui_reset_globals,  # pylint: disable=unused-argument
+        tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    # pylint: disable=protected-access
+    storage = app.storage
+    monkeypatch.setattr(storage, '_tab_store', storage_module._TabStore(tmp_path / 'tabs.db'))
+    monkeypatch.setattr(storage, 'tab_storage_spill_time', 60)
+    values = {
+        'int_keys': {1: 'one'},
+        'tuple': (1, 2),
+        'date': date(2020, 1, 31),
+        'decimal': Decimal('1.5'),
+        'numpy': np.array([1.0, 2.0]),
+        'dataclass': Point(1, 2),
+        'nan': float('nan'),
+        'json': {'list': [1, 2.5, 'text', None, True]},
+    }
+    for tab_id, value in values.items():
+        await storage._create_tab_storage(tab_id)
+        storage._tabs[tab_id]['value'] = value
+        storage._tabs[tab_id].last_modified -= 120
+        storage._schedule_tab_check(tab_id)
+    await storage._check_tabs()
+    assert set(storage._tabs) == set(values), 'spilling is disabled by default'
+    assert not (tmp_path / 'tabs.db').exists()
+
+    monkeypatch.setattr(storage, 'spill_tab_storage', True)
+    for tab_id in values:
+        storage._schedule_tab_check(tab_id)
+    await storage._check_tabs()
+    assert set(storage._tabs) == set(values) - {'json'}, 'only plain JSON data is spilled'
+    assert storage._tabs['tuple']['value'] == (1, 2)
+    assert storage._tabs['decimal']['value'] == Decimal('1.5')